@@ -0,0 +1,250 @@
+import argparse
+import io
+import os
+import queue
+import random
+import shutil
+import tempfile
+import threading
+import time
+from ftplib import FTP_TLS, all_errors
+
+from wadas.domain.camera import media_queue
+from wadas.domain.ftps_server import FTPsServer
+from wadas.domain.media_queue import MediaQueue
+
+# Minimal headers to let the server recognize uploaded files by their content
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+MP4_HEADER = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom"
+
+
+def generate_certificate(key_path, cert_path):
+    """Generate a self-signed certificate for the local FTPS server."""
+    from OpenSSL import crypto
+
+    key = crypto.PKey()
+    key.generate_key(crypto.TYPE_RSA, 2048)
+    cert = crypto.X509()
+    cert.get_subject().CN = "localhost"
+    cert.set_serial_number(0)
+    cert.gmtime_adj_notBefore(0)
+    cert.gmtime_adj_notAfter(24 * 60 * 60)
+    cert.set_issuer(cert.get_subject())
+    cert.set_pubkey(key)
+    cert.sign(key, "sha256")
+    with open(cert_path, "wt") as f:
+        f.write(crypto.dump_certificate(crypto.FILETYPE_PEM, cert).decode("utf-8"))
+    with open(key_path, "wt") as f:
+        f.write(crypto.dump_privatekey(crypto.FILETYPE_PEM, key).decode("utf-8"))
+
+
+def percentiles(samples):
+    """Return p50, p90, p99 and max of a list of samples (in milliseconds)."""
+    if not samples:
+        return "n/a"
+    samples = sorted(samples)
+    values = [samples[min(len(samples) - 1, int(len(samples) * p))] for p in (0.5, 0.9, 0.99)]
+    values.append(samples[-1])
+    return "p50 %.1f ms, p90 %.1f ms, p99 %.1f ms, max %.1f ms" % tuple(v * 1000 for v in values)
+
+
+class LoadStats:
+    """Measurements collected by simulated cameras and by the media queue consumer."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.upload_latencies = []
+        self.enqueue_latencies = []
+        # file name -> time the upload completed on client side
+        self.uploaded = {}
+        self.failed_uploads = 0
+        self.dropped_connections = 0
+        self.bytes_sent = 0
+
+
+def camera_client(args, camera_id, password, payloads, stats, stop_event):
+    """Simulate a camera uploading files at the configured rate."""
+    interval = 1.0 / args.rate if args.rate else 0
+    ftp = None
+    for index in range(args.files):
+        if stop_event.is_set():
+            break
+        started = time.monotonic()
+        is_video = random.random() < args.video_ratio
+        file_name = f"{camera_id}_{index}.{'mp4' if is_video else 'jpg'}"
+        payload = payloads["mp4" if is_video else "jpg"]
+        try:
+            if ftp is None:
+                ftp = FTP_TLS(timeout=args.timeout)
+                ftp.connect("127.0.0.1", args.port)
+                ftp.login(camera_id, password)
+                ftp.prot_p()
+            ftp.storbinary(f"STOR {file_name}", io.BytesIO(payload))
+            uploaded = time.monotonic()
+            with stats.lock:
+                stats.upload_latencies.append(uploaded - started)
+                stats.uploaded[file_name] = uploaded
+                stats.bytes_sent += len(payload)
+        except all_errors as e:
+            with stats.lock:
+                stats.failed_uploads += 1
+                # FTP error replies keep the connection open, socket errors do not
+                if isinstance(e, (OSError, EOFError)):
+                    stats.dropped_connections += 1
+            if ftp:
+                ftp.close()
+            ftp = None
+        if interval:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    if ftp:
+        try:
+            ftp.quit()
+        except all_errors:
+            ftp.close()
+
+
+def media_consumer(stats, stop_event):
+    """Drain media_queue recording time between upload completion and enqueueing."""
+    while not stop_event.is_set():
+        try:
+            cur_media = media_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        file_name = os.path.basename(cur_media["media_path"])
+        with stats.lock:
+            if (uploaded := stats.uploaded.get(file_name)) is not None:
+                # Media queue stamps media with their (monotonic) enqueue time
+                stats.enqueue_latencies.append(max(0.0, cur_media["arrival_time"] - uploaded))
+        os.remove(cur_media["media_path"])
+
+
+def main(args):
+    work_dir = tempfile.mkdtemp(prefix="wadas_ftps_load_")
+    cert_path = args.certificate or os.path.join(work_dir, "server.pem")
+    key_path = args.key or os.path.join(work_dir, "key.pem")
+    if not (args.certificate and args.key):
+        generate_certificate(key_path, cert_path)
+
+    MediaQueue.max_size = args.queue_size
+    server = FTPsServer(
+        "127.0.0.1",
+        args.port,
+        list(range(args.passive_port_start, args.passive_port_start + args.cameras * 2)),
+        args.cameras * 2,
+        args.cameras * 2,
+        cert_path,
+        key_path,
+        work_dir,
+        args.server_type,
+        args.max_upload_rate,
+    )
+    cameras = {}
+    for i in range(args.cameras):
+        camera_id = f"Camera{i}"
+        cameras[camera_id] = f"pass{i}"
+        os.makedirs(os.path.join(work_dir, camera_id))
+        server.add_user(camera_id, cameras[camera_id], os.path.join(work_dir, camera_id))
+
+    payloads = {
+        "jpg": JPEG_HEADER + os.urandom(args.image_size * 1024),
+        "mp4": MP4_HEADER + os.urandom(args.video_size * 1024),
+    }
+    stats = LoadStats()
+    stop_event = threading.Event()
+    consumer_stop_event = threading.Event()
+
+    server_thread = server.run()
+    time.sleep(1)
+    consumer = threading.Thread(target=media_consumer, args=(stats, consumer_stop_event))
+    consumer.start()
+
+    cpu_start = os.times()
+    wall_start = time.monotonic()
+    clients = [
+        threading.Thread(
+            target=camera_client, args=(args, camera_id, password, payloads, stats, stop_event)
+        )
+        for camera_id, password in cameras.items()
+    ]
+    for client in clients:
+        client.start()
+    try:
+        for client in clients:
+            client.join()
+    except KeyboardInterrupt:
+        stop_event.set()
+        for client in clients:
+            client.join()
+    upload_time = time.monotonic() - wall_start
+
+    # Let the last received files reach the queue
+    deadline = time.monotonic() + args.timeout
+    while len(stats.enqueue_latencies) < len(stats.uploaded) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    consumer_stop_event.set()
+    consumer.join()
+    cpu_end = os.times()
+    wall_time = time.monotonic() - wall_start
+
+    server.server.close_all()
+    server_thread.join()
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    cpu_time = (cpu_end.user - cpu_start.user) + (cpu_end.system - cpu_start.system)
+    uploaded_files = len(stats.upload_latencies)
+    print(f"Server type:          {server.server_type.value}")
+    print(f"Cameras:              {args.cameras}")
+    print(f"Uploaded files:       {uploaded_files} in {upload_time:.1f} s")
+    print(
+        "Throughput:           %.1f files/s, %.2f MB/s"
+        % (uploaded_files / upload_time, stats.bytes_sent / upload_time / 2**20)
+    )
+    print(f"Upload latency:       {percentiles(stats.upload_latencies)}")
+    print(f"Time to enqueue:      {percentiles(stats.enqueue_latencies)}")
+    print(f"Enqueued files:       {len(stats.enqueue_latencies)}")
+    print(f"Failed uploads:       {stats.failed_uploads}")
+    print(f"Dropped connections:  {stats.dropped_connections}")
+    print(f"CPU usage:            {100 * cpu_time / wall_time:.1f}% (one core = 100%)")
+    if args.server_type == FTPsServer.ServerTypes.MULTIPROCESS.value:
+        print("                      (connection processes are not included)")
+    print(f"Server metrics:       {server.get_metrics()}")
+    queue_metrics = media_queue.metrics()
+    print(
+        "Media queue:          dropped %d, coalesced %d, avg wait %.1f ms"
+        % (
+            queue_metrics["dropped"],
+            queue_metrics["coalesced"],
+            queue_metrics["avg_wait_time"] * 1000,
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="FTPS ingestion load test: simulates cameras uploading media to WADAS."
+    )
+    parser.add_argument("--cameras", type=int, default=10, help="Number of simulated cameras")
+    parser.add_argument("--files", type=int, default=20, help="Files uploaded by each camera")
+    parser.add_argument(
+        "--rate", type=float, default=1.0, help="Uploads per second per camera (0: no pacing)"
+    )
+    parser.add_argument("--image-size", type=int, default=500, help="Image size in KB")
+    parser.add_argument("--video-size", type=int, default=5000, help="Video size in KB")
+    parser.add_argument(
+        "--video-ratio", type=float, default=0.1, help="Fraction of uploads being videos"
+    )
+    parser.add_argument(
+        "--server-type",
+        choices=[server_type.value for server_type in FTPsServer.ServerTypes],
+        default=FTPsServer.ServerTypes.THREADED.value,
+    )
+    parser.add_argument(
+        "--max-upload-rate", type=int, default=0, help="Bytes per second per connection"
+    )
+    parser.add_argument("--queue-size", type=int, default=MediaQueue.max_size)
+    parser.add_argument("--port", type=int, default=21210)
+    parser.add_argument("--passive-port-start", type=int, default=60000)
+    parser.add_argument("--timeout", type=float, default=30, help="Client timeout in seconds")
+    parser.add_argument("--certificate", type=str, help="SSL certificate (default: self-signed)")
+    parser.add_argument("--key", type=str, help="SSL key (default: self-signed)")
+    main(parser.parse_args())
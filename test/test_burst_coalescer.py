@@ -0,0 +1,53 @@
+from wadas.domain.burst_coalescer import BurstCoalescer
+
+
+def media(camera_id, index):
+    return {"media_path": f"{camera_id}_{index}.jpg", "media_id": index, "camera_id": camera_id}
+
+
+def test_images_within_window_are_grouped():
+    coalescer = BurstCoalescer(window=3)
+    assert coalescer.add(media("cam1", 0), now=0) == []
+    assert coalescer.add(media("cam1", 1), now=1) == []
+    assert coalescer.add(media("cam2", 0), now=2) == []
+    assert coalescer.next_timeout(now=2) == 1
+    assert coalescer.pop_expired(now=2.5) == []
+
+    bursts = coalescer.pop_expired(now=3)
+    assert len(bursts) == 1
+    assert bursts[0]["camera_id"] == "cam1"
+    assert bursts[0]["media_path"] == "cam1_0.jpg"
+    assert [item["media_id"] for item in bursts[0]["media_batch"]] == [0, 1]
+
+    # Single image bursts are processed as plain media
+    assert coalescer.pop_expired(now=5) == [media("cam2", 0)]
+    assert not len(coalescer)
+    assert coalescer.next_timeout() is None
+
+
+def test_expired_bursts_are_returned_on_add():
+    coalescer = BurstCoalescer(window=3)
+    coalescer.add(media("cam1", 0), now=0)
+    ready = coalescer.add(media("cam1", 1), now=4)
+    assert ready == [media("cam1", 0)]
+    assert coalescer.pop_camera("cam1") == media("cam1", 1)
+    assert coalescer.pop_camera("cam1") is None
+
+
+def test_max_burst_size():
+    coalescer = BurstCoalescer(window=60)
+    ready = []
+    for index in range(BurstCoalescer.MAX_BURST_SIZE):
+        ready.extend(coalescer.add(media("cam1", index), now=0))
+    assert len(ready) == 1
+    assert len(ready[0]["media_batch"]) == BurstCoalescer.MAX_BURST_SIZE
+    assert not len(coalescer)
+
+
+def test_window_starts_at_arrival_time():
+    coalescer = BurstCoalescer(window=3)
+    # Images waited in media queue: the window is already elapsed on dequeue
+    coalescer.add({**media("cam1", 0), "arrival_time": 0}, now=5)
+    assert coalescer.next_timeout(now=5) == 0
+    ready = coalescer.add({**media("cam1", 1), "arrival_time": 4}, now=5)
+    assert [item["media_id"] for item in ready] == [0]
@@ -19,10 +19,14 @@ from wadas.domain.fastapi_actuator_server import FastAPIActuatorServer
 from wadas.domain.feeder_actuator import FeederActuator
 from wadas.domain.ftp_camera import FTPCamera
 from wadas.domain.ftps_server import DummyAuthorizer, FTPsServer, TLS_FTP_WADAS_Handler
+from wadas.domain.media_queue import MediaQueue
+from wadas.domain.media_store import MediaStore
 from wadas.domain.notification_area import NotificationArea
 from wadas.domain.notifier import Notifier
 from wadas.domain.operation_mode import OperationMode
+from wadas.domain.retention import RetentionManager, RetentionPolicy
 from wadas.domain.roadsign_actuator import RoadSignActuator
+from wadas.domain.stream_camera import StreamCamera
 from wadas.domain.tunnel import Tunnel
 from wadas.domain.usb_camera import USBCamera
 
@@ -51,6 +55,22 @@ def init():
     OperationMode.enforce_privacy_remove_original_img = False
     OperationMode.enforce_privacy_remove_detection_img = False
     OperationMode.enforce_privacy_remove_classification_img = False
+    OperationMode.media_workers = 2
+    OperationMode.burst_window = 0
+    MediaQueue.durable = True
+    MediaQueue.max_size = 500
+    MediaQueue.overflow_policy = MediaQueue.OverflowPolicy.DROP_OLDEST
+    StreamCamera.decode_workers = 4
+    MediaStore.enabled = True
+    MediaStore.image_format = "jpeg"
+    RetentionManager.enabled = False
+    RetentionManager.archive_folder = ""
+    RetentionManager.table_policies = {
+        table: RetentionPolicy() for table in RetentionManager.table_policies
+    }
+    RetentionManager.media_policies = {
+        media_type: RetentionPolicy() for media_type in RetentionManager.media_policies
+    }
     Tunnel.tunnels = None
 
 
@@ -218,6 +238,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode: ''
@@ -226,6 +258,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -417,6 +456,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode: ''
@@ -425,6 +476,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -563,6 +621,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode: ''
@@ -571,6 +641,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -683,6 +760,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode: ''
@@ -691,6 +780,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -811,6 +907,18 @@ camera_detection_params:
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode: ''
@@ -819,6 +927,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -1472,26 +1587,42 @@ cameras:
   backend: 1400
   enable_mot_det: true
   enabled: false
+  exclusion_zones: []
   id: cvbdfg
   index: 0
   name: ASUS USB2.0 Webcam
   path: {}
   pid: 10371
+  record_clips: false
   type: USB Camera
   vid: 7119
 - actuators: []
   backend: 1401
   enable_mot_det: false
   enabled: true
+  exclusion_zones: []
   id: cvbdfg2
   index: 1
   name: ASUS USB3.1 Webcam
   path: {}
   pid: 10372
+  record_clips: false
   type: USB Camera
   vid: 7120
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode: ''
@@ -1500,6 +1631,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {}
@@ -1735,12 +1873,26 @@ ftps_server:
   ip: 1.2.3.4
   max_conn: 50
   max_conn_per_ip: 5
+  max_upload_rate: 0
   passive_ports:
   - 1234
   - 5678
   port: 567
+  server_type: threaded
   ssl_certificate: /Documents/ssl/eshare_crt.pem
   ssl_key: /Documents/ssl/eshare_key.pem
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode: ''
@@ -1749,6 +1901,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2114,6 +2273,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification:
   Email:
     enabled: false
@@ -2130,6 +2301,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2163,6 +2341,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification:
   Email:
     enabled: true
@@ -2179,6 +2369,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2298,6 +2495,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas:
   area1:
@@ -2324,6 +2533,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2362,6 +2578,11 @@ cameras: []
 camera_detection_params: {{}}
 database: ''
 ftps_server: []
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: []
 operation_mode:
 privacy:
@@ -2369,6 +2590,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2540,6 +2768,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode:
@@ -2549,6 +2789,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2634,6 +2881,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode:
@@ -2643,6 +2902,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2730,6 +2996,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode:
@@ -2739,6 +3017,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2829,6 +3114,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode:
@@ -2839,6 +3136,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
@@ -2947,6 +3251,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode:
@@ -2957,6 +3273,13 @@ privacy:
   remove_classification_img: false
   remove_detection_img: false
   remove_original_image: false
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels:
 - camera_entrance_1: camera_entrance1
   camera_entrance_2: camera_entrance2
@@ -3053,6 +3376,18 @@ camera_detection_params: {{}}
 cameras: []
 database: ''
 ftps_server: ''
+media_processing:
+  burst_window: 0
+  durable_queue: true
+  queue_max_size: 500
+  queue_overflow_policy: drop_oldest
+  stream_decode_workers: 4
+  workers: 2
+media_store:
+  enabled: true
+  folder: media_store
+  image_format: jpeg
+  image_quality: 90
 notification: ''
 notification_areas: {{}}
 operation_mode:
@@ -3063,8 +3398,296 @@ privacy:
   remove_classification_img: true
   remove_detection_img: true
   remove_original_image: true
+retention:
+  archive_folder: ''
+  batch_size: 500
+  enabled: false
+  interval: 3600
+  media: {{}}
+  tables: {{}}
 tunnels: []
 uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
 version: {__version__}
 """
     )
+
+
+@patch(
+    "builtins.open",
+    new_callable=OpenStringMock,
+    read_data=f"""
+actuator_server:
+actuators: []
+ai_model:
+  ai_class_threshold: 0
+  ai_classification_device: auto
+  ai_classification_model_version: DFv1.2
+  ai_detect_threshold: 0
+  ai_detection_device: auto
+  ai_detection_model_version: MDV5-yolov5
+  ai_language: ''
+  ai_tunnel_mode_detect_threshold: 0
+  ai_tunnel_mode_detection_device: auto
+  ai_tunnel_mode_detection_model_version: MDV6b-yolov9c
+  ai_video_fps: 1
+cameras: []
+camera_detection_params: {{}}
+database: ''
+ftps_server: []
+media_processing:
+  burst_window: 3
+  durable_queue: false
+  queue_max_size: 20
+  queue_overflow_policy: coalesce
+  stream_decode_workers: 8
+  workers: 6
+notification: []
+operation_mode: ''
+privacy: ''
+tunnels: []
+uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
+version: {__version__}
+""",
+)
+def test_load_media_processing_config(mock_file, init):
+    assert not load_configuration_from_file("")["errors_on_load"]
+    assert OperationMode.media_workers == 6
+    assert OperationMode.burst_window == 3
+    assert not MediaQueue.durable
+    assert MediaQueue.max_size == 20
+    assert MediaQueue.overflow_policy == MediaQueue.OverflowPolicy.COALESCE
+    assert StreamCamera.decode_workers == 8
+
+
+@patch(
+    "builtins.open",
+    new_callable=OpenStringMock,
+    read_data=f"""
+actuator_server:
+actuators: []
+ai_model:
+  ai_class_threshold: 0
+  ai_classification_device: auto
+  ai_classification_model_version: DFv1.2
+  ai_detect_threshold: 0
+  ai_detection_device: auto
+  ai_detection_model_version: MDV5-yolov5
+  ai_language: ''
+  ai_tunnel_mode_detect_threshold: 0
+  ai_tunnel_mode_detection_device: auto
+  ai_tunnel_mode_detection_model_version: MDV6b-yolov9c
+  ai_video_fps: 1
+cameras: []
+camera_detection_params: {{}}
+database: ''
+ftps_server: []
+notification: []
+operation_mode: ''
+privacy: ''
+tunnels: []
+uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
+version: {__version__}
+""",
+)
+def test_load_config_without_media_processing_key(mock_file, init):
+    OperationMode.media_workers = 6
+    assert not load_configuration_from_file("")["errors_on_load"]
+    assert OperationMode.media_workers == 2
+
+
+@patch("builtins.open", new_callable=OpenStringMock, create=True)
+def test_save_media_processing_config(mock_file, init):
+    OperationMode.media_workers = 8
+    MediaQueue.max_size = 100
+    MediaQueue.overflow_policy = MediaQueue.OverflowPolicy.COALESCE
+    save_configuration_to_file("", "39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede")
+    assert (
+        "media_processing:\n  burst_window: 0\n  durable_queue: true\n  queue_max_size: 100\n"
+        "  queue_overflow_policy: coalesce\n  stream_decode_workers: 4\n  workers: 8\n"
+        in mock_file.dump()
+    )
+
+
+@patch("builtins.open", new_callable=OpenStringMock, create=True)
+def test_save_retention_config(mock_file, init):
+    RetentionManager.enabled = True
+    RetentionManager.table_policies["detection_events"] = RetentionPolicy(
+        max_age_days=365, keep_classified_as=["wolf"]
+    )
+    RetentionManager.media_policies["original"] = RetentionPolicy(max_size_mb=1024)
+    save_configuration_to_file("", "39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede")
+    assert (
+        "retention:\n  archive_folder: ''\n  batch_size: 500\n  enabled: true\n"
+        "  interval: 3600\n  media:\n    original:\n      keep_classified_as: []\n"
+        "      max_age_days: null\n      max_rows: null\n      max_size_mb: 1024\n"
+        "  tables:\n    detection_events:\n      keep_classified_as:\n      - wolf\n"
+        "      max_age_days: 365\n      max_rows: null\n      max_size_mb: null\n"
+        in mock_file.dump()
+    )
+
+
+@patch(
+    "builtins.open",
+    new_callable=OpenStringMock,
+    read_data=f"""
+actuator_server:
+actuators: []
+ai_model:
+  ai_class_threshold: 0
+  ai_classification_device: auto
+  ai_classification_model_version: DFv1.2
+  ai_detect_threshold: 0
+  ai_detection_device: auto
+  ai_detection_model_version: MDV5-yolov5
+  ai_language: ''
+  ai_tunnel_mode_detect_threshold: 0
+  ai_tunnel_mode_detection_device: auto
+  ai_tunnel_mode_detection_model_version: MDV6b-yolov9c
+  ai_video_fps: 1
+cameras: []
+camera_detection_params: {{}}
+database: ''
+ftps_server: []
+notification: []
+operation_mode: ''
+privacy: ''
+retention:
+  archive_folder: archive
+  enabled: true
+  interval: 600
+  media:
+    video_frames:
+      max_age_days: 1
+  tables:
+    actuation_events:
+      max_rows: 10000
+tunnels: []
+uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
+version: {__version__}
+""",
+)
+def test_load_retention_config(mock_file, init):
+    assert not load_configuration_from_file("")["errors_on_load"]
+    assert RetentionManager.enabled
+    assert RetentionManager.interval == 600
+    assert RetentionManager.batch_size == 500
+    assert RetentionManager.archive_folder == "archive"
+    assert RetentionManager.media_policies["video_frames"].max_age_days == 1
+    assert not RetentionManager.media_policies["original"].enabled
+    assert RetentionManager.table_policies["actuation_events"].max_rows == 10000
+    assert not RetentionManager.table_policies["detection_events"].enabled
+
+
+@patch(
+    "builtins.open",
+    new_callable=OpenStringMock,
+    read_data=f"""
+actuator_server:
+actuators: []
+ai_model:
+  ai_class_threshold: 0
+  ai_classification_device: auto
+  ai_classification_model_version: DFv1.2
+  ai_detect_threshold: 0
+  ai_detection_device: auto
+  ai_detection_model_version: MDV5-yolov5
+  ai_language: ''
+  ai_tunnel_mode_detect_threshold: 0
+  ai_tunnel_mode_detection_device: auto
+  ai_tunnel_mode_detection_model_version: MDV6b-yolov9c
+  ai_video_fps: 1
+cameras: []
+camera_detection_params: {{}}
+database: ''
+ftps_server: []
+media_store:
+  enabled: true
+  image_format: webp
+  image_quality: 75
+notification: []
+operation_mode: ''
+privacy: ''
+tunnels: []
+uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
+version: {__version__}
+""",
+)
+def test_load_media_store_config(mock_file, init):
+    assert not load_configuration_from_file("")["errors_on_load"]
+    assert MediaStore.enabled
+    assert MediaStore.folder == "media_store"
+    assert MediaStore.image_format == "webp"
+    assert MediaStore.image_quality == 75
+
+
+@patch(
+    "builtins.open",
+    new_callable=OpenStringMock,
+    read_data=f"""
+actuator_server:
+actuators: []
+ai_model:
+  ai_class_threshold: 0
+  ai_classification_device: auto
+  ai_classification_model_version: DFv1.2
+  ai_detect_threshold: 0
+  ai_detection_device: auto
+  ai_detection_model_version: MDV5-yolov5
+  ai_language: ''
+  ai_tunnel_mode_detect_threshold: 0
+  ai_tunnel_mode_detection_device: auto
+  ai_tunnel_mode_detection_model_version: MDV6b-yolov9c
+  ai_video_fps: 1
+cameras: []
+camera_detection_params: {{}}
+database: ''
+ftps_server: []
+notification: []
+operation_mode: ''
+privacy: ''
+tunnels: []
+uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
+version: {__version__}
+""",
+)
+def test_load_config_without_media_store(mock_file, init, monkeypatch):
+    monkeypatch.setattr(MediaStore, "enabled", True)
+    assert not load_configuration_from_file("")["errors_on_load"]
+    # Configurations created before media store keep their media layout
+    assert not MediaStore.enabled
+
+
+@patch(
+    "builtins.open",
+    new_callable=OpenStringMock,
+    read_data=f"""
+actuator_server:
+actuators: []
+ai_model:
+  ai_class_threshold: 0
+  ai_classification_device: auto
+  ai_classification_model_version: DFv1.2
+  ai_detect_threshold: 0
+  ai_detection_device: auto
+  ai_detection_model_version: MDV5-yolov5
+  ai_language: ''
+  ai_tunnel_mode_detect_threshold: 0
+  ai_tunnel_mode_detection_device: auto
+  ai_tunnel_mode_detection_model_version: MDV6b-yolov9c
+  ai_video_fps: 1
+cameras: []
+camera_detection_params: {{}}
+database: ''
+ftps_server: []
+media_store:
+  image_format: gif
+notification: []
+operation_mode: ''
+privacy: ''
+tunnels: []
+uuid: 39f89e5c-56bb-4ab3-8cb0-dd8450cc8ede
+version: {__version__}
+""",
+)
+def test_load_media_store_config_with_unsupported_format(mock_file, init):
+    assert load_configuration_from_file("")["errors_on_load"]
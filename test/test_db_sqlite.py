@@ -2,12 +2,13 @@ import datetime
 import logging
 
 import pytest
-from sqlalchemy import update
+from sqlalchemy import text, update
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm.session import Session
 
 from wadas._version import __dbversion__
-from wadas.domain.database import DataBase, SQLiteDataBase
+from wadas.domain.actuator import Actuator as DomainActuator
+from wadas.domain.database import DataBase, DBUser, SQLiteDataBase
 from wadas.domain.db_model import (
     ActuationEvent,
     Actuator,
@@ -21,6 +22,9 @@ from wadas.domain.db_model import (
     USBCamera,
     camera_actuator_association,
 )
+from wadas.domain.detection_event import DetectionEvent as DomainDetectionEvent
+from wadas.domain.feeder_actuator import FeederActuator as DomainFeederActuator
+from wadas.domain.ftp_camera import FTPCamera as DomainFTPCamera
 
 logger = logging.getLogger(__name__)
 
@@ -248,3 +252,107 @@ def test_create_metadata(db):
     assert time_delta.seconds == 0
     assert row.description == "WADAS database"
     assert row.project_uuid == "FAKE_UUID"
+
+
+def test_id_cache(db):
+    db, session = db
+    camera = DomainFTPCamera("Camera1", "/tmp", True)
+    actuator = DomainFeederActuator("Actuator1", True)
+    db.insert_into_db(camera)
+    db.insert_into_db(actuator)
+    assert DataBase.camera_db_ids == {"Camera1": 1}
+    assert DataBase.actuator_db_ids == {"Actuator1": 1}
+
+    # Cached ids are resolved without querying the db
+    DataBase.camera_db_ids["Camera1"] = 42
+    assert db.get_camera_id("Camera1") == 42
+    db.load_id_cache()
+    assert db.get_camera_id("Camera1") == 1
+
+    db.update_camera(camera, delete_camera=True)
+    db.update_actuator(actuator, delete_actuator=True)
+    assert DataBase.camera_db_ids == {}
+    assert DataBase.actuator_db_ids == {}
+    assert db.get_camera_id("Camera1") is None
+    assert db.get_actuator_id("Actuator1") is None
+
+    DataBase.destroy_instance()
+    assert DataBase.camera_db_ids == {}
+
+
+def test_session_factory_cached(db):
+    db, session = db
+    factory = DataBase.session_factory
+    assert factory is not None
+    DataBase.create_session().close()
+    assert DataBase.session_factory is factory
+
+
+def test_sqlite_file_pragmas(init, tmp_path):
+    assert DataBase.initialize(
+        DataBase.DBTypes.SQLITE, str(tmp_path / "wadas.sqlite"), None, "", ""
+    )
+    try:
+        session = DataBase.create_session()
+        assert session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        # NORMAL synchronous mode
+        assert session.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert session.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        session.close()
+    finally:
+        DataBase.destroy_instance()
+
+
+def test_users_listeners(db, monkeypatch):
+    db, session = db
+    updated_users = []
+    monkeypatch.setattr(DataBase, "users_listeners", [updated_users.append])
+    db.insert_into_db(DBUser("viewer", "hash", "viewer@example.com", "Viewer"))
+
+    assert db.update_user_role("viewer", "Operator")
+    assert db.update_user_password("viewer", "new_hash")
+    assert db.update_user_email("viewer", "operator@example.com")
+    assert db.delete_user("viewer")
+    assert updated_users == ["viewer"] * 4
+    # Users not found are not notified
+    assert not db.delete_user("viewer")
+    assert len(updated_users) == 4
+
+
+def test_lookups_listeners(db, monkeypatch):
+    db, session = db
+    updated_lookups = []
+    monkeypatch.setattr(
+        DataBase, "lookups_listeners", [lambda *lookup: updated_lookups.append(lookup)]
+    )
+    camera = DomainFTPCamera("Camera1", "/tmp", True)
+    db.insert_into_db(camera)
+    assert updated_lookups == [("cameras", None)]
+    db.update_camera(camera)
+    assert updated_lookups[-1] == ("cameras", None)
+
+    detection_event = DomainDetectionEvent(
+        "Camera1",
+        datetime.datetime.now(),
+        "o.jpg",
+        "d.jpg",
+        {"detections": None},
+        True,
+        classified_animals=[{"classification": ["fox", 0.9]}],
+    )
+    db.insert_into_db(detection_event)
+    assert updated_lookups[-1] == ("animals", "fox")
+
+
+def test_sanitize_db_notifies_deleted_cameras(db, monkeypatch):
+    db, session = db
+    db.insert_into_db(DomainFTPCamera("Camera1", "/tmp", True))
+    updated_lookups = []
+    monkeypatch.setattr(
+        DataBase, "lookups_listeners", [lambda *lookup: updated_lookups.append(lookup)]
+    )
+    # Camera no longer configured is soft deleted from db
+    monkeypatch.setattr("wadas.domain.database.cameras", [])
+    monkeypatch.setattr(DomainActuator, "actuators", {})
+    db.sanitize_db()
+    assert updated_lookups == [("cameras", None)]
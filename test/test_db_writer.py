@@ -0,0 +1,378 @@
+import datetime
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from wadas._version import __dbversion__
+from wadas.domain.actuator import ActuatorBatteryStatus, ActuatorTemperatureStatus
+from wadas.domain.database import DataBase
+from wadas.domain.db_model import ActuatorBatteryStatus as ORMActuatorBatteryStatus
+from wadas.domain.db_model import ClassifiedAnimals
+from wadas.domain.db_model import DetectionEvent as ORMDetectionEvent
+from wadas.domain.db_model import (
+    DetectionStats,
+    SpeciesStats,
+    TelemetryStats,
+    TunnelStats,
+)
+from wadas.domain.db_writer import DBWriter
+from wadas.domain.detection_event import DetectionEvent
+from wadas.domain.feeder_actuator import FeederActuator
+from wadas.domain.ftp_camera import FTPCamera
+from wadas.domain.utils import get_precise_timestamp
+
+
+def test_operations_written_in_order_and_batched():
+    batches = []
+    writer = DBWriter(batches.append)
+    gate = threading.Event()
+    # First operation blocks the writer so that the following ones get batched together
+    assert writer.submit(gate.wait)
+    for index in range(10):
+        assert writer.submit(print, index)
+    gate.set()
+    writer.flush()
+    assert writer.pending == 0
+    writer.stop()
+
+    operations = [operation for batch in batches for operation in batch]
+    assert [args for _, args in operations[1:]] == [(index,) for index in range(10)]
+    assert len(batches) < len(operations)
+
+
+def test_batch_size(monkeypatch):
+    monkeypatch.setattr(DBWriter, "BATCH_SIZE", 3)
+    batches = []
+    gate = threading.Event()
+    writer = DBWriter(lambda batch: (gate.wait(), batches.append(batch)))
+    for index in range(7):
+        writer.submit(print, index)
+    gate.set()
+    writer.stop()
+    assert sum(len(batch) for batch in batches) == 7
+    assert all(len(batch) <= 3 for batch in batches)
+
+
+def test_submit_after_stop():
+    writer = DBWriter(lambda batch: None)
+    writer.stop()
+    assert not writer.submit(print)
+
+
+def test_submit_on_full_queue(monkeypatch):
+    monkeypatch.setattr(DBWriter, "max_size", 1)
+    monkeypatch.setattr(DBWriter, "PUT_TIMEOUT", 0.1)
+    gate = threading.Event()
+    writer = DBWriter(lambda batch: gate.wait())
+    assert writer.submit(print)
+    # Wait for the writer to take the first operation
+    while writer.pending:
+        pass
+    assert writer.submit(print)
+    # Producers wait for a free slot, so that operations keep their order
+    submitted = []
+    producer = threading.Thread(target=lambda: submitted.append(writer.submit(print)))
+    producer.start()
+    producer.join(timeout=0.3)
+    assert producer.is_alive()
+    gate.set()
+    producer.join()
+    assert submitted == [True]
+    writer.stop()
+
+
+def test_batch_error_does_not_stop_writer():
+    written = []
+
+    def execute_batch(batch):
+        if batch[0][1] == ("fail",):
+            raise RuntimeError("failure")
+        written.extend(batch)
+
+    writer = DBWriter(execute_batch)
+    writer.submit(print, "fail")
+    writer.flush()
+    writer.submit(print, "ok")
+    writer.stop()
+    assert [args for _, args in written] == [("ok",)]
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    if DataBase.wadas_db_engine is not None:
+        DataBase.destroy_instance()
+    DataBase.wadas_db = None
+    # File database, as in memory ones are not shared with the writer thread
+    db_path = str(tmp_path / "wadas.sqlite")
+    assert DataBase.initialize(DataBase.DBTypes.SQLITE, db_path, None, "", "") is True
+    db = DataBase.get_instance()
+    assert db.create_database() is True
+    camera = FTPCamera("Camera1", "/tmp", True)
+    DataBase.insert_into_db(camera)
+    yield db
+    DataBase.destroy_instance()
+
+
+def test_write_behind_detection_event(sqlite_db):
+    detection_event = DetectionEvent(
+        "Camera1",
+        get_precise_timestamp(),
+        "original.jpg",
+        "detection.jpg",
+        {"detections": None},
+        True,
+    )
+    sqlite_db.enqueue_insert(detection_event)
+    detection_event.classified_animals = [{"classification": ["fox", 0.9]}]
+    detection_event.classification_media_path = "classification.jpg"
+    sqlite_db.enqueue_detection_event_update(detection_event)
+    # Updates are idempotent
+    sqlite_db.enqueue_detection_event_update(detection_event)
+    DataBase.stop_writer()
+
+    assert detection_event.db_id is not None
+    session = DataBase.create_session()
+    try:
+        orm_event = session.get(ORMDetectionEvent, detection_event.db_id)
+        assert orm_event.classification_img_path == "classification.jpg"
+        animals = session.query(ClassifiedAnimals).all()
+        assert [(animal.classified_animal, animal.probability) for animal in animals] == [
+            ("fox", 0.9)
+        ]
+    finally:
+        session.close()
+
+
+def test_write_behind_failure_does_not_affect_batch(sqlite_db):
+    missing_camera_event = DetectionEvent(
+        "Missing", get_precise_timestamp(), "o.jpg", "d.jpg", {"detections": None}, False
+    )
+    detection_event = DetectionEvent(
+        "Camera1", get_precise_timestamp(), "o.jpg", "d.jpg", {"detections": None}, False
+    )
+    sqlite_db.enqueue_insert(missing_camera_event)
+    sqlite_db.enqueue_insert(detection_event)
+    DataBase.stop_writer()
+
+    assert missing_camera_event.db_id is None
+    session = DataBase.create_session()
+    try:
+        assert session.query(ORMDetectionEvent).count() == 1
+    finally:
+        session.close()
+
+
+def test_write_behind_rollback_resets_db_id(sqlite_db, monkeypatch):
+    def failing_stats(*args):
+        raise OperationalError("INSERT INTO detection_stats", {}, Exception("failure"))
+
+    # Event is flushed, getting a db id, before the transaction fails
+    monkeypatch.setattr("wadas.domain.database.add_detection_stats", failing_stats)
+    detection_event = DetectionEvent(
+        "Camera1", get_precise_timestamp(), "o.jpg", "d.jpg", {"detections": None}, False
+    )
+    sqlite_db.enqueue_insert(detection_event)
+    DataBase.stop_writer()
+
+    assert detection_event.db_id is None
+
+
+def test_after_write_callback(sqlite_db):
+    detection_event = DetectionEvent(
+        "Camera1", get_precise_timestamp(), "o.jpg", "d.jpg", {"detections": None}, False
+    )
+    db_ids = []
+
+    def failing_callback():
+        raise RuntimeError("failure")
+
+    sqlite_db.enqueue_insert(detection_event)
+    sqlite_db.enqueue_after_write(failing_callback)
+    sqlite_db.enqueue_after_write(lambda event: db_ids.append(event.db_id), detection_event)
+    DataBase.stop_writer()
+
+    # Callbacks run once the event is committed, failing ones do not affect others
+    assert db_ids == [detection_event.db_id]
+    assert detection_event.db_id is not None
+
+
+def test_after_write_callback_skipped_on_failure(sqlite_db, monkeypatch):
+    failing_time = datetime.datetime(2026, 1, 1)
+
+    def failing_stats(session, camera_db_id, time_stamp):
+        if time_stamp == failing_time:
+            raise OperationalError("INSERT INTO detection_stats", {}, Exception("failure"))
+
+    monkeypatch.setattr("wadas.domain.database.add_detection_stats", failing_stats)
+
+    def new_event(time_stamp):
+        return DetectionEvent("Camera1", time_stamp, "o.jpg", "d.jpg", {"detections": None}, False)
+
+    acked = []
+    write_mark = sqlite_db.write_mark()
+    sqlite_db.enqueue_insert(new_event(failing_time))
+    sqlite_db.enqueue_after_write(acked.append, "failed", since=write_mark)
+    # Failure is recorded also when the callback is written in a later batch
+    DataBase.get_writer().flush()
+    sqlite_db.enqueue_after_write(acked.append, "later", since=write_mark)
+
+    write_mark = sqlite_db.write_mark()
+    sqlite_db.enqueue_insert(new_event(get_precise_timestamp()))
+    # Failures of other threads do not affect callbacks
+    other_thread = threading.Thread(
+        target=sqlite_db.enqueue_insert, args=(new_event(failing_time),)
+    )
+    other_thread.start()
+    other_thread.join()
+    sqlite_db.enqueue_after_write(acked.append, "written", since=write_mark)
+    DataBase.stop_writer()
+
+    assert acked == ["written"]
+
+
+def test_update_db_without_stats_tables(sqlite_db, tmp_path, monkeypatch):
+    monkeypatch.setattr("wadas.domain.database.WADAS_DIR", tmp_path)
+    time_stamp = datetime.datetime(2026, 10, 19, 10, 30)
+    DataBase.insert_into_db(
+        DetectionEvent("Camera1", time_stamp, "o.jpg", "d.jpg", {"detections": None}, False)
+    )
+    # Database created by a version without statistics rollups
+    sqlite_db.populate_db("FAKE_UUID")
+    for table in ("detection_stats", "species_stats", "tunnel_stats", "telemetry_stats"):
+        DataBase.run_query(text(f"DROP TABLE {table};"))
+    DataBase.run_query(text("UPDATE db_metadata SET version='v1.0.0.b7';"))
+
+    sqlite_db.update_db_version()
+
+    assert DataBase.get_db_version() == __dbversion__
+    detection_event = DetectionEvent(
+        "Camera1", time_stamp, "o.jpg", "d.jpg", {"detections": None}, False
+    )
+    sqlite_db.enqueue_insert(detection_event)
+    DataBase.stop_writer()
+    assert detection_event.db_id is not None
+    # Rollups include events stored before the update
+    assert ("hour", time_stamp.replace(minute=0), 2) in get_stats(
+        DetectionStats, "period", "period_start", "detections"
+    )
+
+
+def test_failed_stats_rebuild_does_not_update_db(sqlite_db, tmp_path, monkeypatch):
+    monkeypatch.setattr("wadas.domain.database.WADAS_DIR", tmp_path)
+
+    def failing_rebuild(session):
+        raise OperationalError("DELETE FROM detection_stats", {}, Exception("failure"))
+
+    monkeypatch.setattr("wadas.domain.database.rebuild_stats", failing_rebuild)
+    sqlite_db.populate_db("FAKE_UUID")
+    DataBase.run_query(text("UPDATE db_metadata SET version='v1.0.0.b7';"))
+    with pytest.raises(OperationalError):
+        sqlite_db.update_db_version()
+    assert DataBase.get_db_version() == "v1.0.0.b7"
+
+
+def get_stats(orm_class, *columns):
+    session = DataBase.create_session()
+    try:
+        rows = session.query(orm_class).order_by(orm_class.period, orm_class.period_start).all()
+        return [tuple(getattr(row, column) for column in columns) for row in rows]
+    finally:
+        session.close()
+
+
+def test_stats_rollups(sqlite_db):
+    time_stamp = datetime.datetime(2026, 10, 19, 10, 30)
+    events = [
+        DetectionEvent(
+            "Camera1",
+            time_stamp + datetime.timedelta(hours=hours),
+            "o.jpg",
+            "d.jpg",
+            {"detections": None},
+            True,
+        )
+        for hours in (0, 0, 1)
+    ]
+    for event in events:
+        sqlite_db.enqueue_insert(event)
+    events[0].classified_animals = [{"classification": ["fox", 0.9]}]
+    sqlite_db.enqueue_detection_event_update(events[0])
+    # Classification replaced, previous species no longer counted
+    events[1].classified_animals = [{"classification": ["fox", 0.8]}]
+    sqlite_db.enqueue_detection_event_update(events[1])
+    events[1].classified_animals = [
+        {"classification": ["boar", 0.8]},
+        {"classification": ["boar", 0.7]},
+    ]
+    sqlite_db.enqueue_detection_event_update(events[1])
+    sqlite_db.enqueue_tunnel_stats("Tunnel1", time_stamp, 2, 0)
+    sqlite_db.enqueue_tunnel_stats("Tunnel1", time_stamp, 0, 1)
+    DataBase.stop_writer()
+
+    day = datetime.datetime(2026, 10, 19)
+    assert get_stats(DetectionStats, "period", "period_start", "detections") == [
+        ("day", day, 3),
+        ("hour", day.replace(hour=10), 2),
+        ("hour", day.replace(hour=11), 1),
+    ]
+    species_stats = get_stats(SpeciesStats, "period", "species", "animals")
+    assert sorted(species_stats) == [
+        ("day", "boar", 2),
+        ("day", "fox", 1),
+        ("hour", "boar", 2),
+        ("hour", "fox", 1),
+    ]
+    assert get_stats(TunnelStats, "period", "tunnel_id", "in_count", "out_count") == [
+        ("day", "Tunnel1", 2, 1),
+        ("hour", "Tunnel1", 2, 1),
+    ]
+
+    # Rollups rebuilt from events match incrementally maintained ones
+    DataBase.rebuild_stats()
+    assert get_stats(DetectionStats, "period", "period_start", "detections") == [
+        ("day", day, 3),
+        ("hour", day.replace(hour=10), 2),
+        ("hour", day.replace(hour=11), 1),
+    ]
+    assert sorted(get_stats(SpeciesStats, "period", "species", "animals")) == sorted(species_stats)
+
+
+def test_telemetry_rollups(sqlite_db):
+    DataBase.insert_into_db(FeederActuator("Actuator1", True))
+    now = datetime.datetime.now()
+    old_time_stamp = now - datetime.timedelta(days=40)
+    sqlite_db.insert_into_db(ActuatorBatteryStatus("Actuator1", 12.0, None, None, old_time_stamp))
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    for minutes, voltage in ((1, 12.2), (2, 12.6), (3, 12.4)):
+        sqlite_db.enqueue_insert(
+            ActuatorBatteryStatus(
+                "Actuator1", voltage, 20.0, None, hour + datetime.timedelta(minutes=minutes)
+            )
+        )
+    sqlite_db.enqueue_insert(ActuatorTemperatureStatus("Actuator1", 25.0, 50.0, hour))
+    DataBase.stop_writer()
+
+    rows = get_stats(
+        TelemetryStats, "period", "period_start", "metric", "samples", "min_value", "max_value"
+    )
+    assert ("hour", hour, "battery_voltage", 3, 12.2, 12.6) in rows
+    assert ("hour", hour, "battery_temperature", 3, 20.0, 20.0) in rows
+    assert ("hour", hour, "humidity", 1, 50.0, 50.0) in rows
+    # Battery humidity was not measured
+    assert not [row for row in rows if row[2] == "battery_humidity" and row[1] == hour]
+    old_day = old_time_stamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    assert ("day", old_day, "battery_voltage", 1, 12.0, 12.0) in rows
+    # Raw readings are kept, retention policies apply to them
+    session = DataBase.create_session()
+    try:
+        assert session.query(ORMActuatorBatteryStatus).count() == 4
+    finally:
+        session.close()
+
+    # Rollups rebuilt from raw readings match incrementally maintained ones
+    DataBase.rebuild_stats()
+    assert sorted(
+        get_stats(TelemetryStats, "period", "period_start", "metric", "samples")
+    ) == sorted(row[:4] for row in rows)
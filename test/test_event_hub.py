@@ -0,0 +1,110 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from wadas.domain.event_hub import (
+    EventHub,
+    EventTopics,
+    event_hub,
+    publish_actuator_status,
+    publish_detection_event,
+)
+
+
+@pytest.fixture
+def hub():
+    return EventHub()
+
+
+def test_publish_from_other_thread(hub):
+    async def receive():
+        subscription = hub.subscribe({EventTopics.DETECTION})
+        threads = [
+            threading.Thread(target=hub.publish, args=(topic, {"camera_id": "Camera1"}))
+            for topic in (EventTopics.ACTUATION, EventTopics.DETECTION)
+        ]
+        for thread in threads:
+            thread.start()
+        event = await subscription.get(timeout=5)
+        # Events of other topics are not delivered
+        assert await subscription.get(timeout=0.1) is None
+        hub.unsubscribe(subscription)
+        return event
+
+    event = asyncio.run(receive())
+    assert event["topic"] == "detection"
+    assert event["data"] == {"camera_id": "Camera1"}
+    assert hub.subscribers == 0
+
+
+def test_slow_subscriber_drops_oldest_events(hub, monkeypatch):
+    monkeypatch.setattr(EventHub, "max_queue_size", 3)
+
+    async def receive():
+        subscription = hub.subscribe(set(EventTopics))
+        for index in range(5):
+            hub.publish(EventTopics.DETECTION, {"index": index})
+        await asyncio.sleep(0)  # Let the loop deliver published events
+        return subscription, [(await subscription.get())["data"]["index"] for _ in range(3)]
+
+    subscription, indexes = asyncio.run(receive())
+    assert indexes == [2, 3, 4]
+    assert subscription.overflow
+
+
+def test_resume_from_last_event_id(hub):
+    for index in range(3):
+        hub.publish(EventTopics.DETECTION, {"index": index})
+    hub.publish(EventTopics.ACTUATION, {"index": 3})
+
+    async def resume():
+        subscription = hub.subscribe({EventTopics.DETECTION}, last_event_id=1)
+        return [(await subscription.get(timeout=1))["id"] for _ in range(2)]
+
+    assert asyncio.run(resume()) == [2, 3]
+
+
+def test_published_payloads():
+    async def receive():
+        subscription = event_hub.subscribe(set(EventTopics))
+        detection_event = SimpleNamespace(
+            db_id=7,
+            camera_id="Camera1",
+            time_stamp=None,
+            detected_animals={"detections": None, "count": 2},
+            classified_animals=[{"classification": ["fox", 0.9]}, {"classification": []}],
+        )
+        publish_detection_event(EventTopics.CLASSIFICATION, detection_event)
+        actuator = SimpleNamespace(id="Actuator1", last_update=None)
+        publish_actuator_status(actuator, voltage=3.7)
+        events = [await subscription.get(timeout=1) for _ in range(2)]
+        event_hub.unsubscribe(subscription)
+        return events
+
+    detection, status = asyncio.run(receive())
+    assert detection["data"]["detected_animals"] == 2
+    assert detection["data"]["classified_animals"] == ["fox"]
+    assert status["data"] == {"actuator_id": "Actuator1", "last_update": None, "voltage": 3.7}
+    # Payloads are sent as JSON to web clients
+    json.dumps([detection, status])
+
+
+def test_actuator_status_throttling():
+    async def receive():
+        subscription = event_hub.subscribe({EventTopics.ACTUATOR_STATUS})
+        actuator = SimpleNamespace(id="Throttled", last_update=None)
+        for _ in range(3):
+            publish_actuator_status(actuator, min_interval=60)
+        publish_actuator_status(actuator, voltage=3.7)
+        events = [await subscription.get(timeout=0.1) for _ in range(3)]
+        event_hub.unsubscribe(subscription)
+        return events
+
+    first, second, third = asyncio.run(receive())
+    assert first["data"] == {"actuator_id": "Throttled", "last_update": None}
+    # Polls are throttled, sensor updates are always published
+    assert second["data"]["voltage"] == 3.7
+    assert third is None
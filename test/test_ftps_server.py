@@ -1,3 +1,4 @@
+import io
 import os
 import tempfile
 import time
@@ -6,7 +7,12 @@ from ftplib import FTP
 import pytest
 import util
 
-from wadas.domain.ftps_server import FTPsServer
+from wadas.domain.camera import media_queue
+from wadas.domain.ftps_server import (
+    FTPsServer,
+    TLS_FTP_WADAS_Handler,
+    TLS_ThrottledDTPHandler,
+)
 
 FTP_PORT = 8888
 
@@ -100,3 +106,51 @@ def test_server_restart(ftps_server):
     assert resp == "230 Login successful."
     ftps_server.server.close_all()
     thread.join()
+
+
+def test_serialize_server_type_and_throttling(ftps_server):
+    data = ftps_server.serialize()
+    assert data["server_type"] == "threaded"
+    assert data["max_upload_rate"] == 0
+    data["server_type"] = "async"
+    data["max_upload_rate"] = 1024
+    server = FTPsServer.deserialize(data)
+    assert server.server_type == FTPsServer.ServerTypes.ASYNC
+    assert server.handler.dtp_handler is TLS_ThrottledDTPHandler
+    assert TLS_ThrottledDTPHandler.read_limit == 1024
+
+
+def test_async_server_upload_and_metrics(ftps_server):
+    username = "camera1"
+    password = "pass1"
+    ftps_server.server_type = FTPsServer.ServerTypes.ASYNC
+    add_user(ftps_server, username, password)
+    media_queue.clear()
+    metrics = ftps_server.get_metrics()
+    thread = ftps_server.run()
+    assert thread is not None
+    time.sleep(2)
+
+    ftp = FTP()
+    ftp.connect("127.0.0.1", FTP_PORT)
+    ftp.login(username, password)
+    ftp.storbinary("STOR image.jpg", io.BytesIO(b"\xff\xd8\xff\xe0" + bytes(64)))
+    ftp.storbinary("STOR notes.txt", io.BytesIO(b"not a media"))
+    ftp.quit()
+
+    deadline = time.time() + 5
+    while media_queue.empty() and time.time() < deadline:
+        time.sleep(0.1)
+    cur_media = media_queue.get(timeout=0)
+    assert cur_media["camera_id"] == username
+    assert cur_media["media_path"].endswith("image.jpg")
+    os.remove(cur_media["media_path"])
+    ftps_server.server.close_all()
+    thread.join()
+
+    new_metrics = TLS_FTP_WADAS_Handler.get_metrics()
+    assert new_metrics["logins"] == metrics["logins"] + 1
+    assert new_metrics["files_received"] == metrics["files_received"] + 2
+    assert new_metrics["files_enqueued"] == metrics["files_enqueued"] + 1
+    assert new_metrics["files_rejected"] == metrics["files_rejected"] + 1
+    assert new_metrics["connections_active"] == 0
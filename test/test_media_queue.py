@@ -0,0 +1,185 @@
+from queue import Empty
+
+import pytest
+
+from wadas.domain.media_queue import MediaQueue, MediaQueueJournal
+
+
+@pytest.fixture
+def init():
+    MediaQueue.max_size = 500
+    MediaQueue.overflow_policy = MediaQueue.OverflowPolicy.DROP_OLDEST
+    yield
+    MediaQueue.max_size = 500
+    MediaQueue.overflow_policy = MediaQueue.OverflowPolicy.DROP_OLDEST
+
+
+def media(camera_id, name):
+    return {"media_path": f"/nonexistent/{camera_id}_{name}", "media_id": 0, "camera_id": camera_id}
+
+
+def priority(cur_media):
+    return 1 if cur_media["media_path"].endswith(".mp4") else 0
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get(timeout=0))
+    return [item["media_path"].rsplit("/", 1)[1] for item in items]
+
+
+def test_get_empty_queue(init):
+    queue = MediaQueue()
+    with pytest.raises(Empty):
+        queue.get(timeout=0.01)
+
+
+def test_priority_classes(init):
+    queue = MediaQueue(priority)
+    queue.put(media("cam1", "1.mp4"))
+    queue.put(media("cam2", "1.jpg"))
+    queue.put(media("cam1", "2.mp4"))
+    queue.put(media("cam2", "2.jpg"))
+    assert drain(queue) == ["cam2_1.jpg", "cam2_2.jpg", "cam1_1.mp4", "cam1_2.mp4"]
+
+
+def test_per_camera_fair_queuing(init):
+    queue = MediaQueue()
+    for index in range(3):
+        queue.put(media("cam1", f"{index}.jpg"))
+    queue.put(media("cam2", "0.jpg"))
+    queue.put(media("cam3", "0.jpg"))
+    assert drain(queue) == ["cam1_0.jpg", "cam2_0.jpg", "cam3_0.jpg", "cam1_1.jpg", "cam1_2.jpg"]
+
+
+def test_drop_oldest_from_lowest_priority(init):
+    MediaQueue.max_size = 3
+    queue = MediaQueue(priority)
+    queue.put(media("cam1", "1.mp4"))
+    queue.put(media("cam1", "2.mp4"))
+    queue.put(media("cam2", "1.jpg"))
+    assert queue.put(media("cam3", "1.jpg"))
+    assert drain(queue) == ["cam2_1.jpg", "cam3_1.jpg", "cam1_2.mp4"]
+    assert queue.metrics()["dropped"] == 1
+
+
+def test_drop_incoming_lower_priority(init):
+    MediaQueue.max_size = 2
+    queue = MediaQueue(priority)
+    queue.put(media("cam1", "1.jpg"))
+    queue.put(media("cam2", "1.jpg"))
+    assert not queue.put(media("cam3", "1.mp4"))
+    assert drain(queue) == ["cam1_1.jpg", "cam2_1.jpg"]
+
+
+def test_drop_newest(init):
+    MediaQueue.max_size = 2
+    MediaQueue.overflow_policy = MediaQueue.OverflowPolicy.DROP_NEWEST
+    queue = MediaQueue()
+    queue.put(media("cam1", "1.jpg"))
+    queue.put(media("cam1", "2.jpg"))
+    assert not queue.put(media("cam1", "3.jpg"))
+    assert drain(queue) == ["cam1_1.jpg", "cam1_2.jpg"]
+
+
+def test_coalesce(init):
+    MediaQueue.max_size = 3
+    MediaQueue.overflow_policy = MediaQueue.OverflowPolicy.COALESCE
+    queue = MediaQueue()
+    queue.put(media("cam1", "1.jpg"))
+    queue.put(media("cam1", "2.jpg"))
+    queue.put(media("cam2", "1.jpg"))
+    assert queue.put(media("cam2", "2.jpg"))
+    assert drain(queue) == ["cam1_1.jpg", "cam2_2.jpg", "cam1_2.jpg"]
+    assert queue.metrics()["coalesced"] == 1
+
+
+def test_discarded_media_file_is_removed(init, tmp_path):
+    MediaQueue.max_size = 1
+    queue = MediaQueue()
+    media_file = tmp_path / "old.jpg"
+    media_file.write_bytes(b"")
+    queue.put({"media_path": str(media_file), "media_id": 0, "camera_id": "cam1"})
+    queue.put(media("cam1", "new.jpg"))
+    assert not media_file.exists()
+
+
+def test_metrics(init):
+    queue = MediaQueue(priority)
+    queue.put(media("cam1", "1.jpg"))
+    queue.put(media("cam1", "1.mp4"))
+    queue.put(media("cam2", "1.jpg"))
+    metrics = queue.metrics()
+    assert metrics["depth"] == 3
+    assert metrics["depth_per_priority"] == {0: 2, 1: 1}
+    assert metrics["depth_per_camera"] == {"cam1": 2, "cam2": 1}
+    queue.get(timeout=0)
+    metrics = queue.metrics()
+    assert metrics["enqueued"] == 3
+    assert metrics["dequeued"] == 1
+    assert metrics["max_wait_time"] >= 0
+
+
+def test_journal_recovers_unacknowledged_media(init, tmp_path):
+    journal_path = str(tmp_path / "queue.db")
+    media_files = []
+    for index in range(3):
+        media_file = tmp_path / f"{index}.jpg"
+        media_file.write_bytes(b"")
+        media_files.append(str(media_file))
+
+    queue = MediaQueue()
+    queue.open_journal(journal_path)
+    for media_file in media_files:
+        queue.put({"media_path": media_file, "media_id": "0", "camera_id": "cam1"})
+    processed = queue.get(timeout=0)
+    queue.ack(processed)
+    # Second media is dequeued but not acknowledged (e.g. crash during processing)
+    queue.get(timeout=0)
+    queue.close_journal()
+
+    restarted_queue = MediaQueue()
+    assert restarted_queue.open_journal(journal_path) == 2
+    assert restarted_queue.get(timeout=0)["media_path"] == media_files[1]
+    assert restarted_queue.get(timeout=0)["media_path"] == media_files[2]
+    restarted_queue.close_journal()
+
+
+def test_journal_skips_missing_and_failing_media(init, tmp_path):
+    journal_path = str(tmp_path / "queue.db")
+    media_file = tmp_path / "0.jpg"
+    media_file.write_bytes(b"")
+
+    queue = MediaQueue()
+    queue.open_journal(journal_path)
+    queue.put({"media_path": str(media_file), "media_id": "0", "camera_id": "cam1"})
+    queue.put(media("cam1", "missing.jpg"))
+    queue.close_journal()
+
+    # Media recovered but never dequeued (e.g. quick restarts) are not failing
+    for _ in range(MediaQueueJournal.MAX_ATTEMPTS + 1):
+        queue = MediaQueue()
+        assert queue.open_journal(journal_path) == 1
+        queue.close_journal()
+    # Media failing processing at every run are eventually discarded
+    for _ in range(MediaQueueJournal.MAX_ATTEMPTS):
+        queue = MediaQueue()
+        assert queue.open_journal(journal_path) == 1
+        queue.get(timeout=0)
+        queue.close_journal()
+    queue = MediaQueue()
+    assert queue.open_journal(journal_path) == 0
+    queue.close_journal()
+
+
+def test_journal_reopen_does_not_duplicate_media(init, tmp_path):
+    media_file = tmp_path / "0.jpg"
+    media_file.write_bytes(b"")
+    queue = MediaQueue()
+    queue.open_journal(str(tmp_path / "queue.db"))
+    queue.put({"media_path": str(media_file), "media_id": "0", "camera_id": "cam1"})
+    queue.close_journal()
+    assert queue.open_journal(str(tmp_path / "queue.db")) == 0
+    assert queue.qsize() == 1
+    queue.close_journal()
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from wadas.domain.media_store import MediaStore
+
+
+@pytest.fixture
+def media_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(MediaStore, "folder", str(tmp_path / "media_store"))
+    monkeypatch.setattr(MediaStore, "image_format", "jpeg")
+    return tmp_path
+
+
+def make_image(color):
+    return Image.new("RGB", (64, 48), color)
+
+
+def test_blob_path_is_sharded(media_store):
+    path = MediaStore.put_bytes(b"media", ".bin")
+    blob_id = MediaStore.blob_id(path)
+    assert len(blob_id) == 64
+    assert path == os.path.join(MediaStore.folder, blob_id[:2], blob_id[2:4], f"{blob_id}.bin")
+    with open(path, "rb") as f:
+        assert f.read() == b"media"
+    assert MediaStore.blob_id("detection_output/frame_1.jpg") is None
+
+
+def test_identical_media_stored_once(media_store):
+    first_path = MediaStore.put_image(make_image("red"))
+    assert MediaStore.put_image(make_image("red")) == first_path
+    assert MediaStore.put_image(make_image("blue")) != first_path
+    blobs = [files for _, _, files in os.walk(MediaStore.folder) if files]
+    assert sum(len(files) for files in blobs) == 2
+
+
+@pytest.mark.parametrize("image_format, extension", [("jpeg", ".jpg"), ("webp", ".webp")])
+def test_image_format(media_store, monkeypatch, image_format, extension):
+    monkeypatch.setattr(MediaStore, "image_format", image_format)
+    pil_path = MediaStore.put_image(make_image("green"))
+    # OpenCV images are BGR arrays
+    array_path = MediaStore.put_image(np.zeros((48, 64, 3), dtype=np.uint8))
+    for path in (pil_path, array_path):
+        assert path.endswith(extension)
+        with Image.open(path) as image:
+            assert image.format == image_format.upper()
+            assert image.size == (64, 48)
+
+
+def test_image_quality(media_store, monkeypatch):
+    image = Image.fromarray(np.random.default_rng(0).integers(0, 255, (96, 128, 3), np.uint8))
+    monkeypatch.setattr(MediaStore, "image_quality", 95)
+    high_quality_size = os.path.getsize(MediaStore.put_image(image))
+    monkeypatch.setattr(MediaStore, "image_quality", 30)
+    assert os.path.getsize(MediaStore.put_image(image)) < high_quality_size
+
+
+def test_put_file(media_store):
+    with MediaStore.staging_folder() as folder:
+        video_path = os.path.join(folder, "video_detected.mp4")
+        with open(video_path, "wb") as f:
+            f.write(b"video")
+        stored_path = MediaStore.put_file(video_path)
+        assert not os.path.exists(video_path)
+
+        duplicate_path = os.path.join(folder, "other_video.MP4")
+        with open(duplicate_path, "wb") as f:
+            f.write(b"video")
+        assert MediaStore.put_file(duplicate_path) == stored_path
+        assert not os.path.exists(duplicate_path)
+
+        # Images are encoded with the configured format
+        image_path = os.path.join(folder, "image.png")
+        make_image("red").save(image_path)
+        assert MediaStore.put_file(image_path) == MediaStore.put_image(make_image("red"))
+    assert stored_path.endswith(".mp4")
+    assert not os.path.exists(folder)
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from wadas.domain.media_worker_pool import MediaWorkerPool
+
+
+def media(camera_id, index):
+    return {"media_path": f"{camera_id}_{index}.jpg", "media_id": index, "camera_id": camera_id}
+
+
+def test_per_camera_order_is_preserved():
+    processed = []
+    lock = threading.Lock()
+
+    def handler(cur_media):
+        time.sleep(0.001)
+        with lock:
+            processed.append(cur_media)
+
+    pool = MediaWorkerPool(handler, max_workers=4, max_pending=100)
+    for index in range(20):
+        for camera_id in ("cam1", "cam2", "cam3"):
+            assert pool.submit(media(camera_id, index))
+    assert pool.wait_until_idle(timeout=10)
+    pool.shutdown()
+
+    assert len(processed) == 60
+    for camera_id in ("cam1", "cam2", "cam3"):
+        indexes = [item["media_id"] for item in processed if item["camera_id"] == camera_id]
+        assert indexes == list(range(20))
+
+
+def test_cameras_are_processed_concurrently():
+    release = threading.Event()
+    started = []
+
+    def handler(cur_media):
+        started.append(cur_media["camera_id"])
+        release.wait(timeout=5)
+
+    pool = MediaWorkerPool(handler, max_workers=2)
+    pool.submit(media("cam1", 0))
+    pool.submit(media("cam1", 1))
+    pool.submit(media("cam2", 0))
+    deadline = time.time() + 5
+    while len(started) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+
+    # Second media of cam1 must wait for the first one, cam2 runs in parallel
+    assert sorted(started) == ["cam1", "cam2"]
+    release.set()
+    assert pool.wait_until_idle(timeout=5)
+    pool.shutdown()
+    assert started.count("cam1") == 2
+
+
+def test_wait_for_capacity():
+    release = threading.Event()
+    pool = MediaWorkerPool(lambda cur_media: release.wait(timeout=5), max_workers=1, max_pending=2)
+    pool.submit(media("cam1", 0))
+    assert pool.wait_for_capacity(timeout=0.1)
+    pool.submit(media("cam1", 1))
+    assert not pool.wait_for_capacity(timeout=0.1)
+    release.set()
+    assert pool.wait_for_capacity(timeout=5)
+    pool.shutdown()
+
+
+def test_handler_exception_does_not_stop_lane():
+    processed = []
+
+    def handler(cur_media):
+        if cur_media["media_id"] == 0:
+            raise RuntimeError("boom")
+        processed.append(cur_media["media_id"])
+
+    pool = MediaWorkerPool(handler, max_workers=1)
+    pool.submit(media("cam1", 0))
+    pool.submit(media("cam1", 1))
+    assert pool.wait_until_idle(timeout=5)
+    pool.shutdown()
+    assert processed == [1]
+
+
+def test_submit_after_shutdown():
+    pool = MediaWorkerPool(lambda cur_media: None)
+    pool.shutdown()
+    assert not pool.submit(media("cam1", 0))
+    assert pool.pending == 0
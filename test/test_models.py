@@ -410,6 +410,54 @@ def test_no_blur_when_disabled(temp_test_dir):
     # The test passes if process_image completes without error when blur is disabled
 
 
+def test_process_image_burst(temp_test_dir):
+    """Test that only the best frame of a burst is kept."""
+    urls = (
+        "https://www.shutterstock.com/image-photo/"
+        "after-rain-landscapes-arches-national-260nw-2077881598.jpg",
+        TEST_URL,
+    )
+    img_paths = []
+    for idx, url in enumerate(urls):
+        img = Image.open(requests.get(url, stream=True).raw).convert("RGB")
+        img_path = os.path.join(temp_test_dir, f"burst_{idx}.jpg")
+        img.save(img_path)
+        img_paths.append(img_path)
+
+    ai_model = AiModel()
+    AiModel.detection_threshold = 0.5
+    assert ai_model.check_model("MDV5-yolov5", "DFv1.2")
+
+    best_path, results, _ = ai_model.process_image_burst(img_paths, save_detection_image=False)
+
+    assert best_path == img_paths[1]
+    assert len(results["detections"].xyxy) == 1
+    # Other frames of the burst are removed
+    assert not os.path.exists(img_paths[0])
+    assert os.path.exists(img_paths[1])
+
+
+def test_process_image_in_memory(temp_test_dir):
+    """Test that in-memory images are written to disk only if animals are detected."""
+    urls = (
+        "https://www.shutterstock.com/image-photo/"
+        "after-rain-landscapes-arches-national-260nw-2077881598.jpg",
+        TEST_URL,
+    )
+    ai_model = AiModel()
+    AiModel.detection_threshold = 0.5
+    assert ai_model.check_model("MDV5-yolov5", "DFv1.2")
+
+    img_paths = []
+    for idx, url in enumerate(urls):
+        img_path = os.path.join(temp_test_dir, f"frame_{idx}.jpg")
+        ai_model.process_image(img_path, True, requests.get(url).content)
+        img_paths.append(img_path)
+
+    assert not os.path.exists(img_paths[0])
+    assert os.path.exists(img_paths[1])
+
+
 def test_blur_image_bounding_boxes_method():
     """Test the blur_image_bounding_boxes method of AiModel."""
     # Create test image
@@ -0,0 +1,113 @@
+import cv2
+import numpy as np
+
+from wadas.domain.motion_engine import (
+    ClipRecorder,
+    FrameGrabber,
+    MotionDetector,
+    encode_clip,
+)
+
+
+def make_frame(box=None, width=1280, height=720):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    if box:
+        x1, y1, x2, y2 = box
+        frame[y1:y2, x1:x2] = 255
+    return frame
+
+
+def train(detector, frames=20):
+    for _ in range(frames):
+        detector.detect(make_frame())
+
+
+def test_motion_detected_on_downscaled_frames():
+    detector = MotionDetector(threshold=180, min_contour_area=300)
+    train(detector)
+    assert not detector.detect(make_frame())
+    assert detector.detect(make_frame((100, 100, 300, 300)))
+
+
+def test_min_contour_area_in_full_resolution_pixels():
+    detector = MotionDetector(threshold=180, min_contour_area=300)
+    train(detector)
+    # 10x10 pixels object is below the threshold once scaled back to full resolution
+    assert not detector.detect(make_frame((100, 100, 110, 110)))
+
+
+def test_exclusion_zones():
+    detector = MotionDetector(
+        threshold=180, min_contour_area=300, exclusion_zones=[[0.0, 0.0, 0.5, 1.0]]
+    )
+    train(detector)
+    assert not detector.detect(make_frame((100, 100, 300, 300)))
+    assert detector.detect(make_frame((900, 100, 1100, 300)))
+
+
+class FakeCapture:
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if not self.frames:
+            return False, None
+        return True, self.frames.pop(0)
+
+
+def test_frame_grabber_keeps_latest_frame():
+    grabber = FrameGrabber(FakeCapture(range(5))).start()
+    grabber._thread.join()
+    assert grabber.read(timeout=1) == 4
+    assert grabber.dropped_frames == 4
+    assert grabber.read(timeout=0.1) is None
+    assert grabber.stopped
+    grabber.stop()
+
+
+def test_clip_recorder_pre_and_post_roll():
+    recorder = ClipRecorder(pre_roll=1, post_roll=1, fps=2, max_duration=10)
+    for index in range(4):
+        assert recorder.add(index, now=index * 0.5) is None
+    recorder.trigger(now=1.5)
+    assert recorder.recording
+    # Clip lasts until post-roll seconds after the last trigger
+    assert recorder.add(4, now=2.0) is None
+    recorder.trigger(now=2.0)
+    assert recorder.add(5, now=2.5) is None
+    assert recorder.add(6, now=3.0) == [2, 3, 4, 5, 6]
+    assert not recorder.recording
+
+
+def test_clip_recorder_max_duration():
+    recorder = ClipRecorder(pre_roll=1, post_roll=5, fps=1, max_duration=2)
+    recorder.add(0, now=0)
+    recorder.trigger(now=0)
+    assert recorder.add(1, now=1) is None
+    recorder.trigger(now=1)
+    assert recorder.add(2, now=2) == [0, 1, 2]
+
+
+def test_clip_recorder_decimates_and_downscales_frames():
+    recorder = ClipRecorder(pre_roll=1, post_roll=1, fps=2, max_duration=10, max_width=640)
+    # Frames sampled at 10 fps (with some jitter) are kept at clip frame rate
+    for index in range(10):
+        recorder.add(make_frame(), now=index * 0.1 - (0.01 if index % 2 else 0))
+    recorder.trigger(now=1.0)
+    clip = None
+    for index in range(10, 21):
+        clip = clip or recorder.add(make_frame(), now=index * 0.1)
+    assert len(clip) == 4
+    assert all(frame.shape == (360, 640, 3) for frame in clip)
+
+
+def test_encode_clip(tmp_path):
+    clip_path = str(tmp_path / "clip.mp4")
+    frames = [make_frame((10 * index, 10, 10 * index + 50, 60), 160, 120) for index in range(5)]
+    assert encode_clip(frames, clip_path, 5)
+    cap = cv2.VideoCapture(clip_path)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 5
+    cap.release()
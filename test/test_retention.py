@@ -0,0 +1,320 @@
+import datetime
+import os
+import zipfile
+
+import pytest
+
+from wadas.domain.actuator import ActuatorBatteryStatus
+from wadas.domain.database import DataBase
+from wadas.domain.db_model import ActuatorBatteryStatus as ORMActuatorBatteryStatus
+from wadas.domain.db_model import ClassifiedAnimals
+from wadas.domain.db_model import DetectionEvent as ORMDetectionEvent
+from wadas.domain.db_model import TelemetryStats
+from wadas.domain.detection_event import DetectionEvent
+from wadas.domain.feeder_actuator import FeederActuator
+from wadas.domain.ftp_camera import FTPCamera
+from wadas.domain.media_store import MediaStore
+from wadas.domain.operation_mode import OperationMode
+from wadas.domain.retention import MediaArchiver, RetentionManager, RetentionPolicy
+from wadas_webserver.media import get_renditions_folder
+from wadas_webserver.server_config import ServerConfig
+
+
+@pytest.fixture
+def media_folder(tmp_path, monkeypatch):
+    # Media paths are relative to WADAS working directory
+    monkeypatch.chdir(tmp_path)
+    for folder in ("ftp", "detection_output", "classification_output", "video_frames"):
+        os.makedirs(folder)
+    monkeypatch.setattr(RetentionManager, "archive_folder", "")
+    monkeypatch.setattr(RetentionManager, "table_policies", {})
+    monkeypatch.setattr(RetentionManager, "media_policies", {})
+    monkeypatch.setattr(ServerConfig, "RENDITIONS_FOLDER", tmp_path / "renditions")
+    monkeypatch.setattr(MediaStore, "enabled", True)
+    return tmp_path
+
+
+@pytest.fixture
+def sqlite_db(media_folder):
+    if DataBase.wadas_db_engine is not None:
+        DataBase.destroy_instance()
+    DataBase.wadas_db = None
+    assert DataBase.initialize(DataBase.DBTypes.SQLITE, "wadas.sqlite", None, "", "") is True
+    db = DataBase.get_instance()
+    assert db.create_database() is True
+    DataBase.insert_into_db(FTPCamera("Camera1", "ftp", True))
+    yield db
+    DataBase.destroy_instance()
+
+
+def write_media(path, size=1000):
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def insert_event(name, age_days, species):
+    media = (
+        write_media(os.path.join("ftp", f"{name}.jpg")),
+        write_media(os.path.join("detection_output", f"{name}.jpg")),
+        write_media(os.path.join("classification_output", f"{name}.jpg")),
+    )
+    DataBase.insert_into_db(
+        DetectionEvent(
+            "Camera1",
+            datetime.datetime.now() - datetime.timedelta(days=age_days),
+            media[0],
+            media[1],
+            {"detections": None},
+            True,
+            media[2],
+            [{"classification": [species, 0.9]}],
+        )
+    )
+    return media
+
+
+def get_events():
+    session = DataBase.create_session()
+    try:
+        return {
+            event.original_image or event.detection_img_path: event
+            for event in session.query(ORMDetectionEvent).all()
+        }
+    finally:
+        session.close()
+
+
+def test_detection_events_retention(sqlite_db, monkeypatch):
+    monkeypatch.setattr(RetentionManager, "archive_folder", "archive")
+    monkeypatch.setattr(RetentionManager, "batch_size", 1)
+    monkeypatch.setattr(
+        RetentionManager,
+        "table_policies",
+        {"detection_events": RetentionPolicy(max_age_days=30, keep_classified_as=["wolf"])},
+    )
+    wolf_media = insert_event("wolf", 40, "wolf")
+    deer_media = insert_event("deer", 40, "roe deer")
+    fox_media = insert_event("fox", 1, "fox")
+    old_fox_media = insert_event("old_fox", 50, "fox")
+
+    assert RetentionManager().run_once() == {"detection_events": 2}
+
+    assert sorted(get_events()) == sorted([wolf_media[0], fox_media[0]])
+    session = DataBase.create_session()
+    try:
+        assert sorted(row.classified_animal for row in session.query(ClassifiedAnimals)) == [
+            "fox",
+            "wolf",
+        ]
+    finally:
+        session.close()
+    for path in wolf_media + fox_media:
+        assert os.path.isfile(path)
+    for path in deer_media + old_fox_media:
+        assert not os.path.exists(path)
+    # Removed media are archived in the archive of their month
+    archived = set()
+    for archive_path in os.listdir("archive"):
+        with zipfile.ZipFile(os.path.join("archive", archive_path)) as archive:
+            archived.update(archive.namelist())
+    assert archived == {
+        f"{media_type}/{folder}/{name}.jpg"
+        for media_type, folder in (
+            ("original", "ftp"),
+            ("detection", "detection_output"),
+            ("classification", "classification_output"),
+        )
+        for name in ("deer", "old_fox")
+    }
+
+
+def test_renditions_deleted_with_media(sqlite_db, monkeypatch):
+    monkeypatch.setattr(
+        RetentionManager, "media_policies", {"detection": RetentionPolicy(max_age_days=30)}
+    )
+    renditions_folders = []
+    for name, age_days in (("deer", 40), ("fox", 1)):
+        detection_media = insert_event(name, age_days, "roe deer")[1]
+        renditions_folders.append(get_renditions_folder(detection_media))
+        renditions_folders[-1].mkdir(parents=True)
+        write_media(renditions_folders[-1] / "etag.jpg")
+
+    assert RetentionManager().run_once() == {"detection": 1}
+
+    assert not renditions_folders[0].exists()
+    assert renditions_folders[1].exists()
+
+
+def test_media_archiver(media_folder):
+    archiver = MediaArchiver("archive")
+    time_stamp = datetime.datetime(2026, 10, 19)
+    for camera in ("cam1", "cam2"):
+        os.makedirs(os.path.join("ftp", camera))
+        write_media(os.path.join("ftp", camera, "image.jpg"))
+        archiver.add(os.path.join("ftp", camera, "image.jpg"), "original", time_stamp)
+    # Media already archived by an interrupted run are not added twice
+    archiver.add(os.path.join("ftp", "cam1", "image.jpg"), "original", time_stamp)
+    # Different media with an archived path are kept apart
+    write_media(os.path.join("ftp", "cam1", "image.jpg"))
+    archiver.add(os.path.join("ftp", "cam1", "image.jpg"), "original", time_stamp)
+    archiver.close()
+
+    with zipfile.ZipFile(os.path.join("archive", "wadas_media_2026-10.zip")) as archive:
+        assert sorted(archive.namelist()) == [
+            "original/ftp/cam1/image.jpg",
+            "original/ftp/cam1/image_1.jpg",
+            "original/ftp/cam2/image.jpg",
+        ]
+
+
+def test_media_size_quota(sqlite_db, monkeypatch):
+    # Quota fitting two original media
+    monkeypatch.setattr(
+        RetentionManager,
+        "media_policies",
+        {"original": RetentionPolicy(max_size_mb=2500 / 1024 / 1024)},
+    )
+    media = [insert_event(name, age, "fox") for name, age in (("a", 3), ("b", 2), ("c", 1))]
+
+    assert RetentionManager().run_once() == {"original": 1}
+
+    # Oldest event is kept, without its original media
+    assert not os.path.exists(media[0][0])
+    assert os.path.isfile(media[0][1])
+    assert get_events()[media[0][1]].original_image == ""
+    assert all(os.path.isfile(path) for path in media[1] + media[2])
+
+
+def test_media_folders_retention_without_db(media_folder, monkeypatch):
+    DataBase.wadas_db = None
+    monkeypatch.setattr(
+        RetentionManager,
+        "media_policies",
+        {"video_frames": RetentionPolicy(max_age_days=1), "detection": RetentionPolicy()},
+    )
+    old_frame = write_media(os.path.join("video_frames", "old.jpg"))
+    old_time = (datetime.datetime.now() - datetime.timedelta(days=2)).timestamp()
+    os.utime(old_frame, (old_time, old_time))
+    new_frame = write_media(os.path.join("video_frames", "new.jpg"))
+    detection = write_media(os.path.join("detection_output", "old.jpg"))
+    os.utime(detection, (old_time, old_time))
+
+    assert RetentionManager().run_once() == {"video_frames": 1}
+
+    assert not os.path.exists(old_frame)
+    assert os.path.isfile(new_frame)
+    # Media without policy are kept
+    assert os.path.isfile(detection)
+
+
+def test_retention_policy_serialization():
+    policy = RetentionPolicy(max_age_days=30, keep_classified_as=["wolf"])
+    assert policy.enabled
+    restored = RetentionPolicy.deserialize(policy.serialize())
+    assert restored.serialize() == policy.serialize()
+    assert not RetentionPolicy.deserialize({}).enabled
+
+
+def test_shared_media_store_blob_kept(sqlite_db, monkeypatch):
+    monkeypatch.setattr(MediaStore, "folder", "media_store")
+    monkeypatch.setattr(
+        RetentionManager,
+        "table_policies",
+        {"detection_events": RetentionPolicy(max_age_days=30)},
+    )
+    # Identical detection images of two events are stored once
+    blob_path = MediaStore.put_bytes(b"detection", ".jpg")
+    for age_days in (40, 1):
+        DataBase.insert_into_db(
+            DetectionEvent(
+                "Camera1",
+                datetime.datetime.now() - datetime.timedelta(days=age_days),
+                write_media(os.path.join("ftp", f"{age_days}.jpg")),
+                blob_path,
+                {"detections": None},
+                False,
+            )
+        )
+
+    assert RetentionManager().run_once() == {"detection_events": 1}
+
+    assert not os.path.exists(os.path.join("ftp", "40.jpg"))
+    assert os.path.isfile(blob_path)
+
+
+def test_telemetry_retention(sqlite_db, monkeypatch):
+    monkeypatch.setattr(
+        RetentionManager, "table_policies", {"telemetry": RetentionPolicy(max_age_days=30)}
+    )
+    DataBase.insert_into_db(FeederActuator("Actuator1", True))
+    now = datetime.datetime.now()
+    for age_days in (40, 35, 1):
+        DataBase.insert_into_db(
+            ActuatorBatteryStatus(
+                "Actuator1", 12.0, None, None, now - datetime.timedelta(days=age_days)
+            )
+        )
+
+    assert RetentionManager().run_once() == {"telemetry": 2}
+
+    session = DataBase.create_session()
+    try:
+        assert session.query(ORMActuatorBatteryStatus).count() == 1
+        # Rollups of removed readings are kept, also when rebuilt
+        DataBase.rebuild_stats()
+        for period in ("hour", "day"):
+            assert session.query(TelemetryStats).filter_by(period=period).count() == 3
+    finally:
+        session.close()
+
+
+def test_media_store_retention_without_db(media_folder, monkeypatch):
+    DataBase.wadas_db = None
+    monkeypatch.setattr(MediaStore, "folder", "media_store")
+    monkeypatch.setattr(
+        RetentionManager, "media_policies", {"detection": RetentionPolicy(max_age_days=1)}
+    )
+    old_blob = MediaStore.put_bytes(b"old", ".jpg")
+    new_blob = MediaStore.put_bytes(b"new", ".jpg")
+    old_time = (datetime.datetime.now() - datetime.timedelta(days=2)).timestamp()
+    os.utime(old_blob, (old_time, old_time))
+    with MediaStore.staging_folder() as staging_folder:
+        staged = write_media(os.path.join(staging_folder, "staged.jpg"))
+        os.utime(staged, (old_time, old_time))
+
+        assert RetentionManager().run_once() == {"detection": 1}
+
+        assert not os.path.exists(old_blob)
+        assert os.path.isfile(new_blob)
+        # Media under processing are not removed
+        assert os.path.isfile(staged)
+
+
+def test_privacy_keeps_shared_media_store_blob(sqlite_db, monkeypatch):
+    monkeypatch.setattr(MediaStore, "folder", "media_store")
+    shared_blob = MediaStore.put_bytes(b"shared", ".jpg")
+    own_blob = MediaStore.put_bytes(b"own", ".jpg")
+    events = [
+        DetectionEvent(
+            "Camera1",
+            datetime.datetime.now(),
+            write_media(os.path.join("ftp", f"{index}.jpg")),
+            shared_blob,
+            {"detections": None},
+            False,
+            classification_media_path=classification_blob,
+        )
+        for index, classification_blob in enumerate((own_blob, None))
+    ]
+    for event in events:
+        sqlite_db.enqueue_insert(event)
+
+    operation_mode = OperationMode()
+    operation_mode.delete_event_media(events[0], shared_blob)
+    operation_mode.delete_event_media(events[0], own_blob)
+    DataBase.stop_writer()
+
+    # Blob still referenced by the other event is kept
+    assert os.path.isfile(shared_blob)
+    assert not os.path.exists(own_blob)
@@ -0,0 +1,93 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from wadas.domain.camera import Camera, media_queue
+from wadas.domain.media_queue import MediaQueue
+from wadas.domain.stream_camera import StreamCamera
+
+FPS = 10
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    """Video with a static background and an object moving during the second half."""
+    video_path = str(tmp_path / "stream.avi")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"MJPG"), FPS, (320, 240))
+    for index in range(100):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        if index >= 50:
+            cv2.rectangle(frame, ((index - 50) * 4, 80), ((index - 50) * 4 + 60, 160), 255, -1)
+        writer.write(frame)
+    writer.release()
+    return video_path
+
+
+@pytest.fixture
+def queue():
+    Camera.detection_params = {
+        "threshold": 180,
+        "min_contour_area": 300,
+        "detection_per_second": 1,
+        "ms_sample_rate": 1000,
+    }
+    MediaQueue.max_size = 500
+    media_queue.clear()
+    yield media_queue
+    media_queue.clear()
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get(timeout=0))
+    return items
+
+
+def run_stream(camera):
+    camera.stop_thread = False
+    camera.run()
+    assert camera.finished.wait(timeout=30)
+
+
+def test_frames_are_sampled_in_memory(video_file, queue):
+    camera = StreamCamera("stream1", video_file, True, sample_rate=1, en_mot_det=False)
+    run_stream(camera)
+    # 10 seconds of video at 1 frame per second sampled
+    items = drain(queue)
+    assert len(items) == 10
+    for item in items:
+        assert item["camera_id"] == "stream1"
+        assert item["image_data"][:2] == b"\xff\xd8"
+        assert not os.path.exists(item["media_path"])
+
+
+def test_motion_gate(video_file, queue):
+    camera = StreamCamera("stream1", video_file, True, sample_rate=2)
+    run_stream(camera)
+    items = drain(queue)
+    assert items
+    # First sampled frame (background model initialization) apart, only moving frames pass
+    frame_indexes = [int(item["media_id"].rsplit("_", 1)[1].split(".")[0]) for item in items]
+    assert all(index > 50 for index in frame_indexes[1:])
+
+
+def test_missing_file(tmp_path, queue):
+    camera = StreamCamera("stream1", str(tmp_path / "missing.avi"), True)
+    run_stream(camera)
+    assert queue.empty()
+
+
+def test_serialization():
+    camera = StreamCamera(
+        "stream1", "rtsp://127.0.0.1/live", True, 2.0, False, exclusion_zones=[[0, 0, 1, 0.1]]
+    )
+    data = camera.serialize()
+    assert data["type"] == "Stream Camera"
+    restored = StreamCamera.deserialize(data)
+    assert restored.url == "rtsp://127.0.0.1/live"
+    assert restored.sample_rate == 2.0
+    assert not restored.en_wadas_motion_detection
+    assert restored.exclusion_zones == [[0, 0, 1, 0.1]]
@@ -0,0 +1,70 @@
+import os
+
+import cv2
+import numpy as np
+
+from wadas.domain.video_writer import (
+    _read_top_level_boxes,
+    apply_faststart,
+    create_browser_compatible_video_writer,
+)
+
+
+def get_box_types(path):
+    with open(path, "rb") as f:
+        return [box[0] for box in _read_top_level_boxes(f, os.path.getsize(path))]
+
+
+def read_frames(path):
+    capture = cv2.VideoCapture(str(path))
+    frames = []
+    while True:
+        success, frame = capture.read()
+        if not success:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def write_frames(writer):
+    for index in range(20):
+        writer.write(np.full((240, 320, 3), index * 10, dtype=np.uint8))
+
+
+def test_faststart_applied_on_release(tmp_path):
+    video_path = tmp_path / "video.mp4"
+    writer = create_browser_compatible_video_writer(video_path, 10, (320, 240))
+    write_frames(writer)
+    writer.release()
+
+    box_types = get_box_types(video_path)
+    assert box_types.index(b"moov") < box_types.index(b"mdat")
+    assert len(read_frames(video_path)) == 20
+    # Already optimized files are left untouched
+    assert not apply_faststart(video_path)
+
+
+def test_faststart_keeps_frames(tmp_path):
+    video_path = tmp_path / "video.mp4"
+    writer = create_browser_compatible_video_writer(video_path, 10, (320, 240))
+    # Plain cv2 writer, leaving moov at the end of the file
+    write_frames(writer.writer)
+    writer.writer.release()
+    box_types = get_box_types(video_path)
+    assert box_types.index(b"moov") > box_types.index(b"mdat")
+    frames = read_frames(video_path)
+
+    assert apply_faststart(video_path)
+    box_types = get_box_types(video_path)
+    assert box_types.index(b"moov") < box_types.index(b"mdat")
+    assert all(np.array_equal(a, b) for a, b in zip(frames, read_frames(video_path), strict=True))
+
+
+def test_faststart_skips_other_formats(tmp_path):
+    video_path = tmp_path / "video.avi"
+    writer = create_browser_compatible_video_writer(video_path, 10, (320, 240))
+    write_frames(writer)
+    writer.release()
+    assert video_path.read_bytes()[:4] == b"RIFF"
+    assert len(read_frames(video_path)) == 20
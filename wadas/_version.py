@@ -18,4 +18,4 @@
 # Description: module to keep track of WADAS version
 
 __version__ = "v1.0.0.b7"
-__dbversion__ = __version__
+__dbversion__ = "v1.0.0.b8"
@@ -17,6 +17,7 @@
 # Date: 2024-10-11
 # Description: This module implements OpenVINO related classes and functionalities.
 
+import threading
 from abc import ABC, abstractmethod
 from pathlib import Path
 
@@ -518,6 +519,9 @@ class OVMegaDetectorV6(pw_detection.MegaDetectorV6, WadasAiModel, ABC):
 
     def __init__(self, device, model_name):
         self.predictor = OVPredictor(ov_device=device)
+        # Ultralytics predictor keeps per-inference state (args, batch, results),
+        # so media workers sharing the model must run it one at a time.
+        self._lock = threading.Lock()
         self.device = "cpu"  # torch device, keep to CPU when using with OpenVINO
         self.model_name = model_name
         self.predictor.setup_model(
@@ -531,7 +535,8 @@ class OVMegaDetectorV6(pw_detection.MegaDetectorV6, WadasAiModel, ABC):
 
     def run(self, img_array: np.ndarray, detection_threshold: float):
         """Run detection model"""
-        return self.single_image_detection(img_array, None, detection_threshold, None)
+        with self._lock:
+            return self.single_image_detection(img_array, None, detection_threshold, None)
 
 
 class OVMegaDetectorV6YOLO9(OVMegaDetectorV6):
@@ -19,6 +19,7 @@
 
 
 import os
+import threading
 
 import openvino as ov
 import openvino.properties as props
@@ -40,6 +41,9 @@ class OVModel:
             os.path.join(__model_folder__, model_name),
             device_name=device.upper(),
         )
+        # Calling the compiled model directly shares a single infer request,
+        # so keep one request per thread to allow concurrent media workers.
+        self._local = threading.local()
 
     def get_available_device(self):
         """Get available devices"""
@@ -47,7 +51,9 @@ class OVModel:
 
     def __call__(self, input: torch.Tensor) -> torch.Tensor | list[torch.Tensor]:
         """Run model"""
-        results = [torch.tensor(t) for t in self.model(input).values()]
+        if (infer_request := getattr(self._local, "infer_request", None)) is None:
+            infer_request = self._local.infer_request = self.model.create_infer_request()
+        results = [torch.tensor(t) for t in infer_request.infer(input).values()]
         if len(results) == 1:
             return results[0]
         return results
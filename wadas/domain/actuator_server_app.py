@@ -31,9 +31,14 @@ from wadas.domain.actuator import (
     Command,
 )
 from wadas.domain.database import DataBase
+from wadas.domain.event_hub import publish_actuator_status
 
 logger = logging.getLogger(__name__)
 
+# Actuators poll for commands every few seconds: polls are pushed to web interface
+# clients at most once in this interval (seconds)
+STATUS_POLL_PUBLISH_INTERVAL = 30
+
 app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
 
 app.add_middleware(CORSMiddleware, allow_origins=["*"])
@@ -45,7 +50,9 @@ async def get_actuator_command(actuator_id: str):
     logger.debug("Connected remote actuator with ID: %s", actuator_id)
 
     if actuator_id in Actuator.actuators:
-        cmd = Actuator.actuators[actuator_id].get_command()
+        actuator = Actuator.actuators[actuator_id]
+        cmd = actuator.get_command()
+        publish_actuator_status(actuator, min_interval=STATUS_POLL_PUBLISH_INTERVAL)
         return JSONResponse(
             content=json.loads(cmd) if cmd else {"id": None, "cmd": None}, status_code=200
         )
@@ -173,6 +180,7 @@ async def respond_actuator_command(
     if db := DataBase.get_enabled_db():
         logger.debug("Updating Actuation event to add response info...")
         db.update_actuation_event(command)
+    publish_actuator_status(actuator, command=command.cmd, response=command.response)
 
     return {"status": "received"}
 
@@ -235,7 +243,8 @@ async def receive_battery_status(actuator_id: str, payload: dict = Body(...)):
     # Persist in DB
     if db := DataBase.get_enabled_db():
         logger.debug("Inserting battery status into db...")
-        db.insert_into_db(battery_status)
+        db.enqueue_insert(battery_status)
+    publish_actuator_status(actuator, voltage=voltage, temperature=temperature, humidity=humidity)
 
     return {"status": "received"}
 
@@ -293,7 +302,8 @@ async def receive_temperature_status(actuator_id: str, payload: dict = Body(...)
     # Persist in DB
     if db := DataBase.get_enabled_db():
         logger.debug("Inserting temperature status into db...")
-        db.insert_into_db(temperature_status)
+        db.enqueue_insert(temperature_status)
+    publish_actuator_status(actuator, temperature=temperature, humidity=humidity)
 
     return {"status": "received"}
 
@@ -326,5 +336,6 @@ async def receive_battery_critical(actuator_id: str, payload: dict = Body(...)):
 
     # Insert command in queue
     actuator.cmd_queue.put(shutdown_command.to_json())
+    publish_actuator_status(actuator, battery_critical=True)
 
     return {"status": "received"}
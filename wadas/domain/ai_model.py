@@ -17,6 +17,7 @@
 # Date: 2024-08-14
 # Description: Module containing AI Model based logic (detection & classification).
 
+import io
 import logging
 import os
 from collections import defaultdict
@@ -30,6 +31,7 @@ from PytorchWildlife import utils as pw_utils
 
 from wadas.ai import DetectionPipeline
 from wadas.ai.object_tracker import ObjectTracker
+from wadas.domain.media_store import MediaStore
 from wadas.domain.video_writer import create_browser_compatible_video_writer
 
 logger = logging.getLogger(__name__)
@@ -192,47 +194,63 @@ class AiModel:
                 logger.info("Blurred non-animal detections in image %s.", img_path)
         return blurred_img
 
-    def process_image(self, img_path, save_detection_image: bool):
-        """Method to run detection model on provided image."""
-
-        logger.debug("Selected detection device: %s", AiModel.detection_device)
+    @staticmethod
+    def _open_image(img_path):
+        """Method to open an image as RGB, returning None if the image is not valid."""
 
         try:
             img = Image.open(img_path)
             img.load()
         except FileNotFoundError:
             logger.error("%s is not a valid image path. Aborting.", img_path)
-            return None, None
+            return None
         except UnidentifiedImageError:
             logger.error("%s is not a valid image file. Aborting.", img_path)
-            return None, None
+            return None
         except OSError:
             logger.error("%s could not be opened.", img_path)
+            return None
+        return img.convert("RGB")
+
+    def process_image(self, img_path, save_detection_image: bool, image_data=None):
+        """Method to run detection model on provided image.
+        If image_data (encoded image bytes) is provided, the image is not read from disk
+        and it is written to img_path only if animals are detected."""
+
+        logger.debug("Selected detection device: %s", AiModel.detection_device)
+
+        in_memory = image_data is not None
+        if (img := self._open_image(io.BytesIO(image_data) if in_memory else img_path)) is None:
             return None, None
 
         logger.info("Running detection on image %s ...", img_path)
 
-        img = img.convert("RGB")
-
         results = self.detection_pipeline.run_detection(
             img, AiModel.detection_threshold, filter_animals=False
         )
 
         # Blur non-animal detections if requested
+        blurred_img = None
         if AiModel.blur_non_animal_detections:
-            self.blur_image_bounding_boxes(img, results, img_path)
+            blurred_img = self.blur_image_bounding_boxes(
+                img, results, None if in_memory else img_path
+            )
 
         results = self.detection_pipeline.filter_animal_detections(results)
 
         detected_img_path = ""
 
         if len(results["detections"].xyxy) > 0 and save_detection_image:
+            if in_memory:
+                if blurred_img:
+                    blurred_img.save(img_path)
+                else:
+                    with open(img_path, "wb") as f:
+                        f.write(image_data)
             logger.info("Saving detection results...")
-            results["img_id"] = img_path
-            pw_utils.save_detection_images(
-                results, os.path.join(".", "detection_output"), overwrite=False
-            )
-            detected_img_path = os.path.join("detection_output", os.path.basename(img_path))
+            detected_img_path = self._save_detection_image(results, img_path)
+        elif in_memory:
+            logger.info("No detected animals for %s.", img_path)
         else:
             logger.info("No detected animals for %s. Removing image.", img_path)
             try:
@@ -242,6 +260,83 @@ class AiModel:
 
         return results, detected_img_path
 
+    def process_image_burst(self, img_paths, save_detection_image: bool):
+        """Method to run detection model on a burst of images from the same camera.
+        Detection models take one image per inference, so images are detected one after
+        the other (in parallel with distributed inference). Only the best frame (most
+        animals, then highest confidence) is classified and kept, other images of the
+        burst are removed. Returns best image path, its detection results and detection
+        image path."""
+
+        logger.debug("Selected detection device: %s", AiModel.detection_device)
+
+        images = []
+        valid_paths = []
+        for img_path in img_paths:
+            if (img := self._open_image(img_path)) is not None:
+                images.append(img)
+                valid_paths.append(img_path)
+        if not images:
+            return None, None, ""
+
+        logger.info("Running detection on burst of %d images...", len(images))
+        results_list = self.detection_pipeline.run_detection(
+            images, AiModel.detection_threshold, filter_animals=False
+        )
+        if len(images) == 1:
+            results_list = [results_list]
+
+        for img, results, img_path in zip(images, results_list, valid_paths):
+            # Blur non-animal detections if requested
+            if AiModel.blur_non_animal_detections:
+                self.blur_image_bounding_boxes(img, results, img_path)
+            self.detection_pipeline.filter_animal_detections(results)
+
+        def frame_score(idx):
+            detections = results_list[idx]["detections"]
+            return len(detections.xyxy), max(detections.confidence, default=0)
+
+        best_idx = max(range(len(images)), key=frame_score)
+        best_path, results = valid_paths[best_idx], results_list[best_idx]
+
+        for img_path in valid_paths:
+            if img_path != best_path:
+                try:
+                    os.remove(img_path)
+                except OSError:
+                    logger.warning("Could not remove %s", img_path)
+
+        if not len(results["detections"].xyxy):
+            logger.info("No detected animals in burst. Removing image %s.", best_path)
+            try:
+                os.remove(best_path)
+            except OSError:
+                logger.warning("Could not remove %s", best_path)
+            return best_path, results, ""
+
+        detected_img_path = ""
+        if save_detection_image:
+            logger.info("Saving detection results of best frame %s...", best_path)
+            detected_img_path = self._save_detection_image(results, best_path)
+        return best_path, results, detected_img_path
+
+    @staticmethod
+    def _save_detection_image(results, img_path):
+        """Method to save the image annotated with detection results, returning its path.
+        Images are saved in a staging folder first when media store is enabled, so that
+        images with the same name from different cameras never collide."""
+
+        results["img_id"] = img_path
+        if not MediaStore.enabled:
+            pw_utils.save_detection_images(
+                results, os.path.join(".", "detection_output"), overwrite=False
+            )
+            return os.path.join("detection_output", os.path.basename(img_path))
+
+        with MediaStore.staging_folder() as folder:
+            pw_utils.save_detection_images(results, folder, overwrite=False)
+            return MediaStore.put_file(os.path.join(folder, os.path.basename(img_path)))
+
     def get_video_frames(self, video_path):
         """Method to extract frames from video."""
         try:
@@ -453,7 +548,13 @@ class AiModel:
                     )
 
         if preview_frames and save_processed_video:
-            self.save_preview_video(preview_frames, output_video_path)
+            if MediaStore.enabled:
+                with MediaStore.staging_folder() as folder:
+                    staged_video_path = Path(folder) / output_video_path.name
+                    self.save_preview_video(preview_frames, staged_video_path)
+                    output_video_path = MediaStore.put_file(staged_video_path)
+            else:
+                self.save_preview_video(preview_frames, output_video_path)
 
         return tracked_animals, str(output_video_path), snapshot_path
 
@@ -468,15 +569,6 @@ class AiModel:
         Returns:
             str: Path to the saved snapshot.
         """
-        # Determine output directory based on mode
-        output_dir = Path("classification_output" if classification else "detection_output")
-        output_dir.mkdir(exist_ok=True)
-
-        # Build snapshot filename
-        video_stem = Path(video_path).stem
-        snapshot_filename = f"{video_stem}_first_detection.jpg"
-        snapshot_path = output_dir / snapshot_filename
-
         # Convert PIL Image to numpy array if needed, then save with cv2
         if isinstance(frame, Image.Image):
             frame_array = np.array(frame)
@@ -485,6 +577,17 @@ class AiModel:
         else:
             frame_array = frame
 
+        if MediaStore.enabled:
+            return MediaStore.put_image(frame_array)
+
+        # Determine output directory based on mode
+        output_dir = Path("classification_output" if classification else "detection_output")
+        output_dir.mkdir(exist_ok=True)
+
+        # Build snapshot filename
+        video_stem = Path(video_path).stem
+        snapshot_filename = f"{video_stem}_first_detection.jpg"
+        snapshot_path = output_dir / snapshot_filename
         cv2.imwrite(str(snapshot_path), frame_array)
 
         return str(snapshot_path)
@@ -509,7 +612,13 @@ class AiModel:
             results = self.detection_pipeline.filter_animal_detections(results)
 
             if len(results["detections"].xyxy) > 0:
-                if save_detection_image:
+                if save_detection_image and MediaStore.enabled:
+                    # Frame and detection image have the same content, stored once
+                    logger.info("Saving detection results for frame %s...", frame_count)
+                    frame_path = MediaStore.put_image(frame)
+                    results["img_id"] = frame_path
+                    yield results, frame_path, frame_path
+                elif save_detection_image:
                     # Saving original video frame
                     logger.debug("Saving video frame...")
                     frame_path = os.path.join(
@@ -649,6 +758,8 @@ class AiModel:
         # Save classified image
         if video_frame:
             return classified_image
+        elif MediaStore.enabled:
+            return MediaStore.put_image(classified_image)
         else:
             classified_image_path = (
                 module_dir_path.parent.parent
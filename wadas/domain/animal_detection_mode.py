@@ -18,9 +18,7 @@
 # Description: Animal Detection and Classification module.
 
 import logging
-from queue import Empty
 
-from wadas.domain.camera import media_queue
 from wadas.domain.operation_mode import OperationMode
 from wadas.domain.utils import is_image, is_video
 
@@ -46,55 +44,52 @@ class AnimalDetectionAndClassificationMode(OperationMode):
         self._initialize_processes()
         self.check_for_termination_requests()
 
-        # Run detection model
-        while self.process_queue:
-            self.check_for_termination_requests()
-            # Get media (images or videos) from motion detection notification
-            # Timeout is set to 1 second to avoid blocking the thread
-            try:
-                cur_media = media_queue.get(timeout=1)
-            except Empty:
-                cur_media = None
-
-            # Media processing
-            if cur_media and (
-                is_image(cur_media["media_path"]) or is_video(cur_media["media_path"])
-            ):
-                logger.debug("Processing media from motion detection notification...")
-
-                detection_event = self._detect(cur_media)
-
-                self.check_for_termination_requests()
-                if detection_event:
-                    if self.enable_classification:
-                        # Classification is enabled
-                        if detection_event.classification_media_path:
-                            message = (
-                                f"WADAS has classified '{self.last_classified_animals_str}' "
-                                f"animal from camera {cur_media['camera_id']}!"
-                            )
-                        else:
-                            message = (
-                                "WADAS has detected but not classified any animal "
-                                f"from camera {cur_media['camera_id']}"
-                            )
-                            self.enforce_privacy(detection_event)
-                    else:
-                        message = (
-                            f"WADAS has detected an animal from camera {cur_media['camera_id']}!"
-                        )
-
-                    # Notification
-                    if self.is_notifier_enabled:
-                        self.send_notification(detection_event, message)
-
-                    # Actuation
-                    if detection_event:
-                        self.actuate(detection_event)
-
-                    # Reproduce image or video in UI
-                    self._show_processed_results(detection_event)
-                else:
-                    logger.info("No animal detected.")
+        # Run detection model on media from motion detection notification
+        self._process_media_queue(
+            self._process_media, lambda media_path: is_image(media_path) or is_video(media_path)
+        )
 
         self.execution_completed()
+
+    def _process_media(self, cur_media):
+        """Method to process a media (image or video), run by media worker pool.
+        Returns False if processing was interrupted, True otherwise."""
+
+        logger.debug("Processing media from motion detection notification...")
+
+        detection_event = self._detect(cur_media)
+
+        if not self.process_queue:
+            return False
+        if detection_event:
+            if self.enable_classification:
+                # Classification is enabled
+                if detection_event.classification_media_path:
+                    classified_animals_str = self._format_classified_animals_string(
+                        detection_event.classified_animals
+                    )
+                    message = (
+                        f"WADAS has classified '{classified_animals_str}' "
+                        f"animal from camera {cur_media['camera_id']}!"
+                    )
+                else:
+                    message = (
+                        "WADAS has detected but not classified any animal "
+                        f"from camera {cur_media['camera_id']}"
+                    )
+                    self.enforce_privacy(detection_event)
+            else:
+                message = f"WADAS has detected an animal from camera {cur_media['camera_id']}!"
+
+            # Notification
+            if self.is_notifier_enabled:
+                self.send_notification(detection_event, message)
+
+            # Actuation
+            self.actuate(detection_event)
+
+            # Reproduce image or video in UI
+            self._show_processed_results(detection_event)
+        else:
+            logger.info("No animal detected.")
+        return True
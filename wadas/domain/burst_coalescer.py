@@ -0,0 +1,94 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Module to group images of the same camera trigger into a single burst.
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BurstCoalescer:
+    """Class grouping images from the same camera arriving within a time window.
+    Cameras often upload several images per trigger: processing them as a single burst
+    allows one classification, one detection event and one notification per trigger.
+    Windows start from the arrival time of the first image in the media queue, so that
+    queueing delays do not stretch bursts."""
+
+    MAX_BURST_SIZE = 10
+
+    def __init__(self, window):
+        self.window = window
+        # camera_id -> (first arrival time, list of media)
+        self._bursts = {}
+
+    @staticmethod
+    def _to_media(burst):
+        """Method to build the media dictionary to be processed from a burst."""
+
+        if len(burst) == 1:
+            return burst[0]
+        media = dict(burst[0])
+        media["media_batch"] = burst
+        return media
+
+    def add(self, media, now=None):
+        """Method to add an image to its camera burst. Returns the list of bursts
+        ready to be processed."""
+
+        now = time.monotonic() if now is None else now
+        ready = self.pop_expired(now)
+        camera_id = media.get("camera_id")
+        _, burst = self._bursts.setdefault(camera_id, (media.get("arrival_time", now), []))
+        burst.append(media)
+        if len(burst) >= self.MAX_BURST_SIZE:
+            ready.append(self.pop_camera(camera_id))
+        return ready
+
+    def pop_expired(self, now=None):
+        """Method to remove and return bursts whose window elapsed."""
+
+        now = time.monotonic() if now is None else now
+        expired = [
+            camera_id
+            for camera_id, (first_arrival, _) in self._bursts.items()
+            if now - first_arrival >= self.window
+        ]
+        return [self.pop_camera(camera_id) for camera_id in expired]
+
+    def pop_camera(self, camera_id):
+        """Method to remove and return the burst of a camera, if any."""
+
+        if camera_id not in self._bursts:
+            return None
+        _, burst = self._bursts.pop(camera_id)
+        if len(burst) > 1:
+            logger.debug("Coalesced %d images from camera %s.", len(burst), camera_id)
+        return self._to_media(burst)
+
+    def next_timeout(self, now=None):
+        """Return seconds until the first burst expires, None if no burst is pending."""
+
+        if not self._bursts:
+            return None
+        now = time.monotonic() if now is None else now
+        first_arrival = min(first_arrival for first_arrival, _ in self._bursts.values())
+        return max(0.0, first_arrival + self.window - now)
+
+    def __len__(self):
+        return len(self._bursts)
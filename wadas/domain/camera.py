@@ -20,11 +20,24 @@
 import logging
 from abc import abstractmethod
 from enum import Enum
-from queue import Queue
+
+from wadas.domain.media_queue import MediaQueue
+from wadas.domain.utils import is_video
 
 logger = logging.getLogger(__name__)
+
+
+def media_priority(media):
+    """Return the priority class of a media: images first, then cameras tied to actuators."""
+
+    has_actuators = any(
+        camera.actuators for camera in cameras if camera.id == media.get("camera_id")
+    )
+    return 2 * is_video(media["media_path"]) + (not has_actuators)
+
+
 # Queue containing all the images received by Cameras to be processed by AiModel
-media_queue = Queue()
+media_queue = MediaQueue(media_priority)
 # Media dictionary structure to be inserted in the media_queue:
 # {
 #    "media_path": <media_file_path>,
@@ -48,6 +61,7 @@ class Camera:
     class CameraTypes(Enum):
         USB_CAMERA = "USB Camera"
         FTP_CAMERA = "FTP Camera"
+        STREAM_CAMERA = "Stream Camera"
 
     def __init__(self, id, enabled=False):
         self.type = None
@@ -37,10 +37,14 @@ from wadas.domain.fastapi_actuator_server import FastAPIActuatorServer
 from wadas.domain.feeder_actuator import FeederActuator
 from wadas.domain.ftp_camera import FTPCamera
 from wadas.domain.ftps_server import FTPsServer
+from wadas.domain.media_queue import MediaQueue
+from wadas.domain.media_store import IMAGE_FORMATS, MediaStore
 from wadas.domain.notification_area import NotificationArea
 from wadas.domain.notifier import Notifier
 from wadas.domain.operation_mode import OperationMode
+from wadas.domain.retention import RetentionManager, RetentionPolicy
 from wadas.domain.roadsign_actuator import RoadSignActuator
+from wadas.domain.stream_camera import StreamCamera
 from wadas.domain.telegram_notifier import TelegramNotifier
 from wadas.domain.tunnel import Tunnel
 from wadas.domain.usb_camera import USBCamera
@@ -217,6 +221,8 @@ def load_configuration_from_file(file_path):
                 case Camera.CameraTypes.USB_CAMERA.value:
                     usb_camera = USBCamera.deserialize(data)
                     cameras.append(usb_camera)
+                case Camera.CameraTypes.STREAM_CAMERA.value:
+                    cameras.append(StreamCamera.deserialize(data))
                 case Camera.CameraTypes.FTP_CAMERA.value:
                     ftp_camera = FTPCamera.deserialize(data)
                     cameras.append(ftp_camera)
@@ -338,6 +344,46 @@ def load_configuration_from_file(file_path):
             )
             AiModel.blur_non_animal_detections = privacy_cfg.get("blur_non_humans", False)
 
+        # Media processing
+        media_processing_cfg = wadas_config.get("media_processing") or {}
+        OperationMode.media_workers = media_processing_cfg.get("workers", 2)
+        OperationMode.burst_window = media_processing_cfg.get("burst_window", 0)
+        MediaQueue.durable = media_processing_cfg.get("durable_queue", True)
+        MediaQueue.max_size = media_processing_cfg.get("queue_max_size", 500)
+        MediaQueue.overflow_policy = MediaQueue.OverflowPolicy(
+            media_processing_cfg.get(
+                "queue_overflow_policy", MediaQueue.OverflowPolicy.DROP_OLDEST.value
+            )
+        )
+        StreamCamera.decode_workers = media_processing_cfg.get("stream_decode_workers", 4)
+
+        # Media store, disabled for configurations created before it was introduced,
+        # so that their media layout does not change. New configurations enable it.
+        media_store_cfg = wadas_config.get("media_store") or {}
+        MediaStore.enabled = media_store_cfg.get("enabled", False)
+        MediaStore.folder = media_store_cfg.get("folder", "media_store")
+        MediaStore.image_format = media_store_cfg.get("image_format", "jpeg")
+        MediaStore.image_quality = media_store_cfg.get("image_quality", 90)
+        if MediaStore.image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported media store image format {MediaStore.image_format}")
+
+        # Data retention
+        retention_cfg = wadas_config.get("retention") or {}
+        RetentionManager.enabled = retention_cfg.get("enabled", False)
+        RetentionManager.interval = retention_cfg.get("interval", 3600)
+        RetentionManager.batch_size = retention_cfg.get("batch_size", 500)
+        RetentionManager.archive_folder = retention_cfg.get("archive_folder", "")
+        RetentionManager.table_policies = {
+            table: RetentionPolicy.deserialize((retention_cfg.get("tables") or {}).get(table, {}))
+            for table in RetentionManager.table_policies
+        }
+        RetentionManager.media_policies = {
+            media_type: RetentionPolicy.deserialize(
+                (retention_cfg.get("media") or {}).get(media_type, {})
+            )
+            for media_type in RetentionManager.media_policies
+        }
+
     except Exception as e:
         load_status["errors_on_load"] = True
         load_status["errors_log"] = e
@@ -358,7 +404,12 @@ def save_configuration_to_file(file_, project_uuid):
     cameras_to_dict = [
         camera.serialize()
         for camera in cameras
-        if camera.type in (Camera.CameraTypes.FTP_CAMERA, Camera.CameraTypes.USB_CAMERA)
+        if camera.type
+        in (
+            Camera.CameraTypes.FTP_CAMERA,
+            Camera.CameraTypes.USB_CAMERA,
+            Camera.CameraTypes.STREAM_CAMERA,
+        )
     ]
 
     # Prepare serialization for notifiers per class type
@@ -417,6 +468,36 @@ def save_configuration_to_file(file_, project_uuid):
         ),
         "database": db.serialize() if (db := DataBase.get_instance()) else "",
         "tunnels": tunnels_to_dict,
+        "media_processing": {
+            "workers": OperationMode.media_workers,
+            "burst_window": OperationMode.burst_window,
+            "durable_queue": MediaQueue.durable,
+            "queue_max_size": MediaQueue.max_size,
+            "queue_overflow_policy": MediaQueue.overflow_policy.value,
+            "stream_decode_workers": StreamCamera.decode_workers,
+        },
+        "media_store": {
+            "enabled": MediaStore.enabled,
+            "folder": MediaStore.folder,
+            "image_format": MediaStore.image_format,
+            "image_quality": MediaStore.image_quality,
+        },
+        "retention": {
+            "enabled": RetentionManager.enabled,
+            "interval": RetentionManager.interval,
+            "batch_size": RetentionManager.batch_size,
+            "archive_folder": RetentionManager.archive_folder,
+            "tables": {
+                table: policy.serialize()
+                for table, policy in RetentionManager.table_policies.items()
+                if policy.enabled
+            },
+            "media": {
+                media_type: policy.serialize()
+                for media_type, policy in RetentionManager.media_policies.items()
+                if policy.enabled
+            },
+        },
         "privacy": {
             "remove_original_image": OperationMode.enforce_privacy_remove_original_img,
             "remove_detection_img": OperationMode.enforce_privacy_remove_detection_img,
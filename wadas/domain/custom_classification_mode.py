@@ -18,10 +18,8 @@
 # Description: Custom Classification module.
 
 import logging
-from queue import Empty
 
 from wadas.domain.animal_detection_mode import AnimalDetectionAndClassificationMode
-from wadas.domain.camera import media_queue
 from wadas.domain.operation_mode import OperationMode
 from wadas.domain.utils import is_image, is_video
 
@@ -43,63 +41,64 @@ class CustomClassificationMode(AnimalDetectionAndClassificationMode):
         self._initialize_processes()
         self.check_for_termination_requests()
 
-        # Run detection model
-        while self.process_queue:
-            self.check_for_termination_requests()
-            # Get image from motion detection notification
-            # Timeout is set to 1 second to avoid blocking the thread
-            try:
-                cur_media = media_queue.get(timeout=1)
-            except Empty:
-                cur_media = None
-
-            if cur_media and (
-                is_image(cur_media["media_path"]) or is_video(cur_media["media_path"])
-            ):
-                logger.debug("Processing image from motion detection notification...")
-                detection_event = self._detect(cur_media)
-
-                self.check_for_termination_requests()
-                if detection_event and self.enable_classification:
-                    if detection_event.classification_media_path:
-                        # Send notification and trigger actuators if any target animal is found
-                        if any(
-                            classified_animal["classification"][0] in self.custom_target_species
-                            for classified_animal in detection_event.classified_animals
-                        ):
-                            # Notification
-                            message = (
-                                f"WADAS has classified '{self.last_classified_animals_str}' "
-                                f"animal from camera {detection_event.camera_id}!"
-                            )
-                            logger.info(message)
-                            self.send_notification(detection_event, message)
-
-                            # Actuation
-                            self.actuate(detection_event)
-
-                            # Show processing results in UI
-                            self._show_processed_results(detection_event)
-                        else:
-                            logger.info(
-                                "Target animals '%s' not found, found '%s' instead. "
-                                "Skipping notification.",
-                                ", ".join(self.custom_target_species),
-                                self.last_classified_animals_str,
-                            )
-
-                            # To enforce privacy, delete image if no target animal is classified
-                            if (
-                                OperationMode.enforce_privacy_remove_classification_img
-                                or OperationMode.enforce_privacy_remove_original_img
-                                or OperationMode.enforce_privacy_remove_detection_img
-                            ):
-                                self.enforce_privacy(detection_event)
-                            else:
-                                # Show processing results in UI
-                                self._show_processed_results(detection_event)
-                    else:
-                        logger.info("No animal classified.")
-                        self.enforce_privacy(detection_event)
+        # Run detection model on media from motion detection notification
+        self._process_media_queue(
+            self._process_media, lambda media_path: is_image(media_path) or is_video(media_path)
+        )
 
         self.execution_completed()
+
+    def _process_media(self, cur_media):
+        """Method to process a media (image or video), run by media worker pool.
+        Returns False if processing was interrupted, True otherwise."""
+
+        logger.debug("Processing image from motion detection notification...")
+        detection_event = self._detect(cur_media)
+
+        if not self.process_queue:
+            return False
+        if detection_event and self.enable_classification:
+            if detection_event.classification_media_path:
+                classified_animals_str = self._format_classified_animals_string(
+                    detection_event.classified_animals
+                )
+                # Send notification and trigger actuators if any target animal is found
+                if any(
+                    classified_animal["classification"][0] in self.custom_target_species
+                    for classified_animal in detection_event.classified_animals
+                ):
+                    # Notification
+                    message = (
+                        f"WADAS has classified '{classified_animals_str}' "
+                        f"animal from camera {detection_event.camera_id}!"
+                    )
+                    logger.info(message)
+                    self.send_notification(detection_event, message)
+
+                    # Actuation
+                    self.actuate(detection_event)
+
+                    # Show processing results in UI
+                    self._show_processed_results(detection_event)
+                else:
+                    logger.info(
+                        "Target animals '%s' not found, found '%s' instead. "
+                        "Skipping notification.",
+                        ", ".join(self.custom_target_species),
+                        classified_animals_str,
+                    )
+
+                    # To enforce privacy, delete image if no target animal is classified
+                    if (
+                        OperationMode.enforce_privacy_remove_classification_img
+                        or OperationMode.enforce_privacy_remove_original_img
+                        or OperationMode.enforce_privacy_remove_detection_img
+                    ):
+                        self.enforce_privacy(detection_event)
+                    else:
+                        # Show processing results in UI
+                        self._show_processed_results(detection_event)
+            else:
+                logger.info("No animal classified.")
+                self.enforce_privacy(detection_event)
+        return True
@@ -18,10 +18,12 @@
 # Description: database module.
 import datetime
 import glob
+import itertools
 import logging
 import os
 import shutil
 import subprocess
+import threading
 from abc import ABC, abstractmethod
 from enum import Enum
 from pathlib import Path
@@ -43,7 +45,8 @@ from wadas.domain.actuator import (
     ActuatorTemperatureStatus,
     Command,
 )
-from wadas.domain.camera import cameras
+from wadas.domain.camera import Camera, cameras
+from wadas.domain.db_engine import create_db_engine
 from wadas.domain.db_model import ActuationEvent as ORMActuationEvent
 from wadas.domain.db_model import Actuator as ORMActuator
 from wadas.domain.db_model import ActuatorBatteryStatus as ORMActuatorBattery
@@ -57,14 +60,25 @@ from wadas.domain.db_model import DeterrentActuator as ORMDeterrentActuator
 from wadas.domain.db_model import FeederActuator as ORMFeederActuator
 from wadas.domain.db_model import FTPCamera as ORMFTPCamera
 from wadas.domain.db_model import RoadSignActuator as ORMRoadSignActuator
+from wadas.domain.db_model import StreamCamera as ORMStreamCamera
 from wadas.domain.db_model import USBCamera as ORMUSBCamera
 from wadas.domain.db_model import User as ORMUser
 from wadas.domain.db_model import camera_actuator_association
+from wadas.domain.db_stats import (
+    add_detection_stats,
+    add_species_stats,
+    add_telemetry_stats,
+    add_tunnel_stats,
+    get_telemetry_values,
+    rebuild_stats,
+)
+from wadas.domain.db_writer import DBWriter
 from wadas.domain.detection_event import DetectionEvent
 from wadas.domain.deterrent_actuator import DeterrentActuator
 from wadas.domain.feeder_actuator import FeederActuator
 from wadas.domain.ftp_camera import FTPCamera
 from wadas.domain.roadsign_actuator import RoadSignActuator
+from wadas.domain.stream_camera import StreamCamera
 from wadas.domain.usb_camera import USBCamera
 from wadas.domain.utils import get_precise_timestamp
 
@@ -88,6 +102,19 @@ class DBUser:
         self.role = role
 
 
+class DBOperation:
+    """Db operation enqueued by a producer thread. Operations are numbered per thread,
+    so that after write callbacks can be skipped when operations they depend on fail."""
+
+    def __init__(self, function, producer, seq):
+        self.function = function
+        self.producer = producer
+        self.seq = seq
+
+    def __call__(self, session, *args):
+        return self.function(session, *args)
+
+
 class DataBase(ABC):
     """Base Class to handle DB object."""
 
@@ -99,6 +126,25 @@ class DataBase(ABC):
     wadas_db = None  # Singleton instance of the database
     wadas_db_engine = None  # Singleton engine associated with the database
     max_reconn_retries = 3  # Max number of retry for re-connecting
+    session_factory = None  # Session factory bound to the singleton engine
+    # Connection pool settings (MySQL and MariaDB only)
+    pool_size = 5
+    max_overflow = 10
+    pool_timeout = 30  # seconds
+    pool_recycle = 300  # seconds, under MariaDB wait_timeout
+    db_writer = None  # Background writer for operations out of detection hot path
+    producer = threading.local()  # Id and sequence number of operations enqueued by thread
+    producer_ids = itertools.count()
+    failed_writes = {}  # Sequence number of last failed operation, by producer
+    users_listeners = []  # Callbacks notified with the username of updated or deleted users
+    # Callbacks notified with (lookup, value) when reference data listed by the web
+    # interface (cameras, animals, actuator_types, actuation_commands) changes.
+    # Value is the new entry, None if the whole lookup changed.
+    lookups_listeners = []
+    # Cache of db ids (primary keys) of not deleted cameras and actuators, by their ids
+    camera_db_ids = {}
+    actuator_db_ids = {}
+    id_cache_lock = threading.Lock()
 
     def __init__(self, host, enabled=True, version=__dbversion__):
         """Constructor is not public, no external code should call this directly"""
@@ -170,6 +216,7 @@ class DataBase(ABC):
         if not DataBase.wadas_db:
             return False
 
+        cls.clear_id_cache()
         DataBase.wadas_db_engine = cls.get_engine()
         if log:
             logger.info("%s database initialized.", db_type.value)
@@ -188,14 +235,12 @@ class DataBase(ABC):
                 raise RuntimeError("The database and db engine have not been initialized.")
             else:
                 logger.debug("Initializing engine...")
-                DataBase.wadas_db_engine = (
-                    create_engine(DataBase.wadas_db.get_connection_string())
-                    if (DataBase.wadas_db.type == DataBase.DBTypes.SQLITE)
-                    else create_engine(
-                        DataBase.wadas_db.get_connection_string(),
-                        pool_recycle=300,  # Recycle connection every 5 minutes (under MariaDB wait_timeout)
-                        pool_pre_ping=True,  # Check if connection is still valid before use
-                    )
+                DataBase.wadas_db_engine = create_db_engine(
+                    DataBase.wadas_db.get_connection_string(),
+                    DataBase.pool_size,
+                    DataBase.max_overflow,
+                    DataBase.pool_timeout,
+                    DataBase.pool_recycle,
                 )
         return DataBase.wadas_db_engine
 
@@ -221,12 +266,15 @@ class DataBase(ABC):
         """Destroy the current database instance and release resources."""
 
         logger.debug("Destroying db instance...")
+        cls.stop_writer()
+        cls.clear_id_cache()
         if DataBase.wadas_db_engine:
             try:
                 DataBase.wadas_db_engine.dispose()
             except Exception:
                 logger.warning("Failed to dispose the database engine.")
         DataBase.wadas_db_engine = None
+        DataBase.session_factory = None
         DataBase.wadas_db = None
 
     @classmethod
@@ -235,23 +283,11 @@ class DataBase(ABC):
 
         try:
             if engine := cls.get_engine():
-                # If db is not SQLite, check engine status (SQLite has no pre-existing sessions)
-                if DataBase.wadas_db.type != DataBase.DBTypes.SQLITE:
-                    try:
-                        with engine.connect() as connection:
-                            if connection.invalidated:
-                                logger.warning("Connection invalidated, disposing engine...")
-                                engine.dispose()
-                                DataBase.wadas_db_engine = None  # Force new engine
-                                engine = cls.get_engine()
-                    except (InterfaceError, SQLAlchemyOperationalError, mariadbOperationalerror):
-                        logger.warning("Pre-ping connection check failed, disposing engine...")
-                        engine.dispose()
-                        DataBase.wadas_db_engine = None
-                        engine = cls.get_engine()
-
-                Session = sessionmaker(bind=engine)
-                return Session()
+                # Stale pooled connections are detected by pool pre-ping on checkout
+                factory = DataBase.session_factory
+                if factory is None or factory.kw["bind"] is not engine:
+                    DataBase.session_factory = factory = sessionmaker(bind=engine)
+                return factory()
             else:
                 logger.error("Unable to create a session as DB engine is not initialized.")
                 return None
@@ -335,6 +371,113 @@ class DataBase(ABC):
             logger.error("DB session not initialized.")
         return False
 
+    @classmethod
+    def _add_to_session(cls, session, domain_object):
+        """Method to add a WADAS object to a session, resolving its foreign keys.
+        Returns the ORM object, None if the object cannot be inserted."""
+
+        foreign_key = []
+        if isinstance(domain_object, DetectionEvent):
+            # If Camera associated to the detection event is not in db abort insertion
+            foreign_key.append(cls._resolve_camera_db_id(session, domain_object.camera_id))
+            if not foreign_key[0]:
+                logger.error(
+                    "Unable to add Detection event into db as %s camera id is not found in db.",
+                    domain_object.camera_id,
+                )
+                return None
+
+        if isinstance(domain_object, ActuationEvent):
+            # If Actuator associated to the actuation event is not in db abort insertion
+            foreign_key.append(cls._resolve_actuator_db_id(session, domain_object.actuator_id))
+            if not foreign_key[0]:
+                logger.error(
+                    "Unable to add Actuation event into db as %s actuator id is not found"
+                    " in db.",
+                    domain_object.actuator_id,
+                )
+                return None
+            # If detection event associated to the actuation event is not in db
+            # abort insertion
+            foreign_key.append(
+                domain_object.detection_event.db_id
+                or cls.get_detection_event_id(domain_object.detection_event)
+            )
+            if not foreign_key[1]:
+                logger.error(
+                    "Unable to add Actuation event into db as %s detection event id is not"
+                    " found in db.",
+                    domain_object.detection_event,
+                )
+                return None
+
+        if isinstance(domain_object, (ActuatorBatteryStatus, ActuatorTemperatureStatus)):
+            # Check that actuator exists
+            if not (actuator_fk := cls._resolve_actuator_db_id(session, domain_object.actuator_id)):
+                logger.error(
+                    "Unable to add %s into db as %s actuator id is not found",
+                    type(domain_object).__name__,
+                    domain_object.actuator_id,
+                )
+                return None
+            foreign_key.append(actuator_fk)
+
+        orm_object = DataBase.domain_to_orm(domain_object, foreign_key)
+        session.add(orm_object)
+        session.flush()
+
+        # If instance is a camera, handle relationship with actuators
+        if isinstance(domain_object, (FTPCamera, USBCamera, StreamCamera)):
+            for actuator in domain_object.actuators:
+                orm_actuator = session.query(ORMActuator).filter_by(actuator_id=actuator.id).first()
+                if orm_actuator:
+                    orm_object.actuators.append(orm_actuator)
+
+        if isinstance(domain_object, DetectionEvent):
+            # Carry db id back to avoid further lookups (e.g. classification update)
+            domain_object.db_id = orm_object.db_id
+            add_detection_stats(session, foreign_key[0], domain_object.time_stamp)
+            if domain_object.classified_animals:
+                cls._add_classified_animals(
+                    session, domain_object, foreign_key[0], domain_object.time_stamp
+                )
+        elif isinstance(domain_object, ActuationEvent):
+            cls._add_after_commit_callback(
+                session, cls._notify_lookup_update, "actuation_commands", orm_object.command
+            )
+        elif isinstance(domain_object, Camera):
+            cls._add_after_commit_callback(session, cls._notify_lookup_update, "cameras")
+        elif isinstance(domain_object, Actuator):
+            cls._add_after_commit_callback(session, cls._notify_lookup_update, "actuator_types")
+        elif isinstance(domain_object, (ActuatorBatteryStatus, ActuatorTemperatureStatus)):
+            add_telemetry_stats(
+                session, foreign_key[0], domain_object.time_stamp, get_telemetry_values(orm_object)
+            )
+
+        return orm_object
+
+    @staticmethod
+    def _add_classified_animals(session, detection_event, camera_db_id, time_stamp):
+        """Method to add classified animals of a detection event to a session,
+        counting them in species rollups."""
+
+        for classified_animal in detection_event.classified_animals:
+            classification = classified_animal.get("classification")
+            if not classification:
+                continue
+
+            session.add(
+                ORMClassifiedAnimals(
+                    detection_event_id=detection_event.db_id,
+                    classified_animal=classification[0],
+                    probability=classification[1],
+                )
+            )
+            add_species_stats(session, camera_db_id, time_stamp, classification[0])
+            DataBase._add_after_commit_callback(
+                session, DataBase._notify_lookup_update, "animals", classification[0]
+            )
+
     @classmethod
     def insert_into_db(cls, domain_object):
         """Method to insert a WADAS object into the db."""
@@ -342,129 +485,13 @@ class DataBase(ABC):
         logger.debug("Inserting <%s> object into db...", type(domain_object))
         if session := cls.create_session():
             try:
-                foreign_key = []
-                if isinstance(domain_object, DetectionEvent):
-                    # If Camera associated to the detection event is not in db abort insertion
-                    foreign_key.append(
-                        session.query(ORMCamera.db_id)
-                        .filter(
-                            and_(
-                                ORMCamera.camera_id == domain_object.camera_id,
-                                ORMCamera.deletion_date.is_(None),
-                            )
-                        )
-                        .scalar()
-                    )
-                    if not foreign_key:
-                        logger.error(
-                            "Unable to add Detection event into db as %s "
-                            "camera id is not found in db.",
-                            domain_object.camera_id,
-                        )
-                        return
-
-                if isinstance(domain_object, ActuationEvent):
-                    # If Actuator associated to the actuation event is not in db abort insertion
-                    foreign_key.append(
-                        session.query(ORMActuator.db_id)
-                        .filter(
-                            and_(
-                                ORMActuator.actuator_id == domain_object.actuator_id,
-                                ORMActuator.deletion_date.is_(None),
-                            )
-                        )
-                        .scalar()
-                    )
-                    if not foreign_key:
-                        logger.error(
-                            "Unable to add Actuation event into db as %s actuator id is not found"
-                            " in db.",
-                            domain_object.actuator_id,
-                        )
-                        return
-                    # If detection event associated to the actuation event is not in db
-                    # abort insertion
-                    foreign_key.append(cls.get_detection_event_id(domain_object.detection_event))
-                    if not foreign_key[1]:
-                        logger.error(
-                            "Unable to add Actuation event into db as %s detection event id is not"
-                            " found in db.",
-                            domain_object.detection_event,
-                        )
-                        return
-
-                if isinstance(domain_object, ActuatorBatteryStatus):
-                    # Check that actuator exists
-                    actuator_fk = (
-                        session.query(ORMActuator.db_id)
-                        .filter(
-                            and_(
-                                ORMActuator.actuator_id == domain_object.actuator_id,
-                                ORMActuator.deletion_date.is_(None),
-                            )
-                        )
-                        .scalar()
-                    )
-                    if not actuator_fk:
-                        logger.error(
-                            "Unable to add Battery status into db as %s actuator id is not found",
-                            domain_object.actuator_id,
-                        )
-                        return
-                    foreign_key.append(actuator_fk)
-
-                if isinstance(domain_object, ActuatorTemperatureStatus):
-                    # Check that actuator exists
-                    actuator_fk = (
-                        session.query(ORMActuator.db_id)
-                        .filter(
-                            and_(
-                                ORMActuator.actuator_id == domain_object.actuator_id,
-                                ORMActuator.deletion_date.is_(None),
-                            )
-                        )
-                        .scalar()
+                if (orm_object := cls._add_to_session(session, domain_object)) is not None:
+                    session.commit()
+                    cls._cache_db_id(domain_object, orm_object)
+                    cls._run_after_commit_callbacks(session)
+                    logger.debug(
+                        "Object '%s' successfully added to the db!", type(domain_object).__name__
                     )
-                    if not actuator_fk:
-                        logger.error(
-                            "Unable to add Temperature status into db as %s actuator"
-                            " id is not found",
-                            domain_object.actuator_id,
-                        )
-                        return
-                    foreign_key.append(actuator_fk)
-
-                orm_object = DataBase.domain_to_orm(domain_object, foreign_key)
-                session.add(orm_object)
-                session.flush()
-
-                # If instance is a camera, handle relationship with actuators
-                if isinstance(domain_object, FTPCamera) or isinstance(domain_object, USBCamera):
-                    for actuator in domain_object.actuators:
-                        orm_actuator = (
-                            session.query(ORMActuator).filter_by(actuator_id=actuator.id).first()
-                        )
-                        if orm_actuator:
-                            orm_object.actuators.append(orm_actuator)
-
-                if isinstance(domain_object, DetectionEvent) and domain_object.classified_animals:
-                    for classified_animal in domain_object.classified_animals:
-                        classification = classified_animal.get("classification")
-                        if not classification:
-                            continue
-
-                        session.add(
-                            ORMClassifiedAnimals(
-                                detection_event_id=orm_object.db_id,
-                                classified_animal=classification[0],
-                                probability=classification[1],
-                            )
-                        )
-
-                session.commit()
-                logger.debug(
-                    "Object '%s' successfully added to the db!", type(domain_object).__name__
-                )
             except IntegrityError:
                 session.rollback()  # Cancel modifications in case of error
                 logger.exception(
@@ -478,6 +505,168 @@ class DataBase(ABC):
         else:
             logger.error("Failed to insert object into db as session could not been created.")
 
+    @classmethod
+    def get_writer(cls):
+        """Method to get the background db writer, starting it if needed."""
+
+        if DataBase.db_writer is None:
+            DataBase.db_writer = DBWriter(DataBase._write_batch)
+        return DataBase.db_writer
+
+    @classmethod
+    def stop_writer(cls):
+        """Method to write pending operations and stop the background db writer."""
+
+        if DataBase.db_writer:
+            logger.debug("Flushing %d pending db operations...", DataBase.db_writer.pending)
+            DataBase.db_writer.stop()
+            DataBase.db_writer = None
+
+    @classmethod
+    def _submit(cls, operation, *args):
+        """Method to enqueue a db operation, writing it synchronously if the writer is
+        stopping. Pending operations are written first, to keep operations order."""
+
+        producer = cls._get_producer()
+        producer.seq += 1
+        operation = DBOperation(operation, producer.id, producer.seq)
+        writer = cls.get_writer()
+        if not writer.submit(operation, *args):
+            writer.flush()
+            cls._write_batch([(operation, args)])
+
+    @classmethod
+    def _get_producer(cls):
+        if not hasattr(cls.producer, "id"):
+            cls.producer.id = next(cls.producer_ids)
+            cls.producer.seq = 0
+        return cls.producer
+
+    @classmethod
+    def write_mark(cls):
+        """Method to get the sequence number of the last db operation enqueued by the
+        calling thread, to make after write callbacks depend on the following ones."""
+
+        return cls._get_producer().seq
+
+    @classmethod
+    def enqueue_insert(cls, domain_object):
+        """Method to insert a WADAS object into the db in background.
+        Used from detection and actuation hot paths not to wait for the db."""
+
+        cls._submit(cls._add_to_session, domain_object)
+
+    @classmethod
+    def enqueue_detection_event_update(cls, detection_event: DetectionEvent):
+        """Method to update a detection event into the db in background."""
+
+        cls._submit(cls._update_detection_event_in_session, detection_event)
+
+    @classmethod
+    def enqueue_tunnel_stats(cls, tunnel_id, time_stamp, in_count, out_count):
+        """Method to count animals crossing a tunnel into statistics rollups in background."""
+
+        cls._submit(add_tunnel_stats, tunnel_id, time_stamp, in_count, out_count)
+
+    @classmethod
+    def enqueue_after_write(cls, callback, *args, since=None):
+        """Method to run a callback once the db operations enqueued so far are committed,
+        e.g. to notify an event once its db id is known. If since is a write_mark, the
+        callback is skipped when any operation enqueued by the calling thread after the
+        mark failed, e.g. not to acknowledge media whose events were not written."""
+
+        if since is None:
+            cls._submit(cls._add_after_commit_callback, callback, *args)
+        else:
+            producer = cls._get_producer().id
+            cls._submit(cls._add_after_write_callback, producer, since, callback, *args)
+
+    @staticmethod
+    def _add_after_commit_callback(session, callback, *args):
+        session.info.setdefault("after_commit", []).append((callback, args))
+
+    @classmethod
+    def _add_after_write_callback(cls, session, producer, since, callback, *args):
+        # Operations are written in order: the ones before the callback are already done
+        if cls.failed_writes.get(producer, 0) > since:
+            logger.warning("Skipping db after write callback, as db operations failed.")
+            return
+        cls._add_after_commit_callback(session, callback, *args)
+
+    @classmethod
+    def _record_failed_writes(cls, batch):
+        for operation, _ in batch:
+            if isinstance(operation, DBOperation):
+                cls.failed_writes[operation.producer] = operation.seq
+
+    @staticmethod
+    def _run_after_commit_callbacks(session):
+        for callback, args in session.info.pop("after_commit", []):
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception("Error while running db after commit callback.")
+
+    @classmethod
+    def rebuild_stats(cls):
+        """Method to recompute statistics rollups from events stored in db.
+        Errors are raised, so that a db update is not recorded without its rollups."""
+
+        if not (session := cls.create_session()):
+            raise RuntimeError("Unable to rebuild statistics, db session not available.")
+        try:
+            rebuild_stats(session)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @classmethod
+    def _write_batch(cls, batch):
+        """Method to run a batch of db operations in a single transaction.
+        If the transaction fails, operations are retried one at a time so that a
+        single failing operation does not prevent the others to be written."""
+
+        if not (session := cls.create_session()):
+            logger.error("Unable to write %d operations into db, no session.", len(batch))
+            cls._record_failed_writes(batch)
+            return
+        # Db ids assigned by a rolled back flush do not exist in db: they are restored
+        events_db_id = [
+            (args[0], args[0].db_id)
+            for _, args in batch
+            if args and isinstance(args[0], DetectionEvent)
+        ]
+        try:
+            for operation, args in batch:
+                operation(session, *args)
+            session.commit()
+            logger.debug("Written %d operations into db.", len(batch))
+            cls._run_after_commit_callbacks(session)
+            return
+        except (SQLAlchemyError, InterfaceError):
+            session.rollback()
+            for detection_event, db_id in events_db_id:
+                detection_event.db_id = db_id
+            if len(batch) == 1:
+                logger.exception("Error while writing into db.")
+                cls._record_failed_writes(batch)
+                return
+            logger.warning("Error while writing %d operations into db, retrying.", len(batch))
+        except Exception:
+            session.rollback()
+            for detection_event, db_id in events_db_id:
+                detection_event.db_id = db_id
+            cls._record_failed_writes(batch)
+            raise
+        finally:
+            session.close()
+
+        for operation in batch:
+            cls._write_batch([operation])
+
     def update_db_version(self):
         """Method to update database version."""
 
@@ -532,6 +721,10 @@ class DataBase(ABC):
                     text("ALTER TABLE actuator_battery_status ADD COLUMN humidity FLOAT NULL;")
                 )
 
+            # Create tables introduced after db creation (statistics rollups, from v1.0.0.b8)
+            Base.metadata.create_all(DataBase.get_engine())
+            DataBase.rebuild_stats()
+
             DataBase.run_query(text(f"UPDATE db_metadata SET version='{__dbversion__}';"))
             logger.info("Database updated from %s to %s", cur_db_version, __dbversion__)
         except Exception:
@@ -539,7 +732,7 @@ class DataBase(ABC):
             failed = True
             raise
         finally:
-            if failed and backup_file and self.db_type == DataBase.DBTypes.SQLITE:
+            if failed and backup_file and self.type == DataBase.DBTypes.SQLITE:
                 logger.warning("Restoring DB from backup due to failure...")
                 try:
                     self.restore_db(backup_file)
@@ -547,6 +740,59 @@ class DataBase(ABC):
                 except Exception:
                     logger.exception("Restore failed! Manual intervention required.")
 
+    @classmethod
+    def _update_detection_event_in_session(cls, session, detection_event: DetectionEvent):
+        """Method to add a detection event update to a session."""
+
+        # Db id is carried by the detection event when inserted by this process
+        detection_event_db_id = detection_event.db_id or cls.get_detection_event_id(detection_event)
+        if not detection_event_db_id:
+            logger.error("Unable to update detection event as detection event not found in db.")
+            return
+        detection_event.db_id = detection_event_db_id
+        if not (
+            orm_event := session.execute(
+                select(ORMDetectionEvent.camera_id, ORMDetectionEvent.time_stamp).where(
+                    ORMDetectionEvent.db_id == detection_event_db_id
+                )
+            ).first()
+        ):
+            logger.error(
+                "Unable to update detection event %s as not found in db.", detection_event_db_id
+            )
+            return
+
+        session.execute(
+            update(ORMDetectionEvent)
+            .where(ORMDetectionEvent.db_id == detection_event_db_id)
+            .values(
+                classification=detection_event.classification,
+                classification_img_path=detection_event.classification_media_path,
+            )
+        )
+        # Classified animals are replaced, as they might have been inserted with the event
+        previous_animals = (
+            session.execute(
+                select(ORMClassifiedAnimals.classified_animal).where(
+                    ORMClassifiedAnimals.detection_event_id == detection_event_db_id
+                )
+            )
+            .scalars()
+            .all()
+        )
+        for animal in previous_animals:
+            add_species_stats(session, orm_event.camera_id, orm_event.time_stamp, animal, -1)
+        session.execute(
+            delete(ORMClassifiedAnimals).where(
+                ORMClassifiedAnimals.detection_event_id == detection_event_db_id
+            )
+        )
+        if detection_event.classified_animals:
+            cls._add_classified_animals(
+                session, detection_event, orm_event.camera_id, orm_event.time_stamp
+            )
+
+    @classmethod
     def update_detection_event(cls, detection_event: DetectionEvent):
         """Update fields of a detection_events record in db.
         This is typically the case when classification details
@@ -554,36 +800,11 @@ class DataBase(ABC):
         """
 
         logger.debug("Updating detection event db entry...")
-        # Retrieve the db id of the updated detection event
-        detection_event_db_id = cls.get_detection_event_id(detection_event)
-        if not detection_event_db_id:
-            logger.error("Unable to update detection event as detection event not found in db.")
-            return
-
         if session := cls.create_session():
             try:
-                # Update detection_event table
-                stmt = (
-                    update(ORMDetectionEvent)
-                    .where(and_(ORMDetectionEvent.db_id == detection_event_db_id))
-                    .values(
-                        classification=detection_event.classification,
-                        classification_img_path=detection_event.classification_media_path,
-                    )
-                )
-                cls.run_query(stmt)
-
-                if detection_event_db_id:
-                    # Create ClassifiedAnimals table entries and link them with detection event
-                    for classified_animal in detection_event.classified_animals:
-                        orm_obj = ORMClassifiedAnimals(
-                            detection_event_id=detection_event_db_id,  # Link to det event by ID
-                            classified_animal=classified_animal["classification"][0],
-                            probability=classified_animal["classification"][1],
-                        )
-                        session.add(orm_obj)
-                    session.commit()
-
+                cls._update_detection_event_in_session(session, detection_event)
+                session.commit()
+                cls._run_after_commit_callbacks(session)
             except InterfaceError:
                 session.rollback()
                 logger.error("Database connection lost. Update operation failed.")
@@ -632,6 +853,7 @@ class DataBase(ABC):
                 .values(deletion_date=deletion_date_time)
             )
             cls.run_query(stmt)
+            cls._invalidate_db_id(DataBase.camera_db_ids, camera_db_id)
             # Delete camera association with actuators, if any
             stmt = delete(camera_actuator_association).where(
                 camera_actuator_association.c.camera_id == camera_db_id
@@ -640,6 +862,7 @@ class DataBase(ABC):
         else:
             stmt = update(ORMCamera).where(ORMCamera.db_id == camera_db_id).values(enabled=enabled)
             cls.run_query(stmt)
+        cls._notify_lookup_update("cameras")
         return True
 
     @classmethod
@@ -671,6 +894,7 @@ class DataBase(ABC):
                 .values(deletion_date=deletion_date_time)
             )
             cls.run_query(stmt)
+            cls._invalidate_db_id(DataBase.actuator_db_ids, actuator_db_id)
             # Delete actuator association with cameras, if any
             stmt = delete(camera_actuator_association).where(
                 camera_actuator_association.c.actuator_id == actuator_db_id
@@ -810,20 +1034,12 @@ class DataBase(ABC):
     def get_camera_id(cls, camera_id):
         """Method to return camera database id (primary key)"""
 
+        if camera_db_id := DataBase.camera_db_ids.get(camera_id):
+            return camera_db_id
+
         if session := cls.create_session():
             try:
-                return (
-                    session.query(ORMCamera.db_id)
-                    .filter(
-                        and_(
-                            ORMCamera.camera_id == camera_id,
-                            ORMCamera.deletion_date.is_(
-                                None
-                            ),  # Avoid to return id of deleted camera
-                        )
-                    )
-                    .scalar()
-                )  # Use scalar() to retrieve the value directly
+                return cls._resolve_camera_db_id(session, camera_id)
             finally:
                 session.close()
         else:
@@ -836,20 +1052,12 @@ class DataBase(ABC):
     def get_actuator_id(cls, actuator_id):
         """Method to return actuator database id (primary key)"""
 
+        if actuator_db_id := DataBase.actuator_db_ids.get(actuator_id):
+            return actuator_db_id
+
         if session := cls.create_session():
             try:
-                return (
-                    session.query(ORMActuator.db_id)
-                    .filter(
-                        and_(
-                            ORMActuator.actuator_id == actuator_id,
-                            ORMActuator.deletion_date.is_(
-                                None
-                            ),  # Avoid to return id of deleted camera
-                        )
-                    )
-                    .scalar()
-                )
+                return cls._resolve_actuator_db_id(session, actuator_id)
             finally:
                 session.close()
         else:
@@ -858,6 +1066,105 @@ class DataBase(ABC):
             )
             return None
 
+    @staticmethod
+    def _resolve_camera_db_id(session, camera_id):
+        """Method to return camera database id from cache, querying it in session if missing."""
+
+        if camera_db_id := DataBase.camera_db_ids.get(camera_id):
+            return camera_db_id
+
+        camera_db_id = (
+            session.query(ORMCamera.db_id)
+            .filter(
+                and_(
+                    ORMCamera.camera_id == camera_id,
+                    ORMCamera.deletion_date.is_(None),  # Avoid to return id of deleted camera
+                )
+            )
+            .scalar()
+        )  # Use scalar() to retrieve the value directly
+        if camera_db_id:
+            DataBase.camera_db_ids[camera_id] = camera_db_id
+        return camera_db_id
+
+    @staticmethod
+    def _resolve_actuator_db_id(session, actuator_id):
+        """Method to return actuator database id from cache, querying it in session if missing."""
+
+        if actuator_db_id := DataBase.actuator_db_ids.get(actuator_id):
+            return actuator_db_id
+
+        actuator_db_id = (
+            session.query(ORMActuator.db_id)
+            .filter(
+                and_(
+                    ORMActuator.actuator_id == actuator_id,
+                    ORMActuator.deletion_date.is_(None),  # Avoid to return id of deleted actuator
+                )
+            )
+            .scalar()
+        )
+        if actuator_db_id:
+            DataBase.actuator_db_ids[actuator_id] = actuator_db_id
+        return actuator_db_id
+
+    @classmethod
+    def load_id_cache(cls):
+        """Method to load db ids of all not deleted cameras and actuators in cache."""
+
+        if session := cls.create_session():
+            try:
+                camera_db_ids = dict(
+                    session.query(ORMCamera.camera_id, ORMCamera.db_id)
+                    .filter(ORMCamera.deletion_date.is_(None))
+                    .all()
+                )
+                actuator_db_ids = dict(
+                    session.query(ORMActuator.actuator_id, ORMActuator.db_id)
+                    .filter(ORMActuator.deletion_date.is_(None))
+                    .all()
+                )
+            except SQLAlchemyError:
+                logger.exception("Unable to load camera and actuator ids from db.")
+                return
+            finally:
+                session.close()
+            with DataBase.id_cache_lock:
+                DataBase.camera_db_ids = camera_db_ids
+                DataBase.actuator_db_ids = actuator_db_ids
+            logger.debug(
+                "Loaded %d camera and %d actuator ids from db.",
+                len(camera_db_ids),
+                len(actuator_db_ids),
+            )
+        else:
+            logger.debug("Could not load ids cache since session has not been created.")
+
+    @staticmethod
+    def clear_id_cache():
+        """Method to empty camera and actuator ids cache."""
+
+        with DataBase.id_cache_lock:
+            DataBase.camera_db_ids = {}
+            DataBase.actuator_db_ids = {}
+
+    @staticmethod
+    def _cache_db_id(domain_object, orm_object):
+        """Method to cache db id of a camera or actuator once committed into db."""
+
+        if isinstance(domain_object, Camera):
+            DataBase.camera_db_ids[domain_object.id] = orm_object.db_id
+        elif isinstance(domain_object, Actuator):
+            DataBase.actuator_db_ids[domain_object.id] = orm_object.db_id
+
+    @staticmethod
+    def _invalidate_db_id(db_ids, db_id):
+        """Method to remove a deleted db id from a cache."""
+
+        with DataBase.id_cache_lock:
+            for key in [key for key, value in db_ids.items() if value == db_id]:
+                del db_ids[key]
+
     @classmethod
     def get_detection_event_id(cls, detection_event: DetectionEvent):
         """Method to return detection event database id (primary key)"""
@@ -910,6 +1217,13 @@ class DataBase(ABC):
                 path=domain_object.path,
                 creation_date=get_precise_timestamp(),
             )
+        elif isinstance(domain_object, StreamCamera):
+            return ORMStreamCamera(
+                camera_id=domain_object.id,
+                enabled=domain_object.enabled,
+                url=domain_object.url,
+                creation_date=get_precise_timestamp(),
+            )
         elif isinstance(domain_object, RoadSignActuator):
             return ORMRoadSignActuator(
                 actuator_id=domain_object.id,
@@ -1031,6 +1345,12 @@ class DataBase(ABC):
                     vid=orm_object.vid,
                     path=orm_object.path,
                 )
+            elif isinstance(orm_object, ORMStreamCamera):
+                return StreamCamera(
+                    id=orm_object.camera_id,
+                    url=orm_object.url,
+                    enabled=orm_object.enabled,
+                )
             elif isinstance(orm_object, ORMRoadSignActuator):
                 return RoadSignActuator(id=orm_object.actuator_id, enabled=orm_object.enabled)
             elif isinstance(orm_object, ORMFeederActuator):
@@ -1124,6 +1444,7 @@ class DataBase(ABC):
                         .values(deletion_date=deletion_date_time)
                     )
                     cls.run_query(stmt)
+                    cls._invalidate_db_id(DataBase.actuator_db_ids, actuator_db_id)
                     # Delete camera association with actuators, if any
                     stmt = delete(camera_actuator_association).where(
                         camera_actuator_association.c.actuator_id == extra_actuator_id
@@ -1144,11 +1465,17 @@ class DataBase(ABC):
                         .values(deletion_date=deletion_date_time)
                     )
                     cls.run_query(stmt)
+                    cls._invalidate_db_id(DataBase.camera_db_ids, camera_db_id)
                     # Delete camera association with actuators, if any
                     stmt = delete(camera_actuator_association).where(
                         camera_actuator_association.c.camera_id == extra_camera_id
                     )
                     cls.run_query(stmt)
+                if db_extra_camera_ids:
+                    cls._notify_lookup_update("cameras")
+
+                # Reload ids as db rows might have been replaced
+                cls.load_id_cache()
 
             except InterfaceError:
                 session.rollback()
@@ -1164,6 +1491,21 @@ class DataBase(ABC):
         else:
             logger.error("Could not sanitize db as session has not been created.")
 
+    @classmethod
+    def _notify_user_update(cls, username):
+        """Method to notify listeners (e.g. web server user cache) that a user changed."""
+
+        for listener in DataBase.users_listeners:
+            listener(username)
+
+    @classmethod
+    def _notify_lookup_update(cls, lookup, value=None):
+        """Method to notify listeners (e.g. web server lookups cache) that reference data
+        changed."""
+
+        for listener in DataBase.lookups_listeners:
+            listener(lookup, value)
+
     @classmethod
     def get_users(cls):
         """Method to retrieve users from db"""
@@ -1219,6 +1561,7 @@ class DataBase(ABC):
 
                 session.execute(stmt)
                 session.commit()
+                cls._notify_user_update(username)
                 return True
             else:
                 logger.error(
@@ -1248,6 +1591,7 @@ class DataBase(ABC):
 
                 session.execute(stmt)
                 session.commit()
+                cls._notify_user_update(username)
                 return True
             else:
                 logger.error(
@@ -1281,6 +1625,7 @@ class DataBase(ABC):
 
                 session.execute(stmt)
                 session.commit()
+                cls._notify_user_update(username)
                 return True
             else:
                 logger.error(
@@ -1312,6 +1657,7 @@ class DataBase(ABC):
                     logger.warning("Could not delete user '%s'.", username)
                     return False
                 session.commit()
+                cls._notify_user_update(username)
                 return True
             else:
                 logger.error(
@@ -1502,9 +1848,7 @@ class MySQLDataBase(DataBase):
                 DataBase.wadas_db_engine = None
 
             # Recreate engine with correct database
-            DataBase.wadas_db_engine = create_engine(
-                self.get_connection_string(), pool_recycle=300, pool_pre_ping=True
-            )
+            DataBase.get_engine()
 
             # Create tables
             Base.metadata.create_all(DataBase.wadas_db_engine)
@@ -1695,9 +2039,7 @@ class MariaDBDataBase(DataBase):
                 DataBase.wadas_db_engine = None
 
             # Recreate engine with correct database
-            DataBase.wadas_db_engine = create_engine(
-                self.get_connection_string(create=False), pool_recycle=300, pool_pre_ping=True
-            )
+            DataBase.get_engine()
 
             # Create tables
             Base.metadata.create_all(DataBase.wadas_db_engine)
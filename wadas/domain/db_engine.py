@@ -0,0 +1,73 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: SQLAlchemy engine creation shared by WADAS and WADAS web server.
+
+import logging
+
+from sqlalchemy import create_engine, event
+
+logger = logging.getLogger(__name__)
+
+# SQLite settings allowing the detection process and the web server to share the db
+# file: readers do not block the writer (WAL) and locked db waits instead of failing.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",  # milliseconds
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Method to configure each new SQLite connection."""
+
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _log_disconnection(context):
+    """Method to log db disconnections. Pooled connections are invalidated by SQLAlchemy
+    and replaced at next checkout."""
+
+    if context.is_disconnect:
+        logger.warning("Database connection lost, pooled connections invalidated.")
+
+
+def create_db_engine(
+    connection_string, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=300
+):
+    """Method to create the engine for a db connection string.
+    Pool settings apply to server databases (MySQL, MariaDB) only."""
+
+    if connection_string.startswith("sqlite"):
+        engine = create_engine(connection_string)
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+    else:
+        engine = create_engine(
+            connection_string,
+            pool_size=pool_size,  # Persistent connections kept in pool
+            max_overflow=max_overflow,  # Extra temporary connections allowed under load
+            pool_timeout=pool_timeout,  # Max seconds to wait for a connection from the pool
+            pool_recycle=pool_recycle,  # Recycle connections below MariaDB/MySQL wait_timeout
+            pool_pre_ping=True,  # Check if connection is still valid on checkout
+        )
+        event.listen(engine, "handle_error", _log_disconnection)
+    return engine
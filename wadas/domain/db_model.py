@@ -114,6 +114,15 @@ class FTPCamera(Camera):
     __mapper_args__ = {"polymorphic_identity": DomainCamera.CameraTypes.FTP_CAMERA}
 
 
+class StreamCamera(Camera):
+    __tablename__ = "stream_cameras"
+
+    db_id = Column(Integer, ForeignKey("cameras.id"), primary_key=True, name="id")
+    url = Column(Text, nullable=False)
+
+    __mapper_args__ = {"polymorphic_identity": DomainCamera.CameraTypes.STREAM_CAMERA}
+
+
 class Actuator(Base):
     __tablename__ = "actuators"
 
@@ -221,6 +230,49 @@ class ActuatorTemperatureStatus(Base):
     humidity = Column(Float, nullable=True)
 
 
+# Statistics rollups, incrementally updated on events insertion
+class DetectionStats(Base):
+    __tablename__ = "detection_stats"
+
+    period = Column(String(8), primary_key=True)  # "hour" or "day"
+    period_start = Column(MySQLDATETIME6(timezone=True), primary_key=True)
+    camera_id = Column(Integer, ForeignKey("cameras.id", ondelete="CASCADE"), primary_key=True)
+    detections = Column(Integer, nullable=False, default=0)
+
+
+class SpeciesStats(Base):
+    __tablename__ = "species_stats"
+
+    period = Column(String(8), primary_key=True)
+    period_start = Column(MySQLDATETIME6(timezone=True), primary_key=True)
+    camera_id = Column(Integer, ForeignKey("cameras.id", ondelete="CASCADE"), primary_key=True)
+    species = Column(String(255), primary_key=True)
+    animals = Column(Integer, nullable=False, default=0)
+
+
+class TunnelStats(Base):
+    __tablename__ = "tunnel_stats"
+
+    period = Column(String(8), primary_key=True)
+    period_start = Column(MySQLDATETIME6(timezone=True), primary_key=True)
+    tunnel_id = Column(String(255), primary_key=True)
+    in_count = Column(Integer, nullable=False, default=0)
+    out_count = Column(Integer, nullable=False, default=0)
+
+
+class TelemetryStats(Base):
+    __tablename__ = "telemetry_stats"
+
+    period = Column(String(8), primary_key=True)
+    period_start = Column(MySQLDATETIME6(timezone=True), primary_key=True)
+    actuator_id = Column(Integer, ForeignKey("actuators.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(String(32), primary_key=True)  # e.g. "battery_voltage"
+    samples = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0)  # Sum of values, for the mean
+    min_value = Column(Float, nullable=False)
+    max_value = Column(Float, nullable=False)
+
+
 # Database service tables, not mapped with any WADAS class
 class User(Base):
     __tablename__ = "users"
@@ -0,0 +1,302 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Statistics rollups maintained incrementally along with events insertion.
+
+import datetime
+import logging
+from collections import Counter
+
+from sqlalchemy import and_, delete, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from wadas.domain.db_model import (
+    ActuatorBatteryStatus,
+    ActuatorTemperatureStatus,
+    ClassifiedAnimals,
+    DetectionEvent,
+    DetectionStats,
+    SpeciesStats,
+    TelemetryStats,
+    TunnelStats,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rollup granularities, each event increments one bucket per period
+STATS_PERIODS = ("hour", "day")
+SPECIES_MAX_LENGTH = 255
+REBUILD_BATCH_SIZE = 1000
+# Actuators telemetry metrics: (raw readings table, column)
+TELEMETRY_METRICS = {
+    "battery_voltage": (ActuatorBatteryStatus, "voltage"),
+    "battery_temperature": (ActuatorBatteryStatus, "temperature"),
+    "battery_humidity": (ActuatorBatteryStatus, "humidity"),
+    "temperature": (ActuatorTemperatureStatus, "temperature"),
+    "humidity": (ActuatorTemperatureStatus, "humidity"),
+}
+
+
+def period_start(time_stamp, period):
+    """Method to get the start of the period bucket a timestamp belongs to."""
+
+    if period == "hour":
+        return time_stamp.replace(minute=0, second=0, microsecond=0)
+    return time_stamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _increment(session, orm_class, keys, counters, minimums=None, maximums=None):
+    """Method to add counters to a rollup row with a single upsert, creating it if needed.
+    Minimums and maximums columns are lowered or raised to the given values."""
+
+    minimums = minimums or {}
+    maximums = maximums or {}
+    table = orm_class.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table).values(**keys, **counters, **minimums, **maximums)
+        new_values = stmt.excluded
+        # SQLite min() and max() with multiple arguments are scalar functions
+        lowest, greatest = func.min, func.max
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table).values(**keys, **counters, **minimums, **maximums)
+        new_values = stmt.inserted
+        lowest, greatest = func.least, func.greatest
+    else:
+        if row := session.get(orm_class, tuple(keys.values())):
+            for name, value in counters.items():
+                setattr(row, name, getattr(row, name) + value)
+            for name, value in minimums.items():
+                setattr(row, name, min(getattr(row, name), value))
+            for name, value in maximums.items():
+                setattr(row, name, max(getattr(row, name), value))
+        else:
+            session.add(orm_class(**keys, **counters, **minimums, **maximums))
+        return
+
+    updates = {name: table.c[name] + new_values[name] for name in counters}
+    updates.update({name: lowest(table.c[name], new_values[name]) for name in minimums})
+    updates.update({name: greatest(table.c[name], new_values[name]) for name in maximums})
+    if dialect == "sqlite":
+        stmt = stmt.on_conflict_do_update(index_elements=list(keys), set_=updates)
+    else:
+        stmt = stmt.on_duplicate_key_update(updates)
+    session.execute(stmt)
+
+
+def add_detection_stats(session, camera_db_id, time_stamp, delta=1):
+    """Method to count detection events in rollups."""
+
+    for period in STATS_PERIODS:
+        _increment(
+            session,
+            DetectionStats,
+            {
+                "period": period,
+                "period_start": period_start(time_stamp, period),
+                "camera_id": camera_db_id,
+            },
+            {"detections": delta},
+        )
+
+
+def add_species_stats(session, camera_db_id, time_stamp, species, delta=1):
+    """Method to count classified animals of a given species in rollups."""
+
+    if delta and species:
+        for period in STATS_PERIODS:
+            _increment(
+                session,
+                SpeciesStats,
+                {
+                    "period": period,
+                    "period_start": period_start(time_stamp, period),
+                    "camera_id": camera_db_id,
+                    "species": species[:SPECIES_MAX_LENGTH],
+                },
+                {"animals": delta},
+            )
+
+
+def add_tunnel_stats(session, tunnel_id, time_stamp, in_count, out_count):
+    """Method to count animals entering and leaving a tunnel in rollups."""
+
+    # Tunnels are not stored in db, hence rollups reference them by id
+    for period in STATS_PERIODS:
+        _increment(
+            session,
+            TunnelStats,
+            {
+                "period": period,
+                "period_start": period_start(time_stamp, period),
+                "tunnel_id": tunnel_id,
+            },
+            {"in_count": in_count, "out_count": out_count},
+        )
+
+
+def add_telemetry_stats(session, actuator_db_id, time_stamp, values):
+    """Method to aggregate actuator telemetry readings ({metric: value}) in rollups."""
+
+    for metric, value in values.items():
+        if value is None:
+            continue  # Optional sensor not plugged
+        for period in STATS_PERIODS:
+            _increment(
+                session,
+                TelemetryStats,
+                {
+                    "period": period,
+                    "period_start": period_start(time_stamp, period),
+                    "actuator_id": actuator_db_id,
+                    "metric": metric,
+                },
+                {"samples": 1, "total": value},
+                {"min_value": value},
+                {"max_value": value},
+            )
+
+
+def get_telemetry_values(orm_object):
+    """Method to get the {metric: value} readings of a raw telemetry ORM object."""
+
+    return {
+        metric: getattr(orm_object, column)
+        for metric, (orm_class, column) in TELEMETRY_METRICS.items()
+        if isinstance(orm_object, orm_class)
+    }
+
+
+def _rebuild_telemetry_stats(session):
+    """Method to recompute telemetry rollups from raw readings."""
+
+    aggregates = {}
+    for orm_class in (ActuatorBatteryStatus, ActuatorTemperatureStatus):
+        rows = session.execute(select(orm_class).execution_options(yield_per=REBUILD_BATCH_SIZE))
+        for (reading,) in rows:
+            for metric, value in get_telemetry_values(reading).items():
+                if value is None:
+                    continue
+                for period in STATS_PERIODS:
+                    key = (
+                        period,
+                        period_start(reading.time_stamp, period),
+                        reading.actuator_id,
+                        metric,
+                    )
+                    if aggregate := aggregates.get(key):
+                        aggregate["samples"] += 1
+                        aggregate["total"] += value
+                        aggregate["min_value"] = min(aggregate["min_value"], value)
+                        aggregate["max_value"] = max(aggregate["max_value"], value)
+                    else:
+                        aggregates[key] = {
+                            "samples": 1,
+                            "total": value,
+                            "min_value": value,
+                            "max_value": value,
+                        }
+        session.expunge_all()
+
+    # Rollups of readings already removed by retention policies are kept
+    first_starts = {}
+    for p, start, actuator_id, _ in aggregates:
+        if start < first_starts.get((p, actuator_id), datetime.datetime.max):
+            first_starts[(p, actuator_id)] = start
+    for (p, actuator_id), first_start in first_starts.items():
+        session.execute(
+            delete(TelemetryStats).where(
+                and_(
+                    TelemetryStats.period == p,
+                    TelemetryStats.actuator_id == actuator_id,
+                    TelemetryStats.period_start >= first_start,
+                )
+            )
+        )
+    if aggregates:
+        session.execute(
+            insert(TelemetryStats),
+            [
+                {
+                    "period": p,
+                    "period_start": start,
+                    "actuator_id": actuator_id,
+                    "metric": metric,
+                    **aggregate,
+                }
+                for (p, start, actuator_id, metric), aggregate in aggregates.items()
+            ],
+        )
+
+
+def rebuild_stats(session):
+    """Method to recompute detection and species rollups from events tables.
+    Used to populate rollups of databases created before their introduction."""
+
+    detections = Counter()
+    species = Counter()
+    rows = session.execute(
+        select(DetectionEvent.camera_id, DetectionEvent.time_stamp).execution_options(
+            yield_per=REBUILD_BATCH_SIZE
+        )
+    )
+    for camera_id, time_stamp in rows:
+        for period in STATS_PERIODS:
+            detections[(period, period_start(time_stamp, period), camera_id)] += 1
+    rows = session.execute(
+        select(
+            DetectionEvent.camera_id,
+            DetectionEvent.time_stamp,
+            ClassifiedAnimals.classified_animal,
+        )
+        .join(ClassifiedAnimals, ClassifiedAnimals.detection_event_id == DetectionEvent.db_id)
+        .where(ClassifiedAnimals.classified_animal.is_not(None))
+        .execution_options(yield_per=REBUILD_BATCH_SIZE)
+    )
+    for camera_id, time_stamp, animal in rows:
+        for period in STATS_PERIODS:
+            species[
+                (period, period_start(time_stamp, period), camera_id, animal[:SPECIES_MAX_LENGTH])
+            ] += 1
+
+    session.execute(delete(DetectionStats))
+    session.execute(delete(SpeciesStats))
+    if detections:
+        session.execute(
+            insert(DetectionStats),
+            [
+                {"period": p, "period_start": start, "camera_id": camera_id, "detections": count}
+                for (p, start, camera_id), count in detections.items()
+            ],
+        )
+    if species:
+        session.execute(
+            insert(SpeciesStats),
+            [
+                {
+                    "period": p,
+                    "period_start": start,
+                    "camera_id": camera_id,
+                    "species": animal,
+                    "animals": count,
+                }
+                for (p, start, camera_id, animal), count in species.items()
+            ],
+        )
+    _rebuild_telemetry_stats(session)
+    logger.info("Statistics rebuilt over %d detection buckets.", len(detections))
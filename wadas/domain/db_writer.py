@@ -0,0 +1,97 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Write-behind database writer batching operations in background.
+
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class DBWriter:
+    """Background writer executing database operations in batches.
+    Operations are (function, args) tuples, executed in FIFO order by a single thread
+    through execute_batch, that runs a whole batch in a single transaction."""
+
+    # Max number of pending operations
+    max_size = 1000
+    BATCH_SIZE = 100
+    # Interval of warnings while producers wait for a free slot
+    PUT_TIMEOUT = 5  # seconds
+
+    def __init__(self, execute_batch):
+        self.execute_batch = execute_batch
+        self._queue = queue.Queue(maxsize=DBWriter.max_size)
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="wadas-db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation, *args):
+        """Method to enqueue a database operation. When the queue is full producers wait
+        for a free slot, so that operations are never written out of order.
+        Returns False if the operation could not be enqueued (writer stopped)."""
+
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put((operation, args), timeout=DBWriter.PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                logger.warning(
+                    "Database writer queue full (%d operations), waiting...", DBWriter.max_size
+                )
+        return False
+
+    def _run(self):
+        """Method run by writer thread."""
+
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            try:
+                batch = [self._queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while len(batch) < DBWriter.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.execute_batch(batch)
+            except Exception:
+                logger.exception("Unexpected error writing %d operations into db.", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    @property
+    def pending(self):
+        """Number of operations waiting to be written."""
+
+        return self._queue.qsize()
+
+    def flush(self):
+        """Method to wait until all the enqueued operations are written."""
+
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def stop(self):
+        """Method to write pending operations and stop the writer thread."""
+
+        self._stop_event.set()
+        self._thread.join()
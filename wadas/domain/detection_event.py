@@ -46,6 +46,8 @@ class DetectionEvent:
         self.classification_media_path = classification_media_path
         self.classified_animals = classified_animals
         self.preview_image = preview_image
+        # Database id, set once the event is inserted into db
+        self.db_id = None
 
     def serialize_classified_animals(self):
         """Method to prepare JSON serialization to db of classified_animals attribute."""
@@ -0,0 +1,185 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Publish/subscribe hub pushing live WADAS events to web clients.
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from math import inf
+
+logger = logging.getLogger(__name__)
+
+
+class EventTopics(Enum):
+    DETECTION = "detection"
+    CLASSIFICATION = "classification"
+    ACTUATION = "actuation"
+    ACTUATOR_STATUS = "actuator_status"
+
+
+class Subscription:
+    """Class holding the events delivered to a subscriber, consumed in its asyncio loop."""
+
+    def __init__(self, topics, loop, max_size):
+        self.topics = set(topics)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_size)
+        # Set when events have been dropped as subscriber is too slow
+        self.overflow = False
+
+    def put(self, event):
+        """Method to enqueue an event, dropping the oldest one if queue is full.
+        Must be run in subscriber loop."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.overflow = True
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """Method to get the next event, None if timeout expires."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventHub:
+    """Publish/subscribe hub. Events are published from any thread (detection workers,
+    actuator server) and delivered to the subscriptions of the topic, in their loop.
+    Latest events are kept so that reconnecting subscribers can resume."""
+
+    max_queue_size = 100
+    history_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._history = deque(maxlen=EventHub.history_size)
+        self._last_id = 0
+
+    def publish(self, topic: EventTopics, data: dict):
+        """Method to publish an event to the subscribers of its topic."""
+        with self._lock:
+            self._last_id += 1
+            event = {"id": self._last_id, "topic": topic.value, "data": data}
+            self._history.append(event)
+            subscriptions = [s for s in self._subscriptions if topic in s.topics]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.put, event)
+            except RuntimeError:
+                # Subscriber loop closed without unsubscribing
+                self.unsubscribe(subscription)
+
+    def subscribe(self, topics, last_event_id=None) -> Subscription:
+        """Method to subscribe the running asyncio loop to some topics.
+        Events published after last_event_id, if still available, are delivered first."""
+        subscription = Subscription(topics, asyncio.get_running_loop(), EventHub.max_queue_size)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if last_event_id is not None:
+                for event in self._history:
+                    if event["id"] > last_event_id and EventTopics(event["topic"]) in topics:
+                        subscription.put(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscribers(self):
+        return len(self._subscriptions)
+
+
+event_hub = EventHub()
+
+
+def _to_json_value(value):
+    """Method to convert enum and datetime values to JSON ones."""
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def publish_detection_event(topic: EventTopics, detection_event):
+    """Method to publish a detection or classification event. Db id is included when
+    the event has been written into db, to fetch its details through web APIs."""
+    if not event_hub.subscribers:
+        return
+
+    detections = detection_event.detected_animals.get("detections")
+    event_hub.publish(
+        topic,
+        {
+            "id": detection_event.db_id,
+            "camera_id": detection_event.camera_id,
+            "time_stamp": _to_json_value(detection_event.time_stamp),
+            "detected_animals": (
+                len(detections.xyxy)
+                if detections is not None
+                else detection_event.detected_animals.get("count", 0)
+            ),
+            "classified_animals": [
+                animal["classification"][0]
+                for animal in detection_event.classified_animals or []
+                if animal.get("classification")
+            ],
+        },
+    )
+
+
+def publish_actuation_event(actuation_event):
+    """Method to publish an actuation event."""
+    if event_hub.subscribers:
+        event_hub.publish(
+            EventTopics.ACTUATION,
+            {
+                "actuator_id": actuation_event.actuator_id,
+                "time_stamp": _to_json_value(actuation_event.time_stamp),
+                "command": _to_json_value(actuation_event.command),
+                "detection_event_id": actuation_event.detection_event.db_id,
+            },
+        )
+
+
+# Last status publication time of each actuator
+_actuator_status_times = {}
+
+
+def publish_actuator_status(actuator, min_interval=None, **status):
+    """Method to publish an actuator status update, with optional sensor values.
+    If min_interval (seconds) is given, status is not published more often than that."""
+    if event_hub.subscribers:
+        now = time.monotonic()
+        if min_interval and now - _actuator_status_times.get(actuator.id, -inf) < min_interval:
+            return
+        _actuator_status_times[actuator.id] = now
+        event_hub.publish(
+            EventTopics.ACTUATOR_STATUS,
+            {
+                "actuator_id": actuator.id,
+                "last_update": _to_json_value(actuator.last_update),
+                **{key: _to_json_value(value) for key, value in status.items()},
+            },
+        )
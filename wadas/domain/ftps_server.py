@@ -18,21 +18,38 @@
 # Description: FTPS server module
 
 import logging
+import multiprocessing
 import os
 import pathlib
+import queue
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from logging.handlers import RotatingFileHandler
 
 import filetype
 from filetype.types.isobmff import IsoBmff
+from pyftpdlib import servers
 from pyftpdlib.authorizers import DummyAuthorizer
-from pyftpdlib.handlers import TLS_FTPHandler
-from pyftpdlib.servers import ThreadedFTPServer
+from pyftpdlib.handlers import ThrottledDTPHandler, TLS_DTPHandler, TLS_FTPHandler
+from pyftpdlib.servers import FTPServer, ThreadedFTPServer
 
 from wadas.domain.camera import media_queue
 
 logger = logging.getLogger(__name__)
 
+# Received files are validated (filetype.guess reads file header from disk) and handed off
+# to media_queue by a small executor, so that the server I/O loop is never blocked.
+_ingestion_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="wadas-ftps-ingest")
+
+
+def _on_ingestion_done(future):
+    """Callback invoked when a received file hand-off completes.
+    Logs any unhandled exception that escaped the hand-off."""
+    exc = future.exception()
+    if exc:
+        logger.error("Unhandled exception handing off received file: %s", exc, exc_info=exc)
+
 
 def initialize_fpts_logger():
     """Method to initialize FTPS server logger"""
@@ -79,9 +96,33 @@ class Mp4Ext(IsoBmff):
             return False
 
 
+class TLS_ThrottledDTPHandler(TLS_DTPHandler, ThrottledDTPHandler):
+    """TLS data channel handler limiting the bandwidth of each transfer."""
+
+
 class TLS_FTP_WADAS_Handler(TLS_FTPHandler):
     """Class to handle FTP communications with FTP Server"""
 
+    # Connection level metrics, shared by all the connections
+    metrics = dict.fromkeys(
+        (
+            "connections_total",
+            "connections_active",
+            "connections_peak",
+            "logins",
+            "failed_logins",
+            "files_received",
+            "files_rejected",
+            "files_incomplete",
+            "files_enqueued",
+        ),
+        0,
+    )
+    metrics_lock = threading.Lock()
+    # Queue to forward received media and metrics to WADAS process, when each
+    # connection is served by a different process (multiprocess server).
+    ipc_queue = None
+
     # register a new type to handle different MP4 formats
     filetype.add_type(Mp4Ext())
 
@@ -98,12 +139,50 @@ class TLS_FTP_WADAS_Handler(TLS_FTPHandler):
             logger.warning("Unsupported file extension for %s. Connection aborted.", file)
             self.ftp_ABOR(None)
 
+    @classmethod
+    def record_metric(cls, name, value=1):
+        """Method to update a connection metric."""
+
+        if cls.ipc_queue is not None:
+            cls.ipc_queue.put(("metric", name, value))
+        else:
+            cls.update_metric(name, value)
+
+    @classmethod
+    def update_metric(cls, name, value):
+        """Method to apply a metric update in WADAS process."""
+
+        with cls.metrics_lock:
+            cls.metrics[name] += value
+            if name == "connections_active":
+                cls.metrics["connections_peak"] = max(
+                    cls.metrics["connections_peak"], cls.metrics["connections_active"]
+                )
+
+    @classmethod
+    def reset_active_connections(cls):
+        """Method to reset active connections once server is stopped, as pending
+        disconnection callbacks are discarded when closing all the connections."""
+
+        with cls.metrics_lock:
+            cls.metrics["connections_active"] = 0
+
+    @classmethod
+    def get_metrics(cls):
+        """Return a snapshot of connection metrics."""
+
+        with cls.metrics_lock:
+            return dict(cls.metrics)
+
     def on_connect(self):
+        self.record_metric("connections_total")
+        self.record_metric("connections_active")
         logger.info(
             "Connected remote camera %s from %s:%s", self.username, self.remote_ip, self.remote_port
         )
 
     def on_disconnect(self):
+        self.record_metric("connections_active", -1)
         logger.info(
             "Disconnected remote camera %s from %s:%s",
             self.username,
@@ -112,13 +191,31 @@ class TLS_FTP_WADAS_Handler(TLS_FTPHandler):
         )
 
     def on_login(self, username):
+        self.record_metric("logins")
         logger.info("%s camera logged in.", username)
 
+    def on_login_failed(self, username, password):
+        self.record_metric("failed_logins")
+        logger.warning("Failed login attempt for camera %s from %s.", username, self.remote_ip)
+
     def on_logout(self, username):
         logger.info("%s camera logged out.", username)
 
     def on_file_received(self, received_file):
         logger.info("Received %s file from FTPS camera %s.", received_file, self.username)
+        self.record_metric("files_received")
+
+        if self.ipc_queue is not None:
+            # Connection runs in its own process: blocking here does not affect other cameras
+            self.enqueue_received_file(received_file, self.username)
+        else:
+            _ingestion_executor.submit(
+                self.enqueue_received_file, received_file, self.username
+            ).add_done_callback(_on_ingestion_done)
+
+    @classmethod
+    def enqueue_received_file(cls, received_file, camera_id):
+        """Method to validate a received file and hand it off to media_queue."""
 
         # check if the received file match one of the allowed extensions
         # (the check relies on an inspection of the file content)
@@ -127,33 +224,53 @@ class TLS_FTP_WADAS_Handler(TLS_FTPHandler):
             file_ext = ftype.extension
             logger.debug("Extension of received file: %s", file_ext)
 
-            if f".{ftype.extension}" in self.ALLOWED_EXTS:
-                media_queue.put(
-                    {
-                        "media_path": received_file,
-                        "media_id": pathlib.PurePath(received_file).parent.name,
-                        "camera_id": self.username,
-                    }
-                )
+            if f".{ftype.extension}" in cls.ALLOWED_EXTS:
+                media = {
+                    "media_path": received_file,
+                    "media_id": pathlib.PurePath(received_file).parent.name,
+                    "camera_id": camera_id,
+                }
+                if cls.ipc_queue is not None:
+                    cls.ipc_queue.put(("media", media))
+                else:
+                    media_queue.put(media)
+                cls.record_metric("files_enqueued")
+                return
             else:
                 logger.warning("Unsupported file %s. Removing file.", received_file)
-                os.remove(received_file)
         else:
             logger.warning("Unable to determine file type for %s. Removing file.", received_file)
-            os.remove(received_file)
+        cls.record_metric("files_rejected")
+        os.remove(received_file)
 
     def on_incomplete_file_received(self, file):
         logger.info("Partial file received. Removing %s", file)
+        self.record_metric("files_incomplete")
         os.remove(file)
 
 
 class FTPsServer:
     """FTP server class"""
 
+    class ServerTypes(Enum):
+        ASYNC = "async"
+        THREADED = "threaded"
+        MULTIPROCESS = "multiprocess"
+
     ftps_server = None
 
     def __init__(
-        self, ip_address, port, passive_ports, max_conn, max_conn_per_ip, certificate, key, ftp_dir
+        self,
+        ip_address,
+        port,
+        passive_ports,
+        max_conn,
+        max_conn_per_ip,
+        certificate,
+        key,
+        ftp_dir,
+        server_type=ServerTypes.THREADED,
+        max_upload_rate=0,
     ):
         super(FTPsServer, self).__init__()
         # Store params to allow serialization
@@ -165,6 +282,9 @@ class FTPsServer:
         self.certificate = certificate
         self.key = key
         self.ftp_dir = ftp_dir
+        self.server_type = FTPsServer.ServerTypes(server_type)
+        # Max upload bandwidth per connection, in bytes per second (0 means unlimited)
+        self.max_upload_rate = max_upload_rate
 
         # SSL handler
         self.handler = TLS_FTP_WADAS_Handler
@@ -178,10 +298,16 @@ class FTPsServer:
         self.authorizer = DummyAuthorizer()
         self.handler.authorizer = self.authorizer
 
-        # TODO: check if ThrottledDTPHandler is needed
+        # Data channel bandwidth throttling
+        if self.max_upload_rate:
+            TLS_ThrottledDTPHandler.read_limit = self.max_upload_rate
+            self.handler.dtp_handler = TLS_ThrottledDTPHandler
+        else:
+            self.handler.dtp_handler = TLS_DTPHandler
 
         # Server
         self.server = None
+        self.ipc_thread = None
 
     def add_user(self, username, password, directory):
         """Method to add user(s) to the authorizer."""
@@ -198,13 +324,55 @@ class FTPsServer:
         """Wrapper method of authorizer to remove a user."""
         return self.authorizer.remove_user(username)
 
+    def _create_server(self):
+        """Method to create the server instance according to selected type."""
+
+        self.handler.ipc_queue = None
+        if self.server_type == FTPsServer.ServerTypes.MULTIPROCESS:
+            if multiprocess_server_class := getattr(servers, "MultiprocessFTPServer", None):
+                # Children processes forward received media and metrics to this process
+                self.handler.ipc_queue = multiprocessing.Queue()
+                self.ipc_thread = threading.Thread(
+                    target=self._forward_ipc_messages, args=(self.handler.ipc_queue,), daemon=True
+                )
+                self.ipc_thread.start()
+                return multiprocess_server_class((self.ip, self.port), self.handler)
+            logger.warning("Multiprocess FTPS server not supported, using threaded server.")
+        elif self.server_type == FTPsServer.ServerTypes.ASYNC:
+            return FTPServer((self.ip, self.port), self.handler)
+        return ThreadedFTPServer((self.ip, self.port), self.handler)
+
+    @staticmethod
+    def _forward_ipc_messages(ipc_queue):
+        """Method to move media and metrics coming from connection processes."""
+
+        while True:
+            try:
+                message = ipc_queue.get(timeout=1)
+            except queue.Empty:
+                if TLS_FTP_WADAS_Handler.ipc_queue is not ipc_queue:
+                    break
+                continue
+            except (EOFError, OSError):
+                break
+            if message[0] == "media":
+                media_queue.put(message[1])
+            elif message[0] == "metric":
+                TLS_FTP_WADAS_Handler.update_metric(message[1], message[2])
+
+    def get_metrics(self):
+        """Return FTPS server connection metrics."""
+
+        return self.handler.get_metrics()
+
     def run(self):
         """Method to create new thread and run a FTPS server."""
-        self.server = ThreadedFTPServer((self.ip, self.port), self.handler)
+        logger.info("Selected FTPS server type: %s", self.server_type.value)
+        self.server = self._create_server()
         self.server.max_cons = self.max_conn
         self.server.max_cons_per_ip = self.max_conn_per_ip
         if self.server:
-            thread = threading.Thread(target=self.server.serve_forever)
+            thread = threading.Thread(target=self._serve)
 
             if thread:
                 thread.start()
@@ -216,6 +384,17 @@ class FTPsServer:
         else:
             return None
 
+    def _serve(self):
+        """Method run by server thread."""
+
+        try:
+            self.server.serve_forever()
+        finally:
+            # Stop forwarding messages from connection processes, if any
+            self.handler.ipc_queue = None
+            self.handler.reset_active_connections()
+            logger.info("FTPS server metrics: %s", self.get_metrics())
+
     def serialize(self):
         """Method to serialize FTPS Server object"""
 
@@ -228,6 +407,8 @@ class FTPsServer:
             "max_conn": self.max_conn,
             "max_conn_per_ip": self.max_conn_per_ip,
             "ftp_dir": self.ftp_dir,
+            "server_type": self.server_type.value,
+            "max_upload_rate": self.max_upload_rate,
         }
 
     @staticmethod
@@ -242,4 +423,6 @@ class FTPsServer:
             data["ssl_certificate"],
             data["ssl_key"],
             data["ftp_dir"],
+            data.get("server_type", FTPsServer.ServerTypes.THREADED.value),
+            data.get("max_upload_rate", 0),
         )
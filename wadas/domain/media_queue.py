@@ -0,0 +1,379 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Priority and backpressure aware queue of media to be processed.
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from enum import Enum
+from queue import Empty
+
+logger = logging.getLogger(__name__)
+
+
+class MediaQueueJournal:
+    """SQLite (WAL) journal making queued media survive WADAS restarts.
+    Writes are buffered and committed in batches by a background thread, so that
+    producers (FTPS server I/O loop, USB cameras) are never slowed down by disk sync."""
+
+    FLUSH_INTERVAL = 0.5  # seconds
+    # Number of processing attempts before a media is considered not processable
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS media_queue ("
+            "queue_id TEXT PRIMARY KEY, "
+            "media_path TEXT NOT NULL, "
+            "media_id TEXT, "
+            "camera_id TEXT, "
+            "enqueued_at REAL NOT NULL, "
+            "attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._inserts = []
+        self._attempts = []
+        self._deletes = []
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(
+            target=self._flush_loop, name="wadas-media-journal", daemon=True
+        )
+        self._flush_thread.start()
+
+    def add(self, media):
+        """Method to journal a queued media."""
+
+        with self._lock:
+            self._inserts.append(
+                (
+                    media["queue_id"],
+                    str(media["media_path"]),
+                    str(media.get("media_id", "")),
+                    media.get("camera_id"),
+                    time.time(),
+                )
+            )
+
+    def attempt(self, queue_id):
+        """Method to record a processing attempt of a dequeued media. It is committed
+        right away, so that a media crashing WADAS is counted even if the run dies."""
+
+        with self._lock:
+            self._attempts.append((queue_id,))
+        self.flush()
+
+    def remove(self, queue_id):
+        """Method to remove an acknowledged media from the journal."""
+
+        with self._lock:
+            self._deletes.append((queue_id,))
+
+    def _flush_loop(self):
+        """Method run by journal thread to periodically commit buffered writes."""
+
+        while not self._stop_event.wait(self.FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        """Method to commit buffered writes in a single transaction."""
+
+        with self._lock:
+            inserts, self._inserts = self._inserts, []
+            attempts, self._attempts = self._attempts, []
+            deletes, self._deletes = self._deletes, []
+            if not inserts and not attempts and not deletes:
+                return
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO media_queue "
+                        "(queue_id, media_path, media_id, camera_id, enqueued_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        inserts,
+                    )
+                    self._conn.executemany(
+                        "UPDATE media_queue SET attempts = attempts + 1 WHERE queue_id = ?",
+                        attempts,
+                    )
+                    self._conn.executemany("DELETE FROM media_queue WHERE queue_id = ?", deletes)
+            except sqlite3.Error:
+                logger.exception("Unable to commit media queue journal.")
+
+    def recover(self):
+        """Method to load media left unprocessed by a previous run, oldest first."""
+
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT queue_id, media_path, media_id, camera_id, attempts "
+                "FROM media_queue ORDER BY enqueued_at"
+            ).fetchall()
+            recovered, expired = [], []
+            for queue_id, media_path, media_id, camera_id, attempts in rows:
+                if attempts >= self.MAX_ATTEMPTS:
+                    logger.error(
+                        "Media %s failed processing %d times, removing it from queue.",
+                        media_path,
+                        attempts,
+                    )
+                    expired.append((queue_id,))
+                elif not os.path.isfile(media_path):
+                    logger.warning("Queued media %s no longer exists, skipping it.", media_path)
+                    expired.append((queue_id,))
+                else:
+                    recovered.append(
+                        {
+                            "media_path": media_path,
+                            "media_id": media_id,
+                            "camera_id": camera_id,
+                            "queue_id": queue_id,
+                        }
+                    )
+            self._conn.executemany("DELETE FROM media_queue WHERE queue_id = ?", expired)
+        return recovered
+
+    def close(self):
+        """Method to stop the journal thread, committing pending writes."""
+
+        self._stop_event.set()
+        self._flush_thread.join()
+        self.flush()
+        self._conn.close()
+
+
+class MediaQueue:
+    """Bounded media queue with priority classes and per-camera fair queuing.
+    Lower priority values are served first. Within a priority class cameras are served
+    round-robin, while media from the same camera keep their arrival order."""
+
+    class OverflowPolicy(Enum):
+        DROP_OLDEST = "drop_oldest"
+        DROP_NEWEST = "drop_newest"
+        COALESCE = "coalesce"
+
+    # Max number of queued media, 0 means unbounded
+    max_size = 500
+    overflow_policy = OverflowPolicy.DROP_OLDEST
+    # Number of recent get() wait times used to compute metrics
+    WAIT_TIME_SAMPLES = 100
+    # Persist queued media to survive restarts
+    durable = True
+    JOURNAL_FILE = "wadas_media_queue.db"
+
+    def __init__(self, priority=None):
+        self.priority = priority or (lambda media: 0)
+        self._condition = threading.Condition()
+        # priority -> OrderedDict(camera_id -> deque of (enqueue_time, media))
+        self._classes = {}
+        self._size = 0
+        self._wait_times = deque(maxlen=self.WAIT_TIME_SAMPLES)
+        self._stats = {"enqueued": 0, "dequeued": 0, "dropped": 0, "coalesced": 0}
+        self.journal = None
+
+    def open_journal(self, path=None):
+        """Method to enable queue persistence, re-enqueuing media not processed by a
+        previous run. Returns the number of recovered media."""
+
+        if self.journal:
+            return 0
+        self.journal = MediaQueueJournal(path or MediaQueue.JOURNAL_FILE)
+        with self._condition:
+            queued_ids = {
+                media.get("queue_id")
+                for cameras_fifo in self._classes.values()
+                for fifo in cameras_fifo.values()
+                for _, media in fifo
+            }
+        # Media still in memory (e.g. journal reopened by a new run) are not duplicated
+        recovered = [
+            media for media in self.journal.recover() if media["queue_id"] not in queued_ids
+        ]
+        for media in recovered:
+            self._enqueue(media)
+        if recovered:
+            logger.info("Recovered %d media from previous run.", len(recovered))
+        return len(recovered)
+
+    def close_journal(self):
+        """Method to flush and close the queue journal, if any."""
+
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+
+    def put(self, media, block=False, timeout=None):
+        """Method to enqueue a media. It never blocks producers: when the queue is full
+        the overflow policy decides which media is discarded. Returns False if the
+        incoming media has been discarded."""
+
+        # Media kept in memory (frames from streams) cannot be recovered after a restart
+        if self.journal and "image_data" not in media:
+            media["queue_id"] = uuid.uuid4().hex
+            self.journal.add(media)
+        return self._enqueue(media)
+
+    def ack(self, media):
+        """Method to acknowledge a media as processed, removing it from the journal."""
+
+        if self.journal and (queue_id := media.get("queue_id")):
+            self.journal.remove(queue_id)
+
+    def _enqueue(self, media):
+        """Method to insert a media in its priority class and camera FIFO."""
+
+        priority = self.priority(media)
+        camera_id = media.get("camera_id")
+        # Arrival time is kept in the media so that consumers can group them by it
+        enqueue_time = media.setdefault("arrival_time", time.monotonic())
+        with self._condition:
+            if MediaQueue.max_size and self._size >= MediaQueue.max_size:
+                if not self._make_room(priority, camera_id, media):
+                    return False
+            cameras_fifo = self._classes.setdefault(priority, OrderedDict())
+            cameras_fifo.setdefault(camera_id, deque()).append((enqueue_time, media))
+            self._size += 1
+            self._stats["enqueued"] += 1
+            self._condition.notify()
+        return True
+
+    def _make_room(self, priority, camera_id, media):
+        """Method to free a slot according to the overflow policy. Must hold the lock."""
+
+        policy = MediaQueue.overflow_policy
+        if policy == MediaQueue.OverflowPolicy.COALESCE:
+            # Replace the oldest queued media of the same camera and class with the newest
+            if (fifo := self._classes.get(priority, {}).get(camera_id)) and fifo:
+                self._discard(priority, camera_id, "coalesced")
+                return True
+        if policy != MediaQueue.OverflowPolicy.DROP_NEWEST:
+            # Drop from the least important class, from the camera with the longest backlog
+            worst_priority = max(self._classes)
+            if worst_priority >= priority:
+                cameras_fifo = self._classes[worst_priority]
+                worst_camera = max(cameras_fifo, key=lambda cam: len(cameras_fifo[cam]))
+                self._discard(worst_priority, worst_camera, "dropped")
+                return True
+        logger.warning(
+            "Media queue full (%d items), discarding %s from camera %s.",
+            self._size,
+            media.get("media_path"),
+            camera_id,
+        )
+        self._stats["dropped"] += 1
+        self.ack(media)
+        self.remove_media_file(media)
+        return False
+
+    def _discard(self, priority, camera_id, reason):
+        """Method to discard the oldest media of a camera in a priority class."""
+
+        cameras_fifo = self._classes[priority]
+        _, media = cameras_fifo[camera_id].popleft()
+        self._remove_empty(priority, camera_id)
+        self._size -= 1
+        self._stats[reason] += 1
+        logger.warning(
+            "Media queue full, %s %s from camera %s.", reason, media.get("media_path"), camera_id
+        )
+        self.ack(media)
+        self.remove_media_file(media)
+
+    def _remove_empty(self, priority, camera_id):
+        """Method to cleanup empty camera FIFOs and priority classes."""
+
+        cameras_fifo = self._classes[priority]
+        if not cameras_fifo[camera_id]:
+            del cameras_fifo[camera_id]
+        if not cameras_fifo:
+            del self._classes[priority]
+
+    @staticmethod
+    def remove_media_file(media):
+        """Method to remove a discarded media file so that it does not fill the disk."""
+
+        try:
+            os.remove(media["media_path"])
+        except OSError:
+            logger.debug("Unable to remove discarded media %s.", media.get("media_path"))
+
+    def get(self, block=True, timeout=None):
+        """Method to dequeue the next media to process. Raises queue.Empty on timeout."""
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._size, timeout if block else 0):
+                raise Empty
+            priority = min(self._classes)
+            cameras_fifo = self._classes[priority]
+            # Round-robin: serve the first camera and move it to the back of the line
+            camera_id, fifo = next(iter(cameras_fifo.items()))
+            enqueue_time, media = fifo.popleft()
+            cameras_fifo.move_to_end(camera_id)
+            self._remove_empty(priority, camera_id)
+            self._size -= 1
+            self._stats["dequeued"] += 1
+            self._wait_times.append(time.monotonic() - enqueue_time)
+        if self.journal and (queue_id := media.get("queue_id")):
+            self.journal.attempt(queue_id)
+        return media
+
+    def qsize(self):
+        """Number of queued media."""
+
+        with self._condition:
+            return self._size
+
+    def empty(self):
+        """Return True if no media is queued."""
+
+        return not self.qsize()
+
+    def clear(self):
+        """Method to remove all the queued media, leaving files untouched."""
+
+        with self._condition:
+            self._classes.clear()
+            self._size = 0
+
+    def metrics(self):
+        """Return queue depth and wait time metrics."""
+
+        with self._condition:
+            wait_times = list(self._wait_times)
+            depth_per_camera = {}
+            for cameras_fifo in self._classes.values():
+                for camera_id, fifo in cameras_fifo.items():
+                    depth_per_camera[camera_id] = depth_per_camera.get(camera_id, 0) + len(fifo)
+            return {
+                "depth": self._size,
+                "depth_per_priority": {
+                    priority: sum(len(fifo) for fifo in cameras_fifo.values())
+                    for priority, cameras_fifo in sorted(self._classes.items())
+                },
+                "depth_per_camera": depth_per_camera,
+                "avg_wait_time": sum(wait_times) / len(wait_times) if wait_times else 0.0,
+                "max_wait_time": max(wait_times, default=0.0),
+                **self._stats,
+            }
@@ -0,0 +1,146 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Content-addressed store of media produced by detection and classification.
+
+import hashlib
+import io
+import logging
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from wadas.domain.utils import is_image
+
+logger = logging.getLogger(__name__)
+
+# Image encodings: (PIL format, OpenCV quality flag, extension)
+IMAGE_FORMATS = {
+    "jpeg": ("JPEG", cv2.IMWRITE_JPEG_QUALITY, ".jpg"),
+    "webp": ("WEBP", cv2.IMWRITE_WEBP_QUALITY, ".webp"),
+}
+BLOB_NAME_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class MediaStore:
+    """Store of output media addressed by the SHA-256 of their content. Blobs are sharded
+    in two levels of subfolders named after the first hash digits, so that folders stay
+    small with millions of media, and identical media are stored once.
+    Db rows reference blobs by their path, whose name is the blob id."""
+
+    enabled = True
+    folder = "media_store"
+    image_format = "jpeg"
+    image_quality = 90
+    SHARD_LEVELS = 2
+    SHARD_WIDTH = 2
+
+    @classmethod
+    def blob_path(cls, blob_id, extension) -> str:
+        """Method to get the path of a blob, given its id and extension."""
+
+        width = cls.SHARD_WIDTH
+        shards = [blob_id[start:][:width] for start in range(0, cls.SHARD_LEVELS * width, width)]
+        return os.path.join(cls.folder, *shards, f"{blob_id}{extension}")
+
+    @staticmethod
+    def blob_id(media_path) -> str | None:
+        """Method to get the blob id of a media path, None if not a blob."""
+
+        stem = Path(media_path).stem
+        return stem if BLOB_NAME_PATTERN.match(stem) else None
+
+    @classmethod
+    @contextmanager
+    def staging_folder(cls):
+        """Context manager providing a private folder to write media before storing them,
+        on the same file system of the store so that they are moved without copies."""
+
+        os.makedirs(cls.folder, exist_ok=True)
+        folder = tempfile.mkdtemp(prefix=".staging_", dir=cls.folder)
+        try:
+            yield folder
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    @classmethod
+    def put_bytes(cls, data: bytes, extension: str) -> str:
+        """Method to store encoded media, returning the path of its blob."""
+
+        path = cls.blob_path(hashlib.sha256(data).hexdigest(), extension)
+        if os.path.isfile(path):
+            logger.debug("Media already stored as %s.", path)
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so that concurrent readers never get partial blobs
+        fd, tmp_path = tempfile.mkstemp(suffix=extension, dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        return path
+
+    @classmethod
+    def put_image(cls, image) -> str:
+        """Method to encode and store an image, either a PIL one or an OpenCV (BGR) array,
+        with the configured format and quality."""
+
+        pil_format, quality_flag, extension = IMAGE_FORMATS[cls.image_format]
+        if isinstance(image, np.ndarray):
+            success, data = cv2.imencode(extension, image, [quality_flag, cls.image_quality])
+            if not success:
+                raise ValueError(f"Unable to encode image as {cls.image_format}")
+            return cls.put_bytes(data.tobytes(), extension)
+
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, pil_format, quality=cls.image_quality)
+        return cls.put_bytes(buffer.getvalue(), extension)
+
+    @classmethod
+    def put_file(cls, media_path) -> str:
+        """Method to move a media file into the store, returning the path of its blob.
+        Images are encoded with the configured format and quality, other media as is."""
+
+        if is_image(media_path):
+            with Image.open(media_path) as image:
+                path = cls.put_image(image)
+            os.remove(media_path)
+            return path
+
+        digest = hashlib.sha256()
+        with open(media_path, "rb") as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                digest.update(chunk)
+        path = cls.blob_path(digest.hexdigest(), Path(media_path).suffix.lower())
+        if os.path.isfile(path):
+            logger.debug("Media %s already stored as %s.", media_path, path)
+            os.remove(media_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.move(media_path, path)
+        return path
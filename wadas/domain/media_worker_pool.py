@@ -0,0 +1,114 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Worker pool to process media from multiple cameras concurrently.
+
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class MediaWorkerPool:
+    """Thread pool processing media concurrently across cameras.
+    Media coming from the same camera are processed one at a time, in arrival order,
+    so that per-camera event sequencing (and tunnel counters) is preserved."""
+
+    def __init__(self, handler, max_workers=2, max_pending=None):
+        self.handler = handler
+        self.max_workers = max(1, int(max_workers))
+        # Bound in-flight media so that the producer keeps backpressure on media_queue
+        self.max_pending = max_pending or self.max_workers * 2
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="wadas-media"
+        )
+        self._condition = threading.Condition()
+        self._lanes = {}
+        self._pending = 0
+        self._stopped = False
+
+    def submit(self, cur_media):
+        """Method to enqueue a media for processing in its camera lane."""
+
+        camera_id = cur_media.get("camera_id")
+        with self._condition:
+            if self._stopped:
+                logger.debug("Worker pool stopped, discarding %s.", cur_media.get("media_path"))
+                return False
+            self._pending += 1
+            if camera_id in self._lanes:
+                # Camera already has a worker draining its lane
+                self._lanes[camera_id].append(cur_media)
+                return True
+            self._lanes[camera_id] = deque()
+        self._executor.submit(self._drain_lane, camera_id, cur_media)
+        return True
+
+    def _drain_lane(self, camera_id, cur_media):
+        """Method to process all media queued for a camera, in order."""
+
+        while cur_media is not None:
+            try:
+                self.handler(cur_media)
+            except Exception:
+                logger.exception(
+                    "Unhandled exception processing media %s from camera %s.",
+                    cur_media.get("media_path"),
+                    camera_id,
+                )
+            with self._condition:
+                self._pending -= 1
+                lane = self._lanes[camera_id]
+                if lane and not self._stopped:
+                    cur_media = lane.popleft()
+                else:
+                    self._pending -= len(lane)
+                    del self._lanes[camera_id]
+                    cur_media = None
+                self._condition.notify_all()
+
+    def wait_for_capacity(self, timeout=None):
+        """Method to block until a new media can be submitted. Returns False on timeout."""
+
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._stopped or self._pending < self.max_pending, timeout
+            )
+
+    def wait_until_idle(self, timeout=None):
+        """Method to block until every submitted media has been processed."""
+
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending, timeout)
+
+    @property
+    def pending(self):
+        """Number of media submitted and not processed yet."""
+
+        with self._condition:
+            return self._pending
+
+    def shutdown(self, wait=True):
+        """Method to stop the pool. Media still waiting in a lane are discarded."""
+
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._executor.shutdown(wait=wait)
+        logger.debug("Media worker pool stopped.")
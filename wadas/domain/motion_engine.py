@@ -0,0 +1,224 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Motion detection engine decoupling frame capture from frame analysis.
+
+import logging
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+from wadas.domain.video_writer import create_browser_compatible_video_writer
+
+logger = logging.getLogger(__name__)
+
+
+class FrameGrabber:
+    """Class continuously reading frames from a video capture in a dedicated thread.
+    Only the most recent frame is kept: frames not consumed in time are dropped, so that
+    analysis always works on live images and capture buffers never fill up."""
+
+    def __init__(self, capture, name="wadas-frame-grabber"):
+        self.capture = capture
+        self.name = name
+        self._condition = threading.Condition()
+        self._frame = None
+        self._frame_seq = 0
+        self._read_seq = 0
+        self.dropped_frames = 0
+        self.stopped = False
+        self._thread = None
+
+    def start(self):
+        """Method to start the grabbing thread."""
+
+        self._thread = threading.Thread(target=self._grab_loop, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def _grab_loop(self):
+        """Method run by grabbing thread."""
+
+        while not self.stopped and self.capture.isOpened():
+            ret, frame = self.capture.read()
+            if not ret:
+                break
+            with self._condition:
+                if self._frame_seq > self._read_seq:
+                    self.dropped_frames += 1
+                self._frame = frame
+                self._frame_seq += 1
+                self._condition.notify_all()
+        with self._condition:
+            self.stopped = True
+            self._condition.notify_all()
+
+    def read(self, timeout=None):
+        """Return the latest frame not read yet, waiting up to timeout seconds.
+        Returns None if no new frame is available or the capture ended."""
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frame_seq > self._read_seq or self.stopped, timeout
+            )
+            if self._frame_seq == self._read_seq:
+                return None
+            self._read_seq = self._frame_seq
+            return self._frame
+
+    def stop(self):
+        """Method to stop the grabbing thread."""
+
+        with self._condition:
+            self.stopped = True
+            self._condition.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class MotionDetector:
+    """Class detecting motion on a downscaled grayscale version of the frames.
+    Background subtraction runs on a small image, full resolution frames are never
+    copied or converted by the detector."""
+
+    # Width of frames used for motion analysis
+    PROCESSING_WIDTH = 320
+
+    def __init__(self, threshold, min_contour_area, exclusion_zones=None):
+        self.threshold = threshold
+        # Min contour area is expressed in full resolution pixels
+        self.min_contour_area = min_contour_area
+        # List of [x1, y1, x2, y2] rectangles, in coordinates relative to frame size (0-1)
+        self.exclusion_zones = exclusion_zones or []
+        self.background_sub = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+        self._frame_shape = None
+        self._size = None
+        self._area_scale = 1.0
+        self._mask = None
+
+    def _setup(self, frame_shape):
+        """Method to compute processing size and exclusion mask for a frame size."""
+
+        height, width = frame_shape[:2]
+        scale = min(1.0, self.PROCESSING_WIDTH / width)
+        self._size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        self._area_scale = scale * scale
+        self._mask = None
+        if self.exclusion_zones:
+            small_width, small_height = self._size
+            self._mask = np.full((small_height, small_width), 255, dtype=np.uint8)
+            for x1, y1, x2, y2 in self.exclusion_zones:
+                rows = slice(int(y1 * small_height), int(np.ceil(y2 * small_height)))
+                columns = slice(int(x1 * small_width), int(np.ceil(x2 * small_width)))
+                self._mask[rows, columns] = 0
+        self._frame_shape = frame_shape
+
+    def detect(self, frame):
+        """Method to feed a frame to the detector. Returns True if motion is detected."""
+
+        if frame.shape != self._frame_shape:
+            self._setup(frame.shape)
+        small = cv2.resize(frame, self._size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        foreground_mask = self.background_sub.apply(small)
+        if self._mask is not None:
+            foreground_mask = cv2.bitwise_and(foreground_mask, self._mask)
+
+        _, mask_thresh = cv2.threshold(foreground_mask, self.threshold, 255, cv2.THRESH_BINARY)
+        contours, _ = cv2.findContours(mask_thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_area = self.min_contour_area * self._area_scale
+        return any(cv2.contourArea(cnt) > min_area for cnt in contours)
+
+
+class ClipRecorder:
+    """Class keeping a ring buffer of recent frames to build motion clips.
+    A clip starts with the buffered pre-roll frames and lasts until post-roll seconds
+    after the last motion trigger, so that a whole event ends up in a single video.
+    Frames sampled faster than the clip frame rate are decimated, so that clips play at
+    real speed, and frames wider than max_width are downscaled to bound memory usage."""
+
+    def __init__(self, pre_roll, post_roll, fps, max_duration, max_width=None):
+        self.post_roll = post_roll
+        self.fps = fps
+        self.max_duration = max_duration
+        self.max_width = max_width
+        self._buffer = deque(maxlen=max(1, int(pre_roll * fps)))
+        self._clip = None
+        self._start_time = 0
+        self._end_time = 0
+        self._frame_interval = 1 / fps
+        self._next_frame_time = float("-inf")
+
+    @property
+    def recording(self):
+        return self._clip is not None
+
+    def _downscale(self, frame):
+        """Method to resize a frame to max_width, keeping its aspect ratio."""
+
+        height, width = frame.shape[:2]
+        if not self.max_width or width <= self.max_width:
+            return frame
+        size = (self.max_width, round(height * self.max_width / width))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def add(self, frame, now):
+        """Method to add a frame. Returns the frames of a completed clip, if any."""
+
+        # Small tolerance on frame time, not to drop frames sampled with some jitter
+        if now >= self._next_frame_time - self._frame_interval / 4:
+            self._next_frame_time = max(self._next_frame_time + self._frame_interval, now)
+            frame = self._downscale(frame) if self.max_width else frame
+            (self._buffer if self._clip is None else self._clip).append(frame)
+        if self._clip is not None and now >= self._end_time:
+            return self.flush()
+        return None
+
+    def trigger(self, now):
+        """Method to notify motion, starting a clip or extending the current one."""
+
+        if self._clip is None:
+            self._clip = list(self._buffer)
+            self._buffer.clear()
+            self._start_time = now
+        self._end_time = min(now + self.post_roll, self._start_time + self.max_duration)
+
+    def flush(self):
+        """Method to complete the current clip. Returns its frames, if any."""
+
+        clip, self._clip = self._clip, None
+        return clip
+
+
+def encode_clip(frames, path, fps):
+    """Method to encode frames into a video file. Returns True on success."""
+
+    height, width = frames[0].shape[:2]
+    try:
+        writer = create_browser_compatible_video_writer(path, fps, (width, height))
+    except RuntimeError:
+        logger.exception("Unable to encode motion clip %s.", path)
+        return False
+    try:
+        for frame in frames:
+            writer.write(frame)
+    finally:
+        writer.release()
+    return True
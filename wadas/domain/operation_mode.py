@@ -23,22 +23,34 @@ import threading
 import time
 from abc import abstractmethod
 from enum import Enum
+from queue import Empty
 
 from PySide6.QtCore import QObject, Signal
 
 from wadas.domain.actuation_event import ActuationEvent
 from wadas.domain.actuator import Actuator
 from wadas.domain.ai_model import AiModel
-from wadas.domain.camera import Camera, cameras
+from wadas.domain.burst_coalescer import BurstCoalescer
+from wadas.domain.camera import Camera, cameras, media_queue
 from wadas.domain.database import DataBase
 from wadas.domain.detection_event import DetectionEvent
+from wadas.domain.event_hub import (
+    EventTopics,
+    publish_actuation_event,
+    publish_detection_event,
+)
 from wadas.domain.fastapi_actuator_server import (
     FastAPIActuatorServer,
     initialize_fastapi_logger,
 )
 from wadas.domain.ftps_server import FTPsServer
+from wadas.domain.media_queue import MediaQueue
+from wadas.domain.media_store import MediaStore
+from wadas.domain.media_worker_pool import MediaWorkerPool
 from wadas.domain.notifier import Notifier
+from wadas.domain.retention import RetentionManager, retention_manager
 from wadas.domain.utils import get_precise_timestamp, is_image
+from wadas_webserver.media import delete_renditions
 
 logger = logging.getLogger(__name__)
 
@@ -73,6 +85,11 @@ class OperationMode(QObject):
     enforce_privacy_remove_original_img = False
     enforce_privacy_remove_detection_img = False
     enforce_privacy_remove_classification_img = False
+    # Number of concurrent workers processing media from different cameras
+    media_workers = 2
+    # Seconds to group images of the same camera into a single burst, 0 to disable
+    burst_window = 0
+    MEDIA_QUEUE_METRICS_INTERVAL = 60  # seconds
 
     def __init__(self):
         super(OperationMode, self).__init__()
@@ -80,6 +97,9 @@ class OperationMode(QObject):
         self.ai_model = None
         self.last_detection = ""
         self.last_classified_animals_str = ""
+        # Guards state shared among media workers (last detection, counters)
+        self.state_lock = threading.Lock()
+        self.media_worker_pool = None
         self.camera_thread = []
         self.ftp_thread = None
         self.actuators_server_thread = None
@@ -104,6 +124,9 @@ class OperationMode(QObject):
     def _initialize_cameras(self):
         """Method to initialize and run the FTP Server
         and threads associated to the cameras (both ftp and usb)"""
+        if MediaQueue.durable:
+            # Persist media before producers start, recovering the ones left by a previous run
+            media_queue.open_journal()
         logger.info("Instantiating cameras...")
         camera: Camera
         for camera in cameras:
@@ -113,6 +136,10 @@ class OperationMode(QObject):
                     logger.info("Instantiating thread for camera %s", camera.id)
                     camera.stop_thread = False
                     self.camera_thread.append(camera.run())
+                elif camera.type == Camera.CameraTypes.STREAM_CAMERA:
+                    # Stream decoding runs in the pool shared by stream cameras
+                    camera.stop_thread = False
+                    camera.run()
                 elif (
                     camera.type == Camera.CameraTypes.FTP_CAMERA
                     and FTPsServer.ftps_server
@@ -123,24 +150,35 @@ class OperationMode(QObject):
         logger.info("Ready for video stream from Camera(s)...")
 
     def _detect(self, cur_media):
-        """Method to run the animal detection process on a specific image"""
+        """Method to run the animal detection process on a specific media (or burst of images)"""
 
         if is_image(cur_media["media_path"]):
-            results, detected_img_path = self.ai_model.process_image(cur_media["media_path"], True)
+            if media_batch := cur_media.get("media_batch"):
+                # Burst of images from the same trigger: a single event for the best frame
+                original_media, results, detected_img_path = self.ai_model.process_image_burst(
+                    [media["media_path"] for media in media_batch], True
+                )
+            else:
+                original_media = cur_media["media_path"]
+                # Frames sampled from network streams are kept in memory until detection
+                results, detected_img_path = self.ai_model.process_image(
+                    original_media, True, cur_media.get("image_data")
+                )
 
             if results and detected_img_path:
                 detection_event = DetectionEvent(
                     camera_id=cur_media["camera_id"],
                     time_stamp=get_precise_timestamp(),
-                    original_media=cur_media["media_path"],
+                    original_media=original_media,
                     detection_media_path=detected_img_path,
                     detected_animals=results,
                     classification=self.enable_classification,
                 )
-                self.last_detection = detected_img_path
+                self._set_last_detection(detected_img_path)
                 # Insert detection event into db, if enabled
                 if db := DataBase.get_enabled_db():
-                    db.insert_into_db(detection_event)
+                    db.enqueue_insert(detection_event)
+                self._publish_detection_event(EventTopics.DETECTION, detection_event)
 
                 logger.info("Animal(s) detected!")
                 if self.enable_classification:
@@ -196,28 +234,44 @@ class OperationMode(QObject):
                     classified_animals=classified_animals,
                     preview_image=snapshot,
                 )
-                self.last_detection = video_path
-                self._format_classified_animals_string(classified_animals)
+                self._set_last_detection(video_path, classified_animals)
 
                 # Insert detection event into db, if enabled
                 if db := DataBase.get_enabled_db():
-                    db.insert_into_db(detection_event)
+                    db.enqueue_insert(detection_event)
+                self._publish_detection_event(
+                    (
+                        EventTopics.CLASSIFICATION
+                        if self.enable_classification
+                        else EventTopics.DETECTION
+                    ),
+                    detection_event,
+                )
 
                 return detection_event
             else:
                 return None
 
-    def _format_classified_animals_string(self, classified_animals):
+    @staticmethod
+    def _format_classified_animals_string(classified_animals):
         """Prepare a list of classified animals to print in UI"""
 
         full_str = ", ".join(
             animal["classification"][0]
-            for animal in classified_animals
+            for animal in classified_animals or []
             if animal.get("classification")
         )
-        self.last_classified_animals_str = (
-            full_str[:100] + "..." if len(full_str) > 100 else full_str
-        )
+        return full_str[:100] + "..." if len(full_str) > 100 else full_str
+
+    def _set_last_detection(self, media_path, classified_animals=None):
+        """Method to update last detection info shown in UI, safe to call from media workers."""
+
+        with self.state_lock:
+            self.last_detection = media_path
+            if classified_animals is not None:
+                self.last_classified_animals_str = self._format_classified_animals_string(
+                    classified_animals
+                )
 
     def _classify(self, detection_event: DetectionEvent):
         """Method to run the animal classification process
@@ -233,17 +287,30 @@ class OperationMode(QObject):
                 detection_event.original_image, detection_event.detected_animals
             )
             if classified_img_path and classified_animals:
-                self.last_detection = classified_img_path
-                self._format_classified_animals_string(classified_animals)
+                self._set_last_detection(classified_img_path, classified_animals)
                 detection_event.classified_animals = classified_animals
                 detection_event.classification_media_path = classified_img_path
                 # Update detection event into db, if enabled
                 if db := DataBase.get_enabled_db():
-                    db.update_detection_event(detection_event)
-                logger.info("Classified animal(s): %s", self.last_classified_animals_str)
+                    db.enqueue_detection_event_update(detection_event)
+                self._publish_detection_event(EventTopics.CLASSIFICATION, detection_event)
+                logger.info(
+                    "Classified animal(s): %s",
+                    self._format_classified_animals_string(classified_animals),
+                )
             else:
                 logger.info("No classified animals or classification results below threshold.")
 
+    @staticmethod
+    def _publish_detection_event(topic, detection_event):
+        """Method to push a detection event to web interface clients. When db is enabled,
+        event is published once written, so that clients can fetch it by id."""
+
+        if db := DataBase.get_enabled_db():
+            db.enqueue_after_write(publish_detection_event, topic, detection_event)
+        else:
+            publish_detection_event(topic, detection_event)
+
     def _show_processed_results(self, detection_event):
         """Method to show Ai inference results in WADAS UI"""
 
@@ -283,10 +350,13 @@ class OperationMode(QObject):
                 FTPsServer.ftps_server.server.close_all()
                 FTPsServer.ftps_server.server.close()
                 self.ftp_thread.join()
-            # Stop USB Cameras thread(s), if any.
+            # Stop USB and stream Cameras thread(s), if any.
             self.process_queue = False
             for camera in cameras:
-                if camera.type == Camera.CameraTypes.USB_CAMERA:
+                if camera.type in (
+                    Camera.CameraTypes.USB_CAMERA,
+                    Camera.CameraTypes.STREAM_CAMERA,
+                ):
                     camera.stop_thread = True
 
             self.stop_actuator_server()
@@ -304,6 +374,79 @@ class OperationMode(QObject):
         else:
             self.execution_completed()
 
+    def _process_media_queue(self, process_media, is_supported_media):
+        """Method to dispatch media from motion detection notifications to the worker pool.
+        Media from different cameras are processed concurrently, keeping per camera order.
+        Media are acknowledged only if process_media returns True."""
+
+        def process_and_ack(cur_media):
+            # Acknowledge only once processing (and DB insert) succeeded: on failures or
+            # interruptions media is processed again at next run.
+            db = DataBase.get_enabled_db()
+            write_mark = db.write_mark() if db else None
+            if not process_media(cur_media):
+                return
+            for media in cur_media.get("media_batch", (cur_media,)):
+                if db:
+                    # Events are written in background: wait for them to be committed
+                    db.enqueue_after_write(media_queue.ack, media, since=write_mark)
+                else:
+                    media_queue.ack(media)
+
+        if db := DataBase.get_enabled_db():
+            # Resolve camera and actuator db ids once, not for each event
+            db.load_id_cache()
+        self.media_worker_pool = MediaWorkerPool(process_and_ack, OperationMode.media_workers)
+        retention_manager.start()
+        logger.info("Processing media with %d worker(s)...", self.media_worker_pool.max_workers)
+        # Images of the same camera trigger are grouped to be processed as a single burst
+        coalescer = (
+            BurstCoalescer(OperationMode.burst_window) if OperationMode.burst_window else None
+        )
+        last_metrics_time = time.monotonic()
+        while self.process_queue:
+            self.check_for_termination_requests()
+            if time.monotonic() - last_metrics_time > OperationMode.MEDIA_QUEUE_METRICS_INTERVAL:
+                logger.debug("Media queue metrics: %s", media_queue.metrics())
+                last_metrics_time = time.monotonic()
+            if coalescer:
+                for burst in coalescer.pop_expired():
+                    self.media_worker_pool.submit(burst)
+            # Timeouts are set to 1 second to avoid blocking the thread
+            if not self.media_worker_pool.wait_for_capacity(timeout=1):
+                continue
+            timeout = 1
+            if coalescer and (burst_timeout := coalescer.next_timeout()) is not None:
+                timeout = min(timeout, burst_timeout)
+            try:
+                cur_media = media_queue.get(timeout=timeout)
+            except Empty:
+                continue
+
+            if not is_supported_media(cur_media["media_path"]):
+                media_queue.ack(cur_media)
+            elif coalescer and is_image(cur_media["media_path"]) and "image_data" not in cur_media:
+                for burst in coalescer.add(cur_media):
+                    self.media_worker_pool.submit(burst)
+            else:
+                # Submit pending burst of the same camera first to keep per camera order
+                if coalescer and (burst := coalescer.pop_camera(cur_media["camera_id"])):
+                    self.media_worker_pool.submit(burst)
+                self.media_worker_pool.submit(cur_media)
+        # Pending bursts are not acknowledged: they are recovered at next run
+        self.stop_media_worker_pool()
+
+    def stop_media_worker_pool(self):
+        """Method to stop the media worker pool, waiting for media under processing,
+        to write pending db operations and to close the media queue journal."""
+
+        retention_manager.stop()
+        if self.media_worker_pool:
+            self.media_worker_pool.shutdown()
+            self.media_worker_pool = None
+        DataBase.stop_writer()
+        media_queue.close_journal()
+
     def send_notification(self, detection_event: DetectionEvent, message):
         """Method to send notification(s) trough Notifier class (and subclasses)"""
 
@@ -326,7 +469,10 @@ class OperationMode(QObject):
                     actuator.actuate(actuation_event)
                     # Insert actuation event into db, if enabled
                     if db := DataBase.get_enabled_db():
-                        db.insert_into_db(actuation_event)
+                        db.enqueue_insert(actuation_event)
+                        db.enqueue_after_write(publish_actuation_event, actuation_event)
+                    else:
+                        publish_actuation_event(actuation_event)
 
     def delete_media(self, media_file):
         """Method to delete media file handling possible exceptions."""
@@ -334,6 +480,8 @@ class OperationMode(QObject):
         if os.path.isfile(media_file):
             try:
                 os.remove(media_file)
+                # Reduced renditions cached by web server
+                delete_renditions(media_file)
 
                 logger.debug("%s media removed successfully.", media_file)
             except FileNotFoundError:
@@ -343,6 +491,22 @@ class OperationMode(QObject):
             except OSError:
                 logger.error("OS Error deleting file: %s", media_file)
 
+    def delete_event_media(self, detection_event, media_file):
+        """Method to delete a media of a detection event. Media store blobs are shared by
+        identical media of other events: they are deleted only if no other event stored
+        in db references them, once the events enqueued so far are written."""
+
+        def delete_unreferenced():
+            for media in RetentionManager.get_unreferenced_media(
+                [media_file], detection_event.db_id
+            ):
+                self.delete_media(media)
+
+        if MediaStore.blob_id(media_file) and (db := DataBase.get_enabled_db()):
+            db.enqueue_after_write(delete_unreferenced)
+        else:
+            self.delete_media(media_file)
+
     def enforce_privacy(self, detection_event):
         """Method to enforce privacy by deleting unneeded images."""
 
@@ -350,20 +514,20 @@ class OperationMode(QObject):
             detection_event.original_image
         ):
             logger.debug("Removing original image due to privacy enforcement policy.")
-            self.delete_media(detection_event.original_image)
+            self.delete_event_media(detection_event, detection_event.original_image)
         if (
             OperationMode.enforce_privacy_remove_detection_img
             and os.path.isfile(detection_event.detection_media_path)
             and self.enable_classification  # Detection img is deleted only in class mode.
         ):
             logger.debug("Removing detection image due to privacy enforcement policy.")
-            self.delete_media(detection_event.detection_media_path)
+            self.delete_event_media(detection_event, detection_event.detection_media_path)
         if (
             self.enable_classification
             and OperationMode.enforce_privacy_remove_classification_img
             and detection_event.classification_media_path
         ):
-            self.delete_media(detection_event.classification_media_path)
+            self.delete_event_media(detection_event, detection_event.classification_media_path)
             logger.debug("Removing classification image due to privacy enforcement policy.")
 
     def execution_completed(self):
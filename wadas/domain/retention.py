@@ -0,0 +1,580 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Scheduled retention of events and media, with optional archival.
+
+import datetime
+import logging
+import os
+import threading
+import zipfile
+import zlib
+from pathlib import Path, PurePosixPath
+
+from sqlalchemy import and_, delete, exists, not_, or_, select, true, update
+
+from wadas.domain.camera import Camera, cameras
+from wadas.domain.database import DataBase
+from wadas.domain.db_model import (
+    ActuationEvent,
+    ActuatorBatteryStatus,
+    ActuatorTemperatureStatus,
+    ClassifiedAnimals,
+    DetectionEvent,
+)
+from wadas.domain.media_store import READ_CHUNK_SIZE, MediaStore
+from wadas_webserver.media import delete_renditions
+
+logger = logging.getLogger(__name__)
+
+# Media of detection events by type: db column and the value of removed media
+EVENT_MEDIA_COLUMNS = {
+    "original": ("original_image", ""),
+    "detection": ("detection_img_path", ""),
+    "classification": ("classification_img_path", None),
+}
+# Folders of each media type, retained by files age when media are not tracked in db.
+# Detection and classification media also include media store blobs, if enabled.
+MEDIA_FOLDERS = {
+    "detection": ("detection_output",),
+    "classification": ("classification_output",),
+    "video_frames": ("video_frames",),
+}
+
+
+class RetentionPolicy:
+    """Retention limits of a kind of data, each one disabled if None.
+    Size quota applies to media, rows quota to tables. Data of detection events
+    with animals classified as one of keep_classified_as species are never removed."""
+
+    def __init__(self, max_age_days=None, max_size_mb=None, max_rows=None, keep_classified_as=()):
+        self.max_age_days = max_age_days
+        self.max_size_mb = max_size_mb
+        self.max_rows = max_rows
+        self.keep_classified_as = list(keep_classified_as or ())
+
+    @property
+    def enabled(self):
+        return any(
+            limit is not None for limit in (self.max_age_days, self.max_size_mb, self.max_rows)
+        )
+
+    def serialize(self):
+        return {
+            "max_age_days": self.max_age_days,
+            "max_size_mb": self.max_size_mb,
+            "max_rows": self.max_rows,
+            "keep_classified_as": self.keep_classified_as,
+        }
+
+    @staticmethod
+    def deserialize(data):
+        return RetentionPolicy(
+            data.get("max_age_days"),
+            data.get("max_size_mb"),
+            data.get("max_rows"),
+            data.get("keep_classified_as"),
+        )
+
+
+def _default_table_policies():
+    return {
+        "detection_events": RetentionPolicy(),
+        "actuation_events": RetentionPolicy(),
+        "telemetry": RetentionPolicy(),
+    }
+
+
+def _default_media_policies():
+    return {media_type: RetentionPolicy() for media_type in (*EVENT_MEDIA_COLUMNS, "video_frames")}
+
+
+class MediaArchiver:
+    """Class adding media to compressed archives, one per month of the media."""
+
+    def __init__(self, folder):
+        self.folder = Path(folder)
+        self._archives = {}
+
+    def add(self, media_path, media_type, time_stamp):
+        """Method to add a media to the archive of its month, if not archived yet.
+        Media are archived with their full path, so that media with the same name
+        (e.g. from different cameras) never collide."""
+
+        name = f"wadas_media_{time_stamp:%Y-%m}.zip"
+        if name not in self._archives:
+            self.folder.mkdir(parents=True, exist_ok=True)
+            archive = zipfile.ZipFile(self.folder / name, "a", zipfile.ZIP_DEFLATED)
+            self._archives[name] = (archive, set(archive.namelist()))
+        archive, names = self._archives[name]
+        path = Path(media_path)
+        parts = path.parts[1:] if path.anchor else path.parts
+        base_name = PurePosixPath(media_type, *parts)
+        arcname, index = str(base_name), 0
+        while arcname in names:
+            # Media interrupted by a previous run might be archived already
+            if archive.getinfo(arcname).CRC == self._crc32(media_path):
+                return
+            index += 1
+            arcname = str(base_name.with_stem(f"{base_name.stem}_{index}"))
+        archive.write(media_path, arcname)
+        names.add(arcname)
+
+    @staticmethod
+    def _crc32(media_path):
+        crc = 0
+        with open(media_path, "rb") as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                crc = zlib.crc32(chunk, crc)
+        return crc
+
+    def close(self):
+        for archive, _ in self._archives.values():
+            archive.close()
+        self._archives.clear()
+
+
+class RetentionManager:
+    """Class applying retention policies to db tables and media, periodically in
+    background. Records are removed in batches, each one in its own transaction:
+    media are archived before the transaction and deleted after its commit, so that
+    db never references removed media. Statistics rollups are not affected."""
+
+    enabled = False
+    interval = 3600  # seconds
+    batch_size = 500
+    # Folder of media archives, media are deleted without archiving if empty
+    archive_folder = ""
+    table_policies = _default_table_policies()
+    media_policies = _default_media_policies()
+
+    def __init__(self):
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._archiver = None
+
+    def start(self):
+        """Method to start applying retention policies periodically."""
+
+        if not RetentionManager.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="wadas-retention", daemon=True)
+        self._thread.start()
+        logger.info("Retention manager started, running every %d seconds.", self.interval)
+
+    def stop(self):
+        """Method to stop the retention thread, after the batch under processing."""
+
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Unexpected error applying retention policies.")
+            self._stop_event.wait(RetentionManager.interval)
+
+    def run_once(self):
+        """Method to apply all the retention policies. Returns removed items per kind."""
+
+        removed = {}
+        self._archiver = (
+            MediaArchiver(RetentionManager.archive_folder)
+            if RetentionManager.archive_folder
+            else None
+        )
+        try:
+            db_enabled = DataBase.get_enabled_db() is not None
+            purge_table = {
+                "detection_events": self._purge_detection_events,
+                "actuation_events": self._purge_actuation_events,
+                "telemetry": self._purge_telemetry,
+            }
+            for table, policy in RetentionManager.table_policies.items():
+                if db_enabled and policy.enabled:
+                    removed[table] = purge_table[table](policy)
+            for media_type, policy in RetentionManager.media_policies.items():
+                if not policy.enabled:
+                    continue
+                if db_enabled and media_type in EVENT_MEDIA_COLUMNS:
+                    removed[media_type] = self._purge_event_media(media_type, policy)
+                else:
+                    removed[media_type] = self._purge_folders(
+                        self._get_media_folders(media_type), media_type, policy
+                    )
+        finally:
+            if self._archiver:
+                self._archiver.close()
+                self._archiver = None
+        if any(removed.values()):
+            logger.info("Retention policies applied, removed: %s", removed)
+        return removed
+
+    @staticmethod
+    def _get_media_folders(media_type):
+        """Method to get the folders of a media type, including cameras ones for originals."""
+
+        if media_type != "original":
+            folders = MEDIA_FOLDERS[media_type]
+            if MediaStore.enabled and media_type in ("detection", "classification"):
+                folders += (MediaStore.folder,)
+            return folders
+        folders = {"wadas_motion_detection"}
+        for camera in cameras:
+            if camera.type == Camera.CameraTypes.FTP_CAMERA:
+                folders.add(camera.ftp_folder)
+        return tuple(folders)
+
+    @staticmethod
+    def _not_kept(policy, detection_event_id=DetectionEvent.db_id):
+        """Method to build the condition excluding records of detection events with
+        animals to be kept."""
+
+        if not policy.keep_classified_as:
+            return true()
+        return not_(
+            exists().where(
+                and_(
+                    ClassifiedAnimals.detection_event_id == detection_event_id,
+                    ClassifiedAnimals.classified_animal.in_(policy.keep_classified_as),
+                )
+            )
+        )
+
+    @staticmethod
+    def _age_cutoff(policy):
+        if policy.max_age_days is None:
+            return None
+        return datetime.datetime.now() - datetime.timedelta(days=policy.max_age_days)
+
+    @staticmethod
+    def _before(age_cutoff, quota_cutoff):
+        """Method to build the condition selecting events older than age cutoff or
+        preceding quota cutoff, the (timestamp, id) key of the newest event to remove.
+        Returns None if no event is to be removed."""
+
+        conditions = []
+        if age_cutoff is not None:
+            conditions.append(DetectionEvent.time_stamp < age_cutoff)
+        if quota_cutoff is not None:
+            time_stamp, db_id = quota_cutoff
+            conditions.append(DetectionEvent.time_stamp < time_stamp)
+            conditions.append(
+                and_(DetectionEvent.time_stamp == time_stamp, DetectionEvent.db_id <= db_id)
+            )
+        return or_(*conditions) if conditions else None
+
+    def _batches(self, query_batch, remove_batch):
+        """Method to remove records in batches until no one is selected anymore.
+        Returns the number of removed records."""
+
+        removed = 0
+        while not self._stop_event.is_set():
+            if not (session := DataBase.create_session()):
+                break
+            try:
+                rows = query_batch(session)
+                if not rows:
+                    break
+                media = self._unreferenced(session, remove_batch(session, rows))
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+            # Deleted once no more referenced by db
+            for media_path in media:
+                self._delete_file(media_path)
+            removed += len(rows)
+        return removed
+
+    @staticmethod
+    def _unreferenced(session, media, excluded_event_id=None):
+        """Method to filter out media store blobs still referenced by other events,
+        as identical media are stored once."""
+
+        if not (blobs := {path for path in media if MediaStore.blob_id(path)}):
+            return media
+        columns = [getattr(DetectionEvent, column) for column, _ in EVENT_MEDIA_COLUMNS.values()]
+        query = select(*columns).where(or_(*(column.in_(blobs) for column in columns)))
+        if excluded_event_id is not None:
+            query = query.where(DetectionEvent.db_id != excluded_event_id)
+        referenced = set()
+        for row in session.execute(query):
+            referenced.update(row)
+        return [path for path in media if path not in referenced]
+
+    @staticmethod
+    def get_unreferenced_media(media, excluded_event_id=None):
+        """Method to get the media that can be deleted, i.e. the ones not in media store
+        and the blobs not referenced by detection events other than the excluded one."""
+
+        if not DataBase.get_enabled_db() or not (session := DataBase.create_session()):
+            return media
+        try:
+            return RetentionManager._unreferenced(session, media, excluded_event_id)
+        finally:
+            session.close()
+
+    def _archive(self, media_path, media_type, time_stamp):
+        if self._archiver and media_path and os.path.isfile(media_path):
+            self._archiver.add(media_path, media_type, time_stamp)
+
+    @staticmethod
+    def _delete_file(media_path):
+        try:
+            os.remove(media_path)
+        except FileNotFoundError:
+            pass  # Already removed, e.g. by privacy enforcement
+        except OSError:
+            logger.error("Unable to delete %s.", media_path)
+            return
+        # Reduced renditions cached by web server
+        delete_renditions(media_path)
+
+    def _purge_detection_events(self, policy):
+        """Method to remove detection events, with their media, classified animals and
+        actuation events, exceeding age or rows quota."""
+
+        with DataBase.create_session() as session:
+            rows_cutoff = None
+            if policy.max_rows is not None:
+                rows_cutoff = session.execute(
+                    select(DetectionEvent.time_stamp, DetectionEvent.db_id)
+                    .order_by(DetectionEvent.time_stamp.desc(), DetectionEvent.db_id.desc())
+                    .offset(policy.max_rows)
+                    .limit(1)
+                ).first()
+        if (before := self._before(self._age_cutoff(policy), rows_cutoff)) is None:
+            return 0
+
+        def query_batch(session):
+            return session.execute(
+                select(
+                    DetectionEvent.db_id,
+                    DetectionEvent.time_stamp,
+                    *(
+                        getattr(DetectionEvent, column)
+                        for column, _ in EVENT_MEDIA_COLUMNS.values()
+                    ),
+                )
+                .where(and_(before, self._not_kept(policy)))
+                .order_by(DetectionEvent.time_stamp, DetectionEvent.db_id)
+                .limit(RetentionManager.batch_size)
+            ).all()
+
+        def remove_batch(session, rows):
+            media = []
+            for _, time_stamp, *media_paths in rows:
+                for media_type, media_path in zip(EVENT_MEDIA_COLUMNS, media_paths):
+                    if media_path:
+                        self._archive(media_path, media_type, time_stamp)
+                        media.append(media_path)
+            ids = [row[0] for row in rows]
+            session.execute(
+                delete(ActuationEvent).where(ActuationEvent.detection_event_id.in_(ids))
+            )
+            session.execute(
+                delete(ClassifiedAnimals).where(ClassifiedAnimals.detection_event_id.in_(ids))
+            )
+            session.execute(delete(DetectionEvent).where(DetectionEvent.db_id.in_(ids)))
+            return media
+
+        return self._batches(query_batch, remove_batch)
+
+    def _purge_actuation_events(self, policy):
+        """Method to remove actuation events exceeding age or rows quota."""
+
+        with DataBase.create_session() as session:
+            cutoffs = [self._age_cutoff(policy)]
+            if policy.max_rows is not None:
+                cutoffs.append(
+                    session.execute(
+                        select(ActuationEvent.time_stamp)
+                        .order_by(ActuationEvent.time_stamp.desc())
+                        .offset(policy.max_rows)
+                        .limit(1)
+                    ).scalar()
+                )
+                if cutoffs[-1] is not None:
+                    # The newest actuation event to remove is included
+                    cutoffs[-1] += datetime.timedelta(microseconds=1)
+        cutoffs = [cutoff for cutoff in cutoffs if cutoff is not None]
+        if not cutoffs:
+            return 0
+        cutoff = max(cutoffs)
+
+        def query_batch(session):
+            return session.execute(
+                select(ActuationEvent.actuator_id, ActuationEvent.time_stamp)
+                .where(
+                    and_(
+                        ActuationEvent.time_stamp < cutoff,
+                        self._not_kept(policy, ActuationEvent.detection_event_id),
+                    )
+                )
+                .order_by(ActuationEvent.time_stamp)
+                .limit(RetentionManager.batch_size)
+            ).all()
+
+        def remove_batch(session, rows):
+            session.execute(
+                delete(ActuationEvent).where(
+                    or_(
+                        *(
+                            and_(
+                                ActuationEvent.actuator_id == actuator_id,
+                                ActuationEvent.time_stamp == time_stamp,
+                            )
+                            for actuator_id, time_stamp in rows
+                        )
+                    )
+                )
+            )
+            return []
+
+        return self._batches(query_batch, remove_batch)
+
+    def _purge_telemetry(self, policy):
+        """Method to remove actuators raw telemetry readings older than max age.
+        Hourly and daily rollups are kept, to chart long time windows."""
+
+        if (cutoff := self._age_cutoff(policy)) is None:
+            return 0
+        removed = 0
+        for orm_class in (ActuatorBatteryStatus, ActuatorTemperatureStatus):
+
+            def query_batch(session, orm_class=orm_class):
+                return session.execute(
+                    select(orm_class.actuator_id, orm_class.time_stamp)
+                    .where(orm_class.time_stamp < cutoff)
+                    .order_by(orm_class.time_stamp)
+                    .limit(RetentionManager.batch_size)
+                ).all()
+
+            def remove_batch(session, rows, orm_class=orm_class):
+                session.execute(
+                    delete(orm_class).where(
+                        or_(
+                            *(
+                                and_(
+                                    orm_class.actuator_id == actuator_id,
+                                    orm_class.time_stamp == time_stamp,
+                                )
+                                for actuator_id, time_stamp in rows
+                            )
+                        )
+                    )
+                )
+                return []
+
+            removed += self._batches(query_batch, remove_batch)
+        return removed
+
+    def _purge_event_media(self, media_type, policy):
+        """Method to remove media of a type referenced by detection events, exceeding
+        age or size quota. Events are kept, with no reference to the removed media."""
+
+        column_name, removed_value = EVENT_MEDIA_COLUMNS[media_type]
+        column = getattr(DetectionEvent, column_name)
+        has_media = and_(column.is_not(None), column != "")
+        with DataBase.create_session() as session:
+            size_cutoff = None
+            if policy.max_size_mb is not None:
+                # Newest media are kept up to the quota, older ones are removed
+                total_size = 0
+                max_size = policy.max_size_mb * 1024 * 1024
+                rows = session.execute(
+                    select(DetectionEvent.time_stamp, DetectionEvent.db_id, column)
+                    .where(has_media)
+                    .order_by(DetectionEvent.time_stamp.desc(), DetectionEvent.db_id.desc())
+                    .execution_options(yield_per=RetentionManager.batch_size)
+                )
+                for time_stamp, db_id, media_path in rows:
+                    try:
+                        total_size += os.path.getsize(media_path)
+                    except OSError:
+                        continue
+                    if total_size > max_size:
+                        size_cutoff = (time_stamp, db_id)
+                        break
+        if (before := self._before(self._age_cutoff(policy), size_cutoff)) is None:
+            return 0
+
+        def query_batch(session):
+            return session.execute(
+                select(DetectionEvent.db_id, DetectionEvent.time_stamp, column)
+                .where(and_(has_media, before, self._not_kept(policy)))
+                .order_by(DetectionEvent.time_stamp, DetectionEvent.db_id)
+                .limit(RetentionManager.batch_size)
+            ).all()
+
+        def remove_batch(session, rows):
+            for _, time_stamp, media_path in rows:
+                self._archive(media_path, media_type, time_stamp)
+            session.execute(
+                update(DetectionEvent)
+                .where(DetectionEvent.db_id.in_([row[0] for row in rows]))
+                .values({column_name: removed_value})
+            )
+            return [row[2] for row in rows]
+
+        return self._batches(query_batch, remove_batch)
+
+    def _purge_folders(self, folders, media_type, policy):
+        """Method to remove files of media folders exceeding age or size quota, oldest
+        first. Used for media not tracked in db, keep_classified_as is not applied."""
+
+        files = []
+        for folder in folders:
+            for root, dir_names, file_names in os.walk(folder):
+                # Media store staging folders hold media under processing
+                dir_names[:] = [name for name in dir_names if not name.startswith(".staging_")]
+                for file_name in file_names:
+                    path = os.path.join(root, file_name)
+                    try:
+                        stat_result = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((stat_result.st_mtime, stat_result.st_size, path))
+        files.sort(reverse=True)
+
+        age_cutoff = self._age_cutoff(policy)
+        age_cutoff = age_cutoff.timestamp() if age_cutoff else None
+        max_size = policy.max_size_mb * 1024 * 1024 if policy.max_size_mb is not None else None
+        total_size = 0
+        removed = 0
+        for mtime, size, path in files:
+            if self._stop_event.is_set():
+                break
+            total_size += size
+            if (age_cutoff is not None and mtime < age_cutoff) or (
+                max_size is not None and total_size > max_size
+            ):
+                self._archive(path, media_type, datetime.datetime.fromtimestamp(mtime))
+                self._delete_file(path)
+                removed += 1
+        return removed
+
+
+retention_manager = RetentionManager()
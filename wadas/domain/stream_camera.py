@@ -0,0 +1,271 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Network stream (RTSP/HTTP/file) Camera module
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from wadas.domain.actuator import Actuator
+from wadas.domain.camera import Camera, media_queue
+from wadas.domain.motion_engine import MotionDetector
+from wadas.domain.utils import get_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class StreamDecodePool:
+    """Pool of decoding threads shared by all the stream cameras.
+    Each task decodes a single frame of a stream and then reschedules the stream,
+    so that many streams are multiplexed over a few threads."""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="wadas-stream-decode"
+        )
+
+    def submit(self, camera):
+        """Method to schedule the decoding of next frame of a stream camera."""
+
+        self.executor.submit(self._step, camera)
+
+    def _step(self, camera):
+        """Method run by decoding threads."""
+
+        try:
+            reschedule = camera.step()
+        except Exception:
+            logger.exception("Unexpected error decoding stream of camera %s.", camera.id)
+            camera.release()
+            camera.finished.set()
+            return
+        if reschedule:
+            self.submit(camera)
+
+
+class StreamCamera(Camera):
+    """Network stream Camera class, specialization of Camera class.
+    Frames are sampled from the stream and, once past the motion gate, pushed into the
+    media queue as encoded images kept in memory."""
+
+    # Number of threads decoding streams, shared by all the stream cameras
+    decode_workers = 4
+    decode_pool = None
+    RECONNECT_DELAY = 5  # seconds
+    JPEG_QUALITY = 90
+    # Frame rate assumed when the stream does not provide it
+    DEFAULT_FPS = 25
+
+    def __init__(
+        self,
+        id,
+        url,
+        enabled=False,
+        sample_rate=1.0,
+        en_mot_det=True,
+        actuators=None,
+        exclusion_zones=None,
+    ):
+        if actuators is None:
+            actuators = []
+        super().__init__(id, enabled)
+        self.type = Camera.CameraTypes.STREAM_CAMERA
+        # RTSP/HTTP URL or local video file path
+        self.url = url
+        # Frames per second sampled from the stream
+        self.sample_rate = sample_rate
+        self.en_wadas_motion_detection = en_mot_det
+        self.actuators = actuators
+        self.exclusion_zones = exclusion_zones or []
+        self._cap = None
+        self._motion_detector = None
+        self._frame_index = 0
+        self._next_sample_frame = 0
+        self._sample_step = 1
+        self._fps = StreamCamera.DEFAULT_FPS
+        self._last_detection_frame = None
+        self.finished = threading.Event()
+
+    @classmethod
+    def get_decode_pool(cls):
+        """Method to get the decoding pool shared by stream cameras, creating it if needed."""
+
+        if cls.decode_pool is None:
+            cls.decode_pool = StreamDecodePool(cls.decode_workers)
+        return cls.decode_pool
+
+    @property
+    def is_file(self):
+        """True if the camera reads a local video file instead of a live stream."""
+        return "://" not in self.url
+
+    def _open(self):
+        """Method to open the stream. Returns True on success."""
+
+        self._cap = cv2.VideoCapture(self.url)
+        if not self._cap.isOpened():
+            logger.error("Unable to open stream of camera %s.", self.id)
+            self.release()
+            return False
+
+        self._fps = self._cap.get(cv2.CAP_PROP_FPS) or StreamCamera.DEFAULT_FPS
+        self._sample_step = max(1, round(self._fps / self.sample_rate))
+        self._frame_index = 0
+        self._next_sample_frame = 0
+        self._last_detection_frame = None
+        self._motion_detector = MotionDetector(
+            Camera.detection_params["threshold"],
+            Camera.detection_params["min_contour_area"],
+            self.exclusion_zones,
+        )
+        logger.info(
+            "Opened stream of camera %s (%.2f fps, sampling 1 frame every %d).",
+            self.id,
+            self._fps,
+            self._sample_step,
+        )
+        return True
+
+    def release(self):
+        """Method to release the stream."""
+
+        if self._cap:
+            self._cap.release()
+            self._cap = None
+
+    def _reconnect_later(self):
+        """Method to schedule a new connection attempt to a live stream."""
+
+        logger.warning(
+            "Stream of camera %s unavailable, retrying in %d seconds.",
+            self.id,
+            StreamCamera.RECONNECT_DELAY,
+        )
+        timer = threading.Timer(
+            StreamCamera.RECONNECT_DELAY, StreamCamera.get_decode_pool().submit, (self,)
+        )
+        timer.daemon = True
+        timer.start()
+
+    def step(self):
+        """Method to decode the next frame of the stream, processing it if it is sampled.
+        Returns True if the stream needs to be rescheduled."""
+
+        if self.stop_thread:
+            self.release()
+            self.finished.set()
+            return False
+        if self._cap is None and not self._open():
+            if self.is_file:
+                self.finished.set()
+            else:
+                self._reconnect_later()
+            return False
+
+        # Frames not sampled are only grabbed, skipping color conversion
+        if not self._cap.grab():
+            self.release()
+            if self.is_file:
+                logger.info("End of stream for camera %s.", self.id)
+                self.finished.set()
+            else:
+                self._reconnect_later()
+            return False
+        self._frame_index += 1
+        if self._frame_index < self._next_sample_frame:
+            return True
+        self._next_sample_frame = self._frame_index + self._sample_step
+
+        ret, frame = self._cap.retrieve()
+        if ret:
+            self._process_frame(frame)
+        return True
+
+    def _process_frame(self, frame):
+        """Method to run motion gate on a sampled frame and add it into the AI queue."""
+
+        if self.en_wadas_motion_detection and not self._motion_detector.detect(frame):
+            return
+
+        # Limit the amount of frame processed per second (of stream time)
+        if (
+            self._last_detection_frame is not None
+            and self._frame_index - self._last_detection_frame
+            < Camera.detection_params["detection_per_second"] * self._fps
+        ):
+            return
+        self._last_detection_frame = self._frame_index
+
+        ret, image_data = cv2.imencode(
+            ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, StreamCamera.JPEG_QUALITY]
+        )
+        if not ret:
+            logger.warning("Unable to encode frame from camera %s.", self.id)
+            return
+        logger.debug("Motion detected from camera %s!", self.id)
+        media_id = f"camera_{self.id}_{get_timestamp()}_{self._frame_index}.jpg"
+        media_queue.put(
+            {
+                # Image is written to this path only if animals are detected
+                "media_path": os.path.join("wadas_motion_detection", media_id),
+                "media_id": media_id,
+                "camera_id": self.id,
+                "image_data": image_data.tobytes(),
+            }
+        )
+
+    def run(self):
+        """Method to start decoding the camera stream in the shared decoding pool."""
+
+        logger.info("Starting stream ingestion for camera %s.", self.id)
+        self.finished.clear()
+        StreamCamera.get_decode_pool().submit(self)
+
+    def serialize(self):
+        """Method to serialize Stream Camera object into file."""
+        actuators = [actuator.id for actuator in self.actuators]
+        return {
+            "type": self.type.value,
+            "id": self.id,
+            "url": self.url,
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "enable_mot_det": self.en_wadas_motion_detection,
+            "actuators": actuators,
+            "exclusion_zones": self.exclusion_zones,
+        }
+
+    @staticmethod
+    def deserialize(data):
+        """Method to deserialize Stream Camera object from file."""
+        actuators = (
+            [Actuator.actuators[key] for key in data["actuators"]] if "actuators" in data else []
+        )
+        return StreamCamera(
+            data["id"],
+            data["url"],
+            data["enabled"],
+            data.get("sample_rate", 1.0),
+            data.get("enable_mot_det", True),
+            actuators,
+            data.get("exclusion_zones", []),
+        )
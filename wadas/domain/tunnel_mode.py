@@ -20,7 +20,6 @@
 import logging
 import os
 from pathlib import Path
-from queue import Empty
 
 import numpy as np
 from supervision.detection.core import Detections
@@ -28,11 +27,11 @@ from supervision.detection.core import Detections
 from wadas.ai.object_counter import ObjectCounter
 from wadas.ai.openvino_model import __model_folder__
 from wadas.domain.ai_model import AiModel
-from wadas.domain.camera import media_queue
+from wadas.domain.database import DataBase
 from wadas.domain.detection_event import DetectionEvent
 from wadas.domain.operation_mode import OperationMode
 from wadas.domain.tunnel import Tunnel
-from wadas.domain.utils import get_timestamp, is_video
+from wadas.domain.utils import get_precise_timestamp, get_timestamp, is_video
 
 logger = logging.getLogger(__name__)
 module_dir_path = os.path.dirname(os.path.abspath(__file__))
@@ -99,83 +98,85 @@ class TunnelMode(OperationMode):
         self.check_for_termination_requests()
 
         # Run video processing
-        while self.process_queue:
-            self.check_for_termination_requests()
-            # Get media (videos) from motion detection notification
-            # Timeout is set to 1 second to avoid blocking the thread
-            try:
-                cur_media = media_queue.get(timeout=1)
-            except Empty:
-                cur_media = None
-
-            # Video processing
-            if cur_media and is_video(cur_media["media_path"]):
-                logger.debug("Processing video from motion detection notification...")
-
-                self.check_for_termination_requests()
-                video_path = cur_media["media_path"]
-                cur_tunnel = None
-                tunnel_entrance_direction = None
-                # Get tunnel associated to camera providing video
-                camera_id = cur_media["camera_id"]
-                for tunnel in Tunnel.tunnels:
-                    if camera_id == tunnel.camera_entrance_1:
-                        tunnel_entrance_direction = tunnel.entrance_1_direction
-                        cur_tunnel = tunnel
-                    elif camera_id == tunnel.camera_entrance_2:
-                        tunnel_entrance_direction = tunnel.entrance_1_direction
-                        cur_tunnel = tunnel
-
-                if not tunnel_entrance_direction or not cur_tunnel:
-                    logger.error(
-                        "Unable to match camera ID with any enabled tunnel, skipping processing."
-                    )
-                    continue
-
-                self.check_for_termination_requests()
-                obj_counter = ObjectCounter(
-                    show=False,
-                    region=tunnel_entrance_direction,
-                    model=self.model_path,
-                    classes=[0],
-                    device=AiModel.tunnel_mode_detection_device.upper(),
-                    confidence_threshold=AiModel.tunnel_mode_detection_threshold,
-                )
-                output_dir = Path(module_dir_path) / ".." / ".." / "detection_output"
-                results = obj_counter.process_tunnel_mode_video(video_path, output_dir)
-
-                self.check_for_termination_requests()
-                if results and (output_video_path := results["video_path"]):
-                    logger.info("Animal detected in video %s", video_path)
-                    self.play_video.emit(output_video_path)
-                    self.update_info.emit()
-
-                    message = f"Detected animal in proximity of the tunnel: {cur_tunnel.id}!"
-                    if in_count := results["in_count"]:
-                        cur_tunnel.counter += in_count
-                        message = f"Detected animal entering the tunnel: {cur_tunnel.id}!"
-                        self.update_tunnel_counter.emit()
-                    elif out_count := results["out_count"]:
-                        cur_tunnel.counter -= out_count
-                        message = f"Detected animal leaving the tunnel: {cur_tunnel.id}!"
-                        logger.info(message)
-                        self.update_tunnel_counter.emit()
-                    logger.info(message)
-
-                    detection_event = DetectionEvent(
-                        camera_id=cur_media["camera_id"],
-                        time_stamp=get_timestamp(),
-                        original_media=video_path,
-                        detection_media_path=output_video_path,
-                        detected_animals=self.convert_objectcounter_to_megadetector(
-                            results,
-                            output_video_path,
-                        ),
-                        classification=False,
-                        preview_image=results["snapshot_path"],
+        self._process_media_queue(self._process_video, is_video)
+
+    def _process_video(self, cur_media):
+        """Method to process a video from motion detection notification, run by media worker pool.
+        Returns False if video was not processed, e.g. on interruption, True otherwise."""
+
+        logger.debug("Processing video from motion detection notification...")
+
+        video_path = cur_media["media_path"]
+        cur_tunnel = None
+        tunnel_entrance_direction = None
+        # Get tunnel associated to camera providing video
+        camera_id = cur_media["camera_id"]
+        for tunnel in Tunnel.tunnels:
+            if camera_id == tunnel.camera_entrance_1:
+                tunnel_entrance_direction = tunnel.entrance_1_direction
+                cur_tunnel = tunnel
+            elif camera_id == tunnel.camera_entrance_2:
+                tunnel_entrance_direction = tunnel.entrance_1_direction
+                cur_tunnel = tunnel
+
+        if not tunnel_entrance_direction or not cur_tunnel:
+            logger.error("Unable to match camera ID with any enabled tunnel, skipping processing.")
+            return False
+
+        if not self.process_queue:
+            return False
+        obj_counter = ObjectCounter(
+            show=False,
+            region=tunnel_entrance_direction,
+            model=self.model_path,
+            classes=[0],
+            device=AiModel.tunnel_mode_detection_device.upper(),
+            confidence_threshold=AiModel.tunnel_mode_detection_threshold,
+        )
+        output_dir = Path(module_dir_path) / ".." / ".." / "detection_output"
+        results = obj_counter.process_tunnel_mode_video(video_path, output_dir)
+
+        if not self.process_queue:
+            return False
+        if results and (output_video_path := results["video_path"]):
+            logger.info("Animal detected in video %s", video_path)
+            self._set_last_detection(output_video_path)
+            self.play_video.emit(output_video_path)
+            self.update_info.emit()
+
+            message = f"Detected animal in proximity of the tunnel: {cur_tunnel.id}!"
+            # Both tunnel entrances update the same counter from different workers
+            with self.state_lock:
+                if in_count := results["in_count"]:
+                    cur_tunnel.counter += in_count
+                    message = f"Detected animal entering the tunnel: {cur_tunnel.id}!"
+                elif out_count := results["out_count"]:
+                    cur_tunnel.counter -= out_count
+                    message = f"Detected animal leaving the tunnel: {cur_tunnel.id}!"
+            if in_count or out_count:
+                self.update_tunnel_counter.emit()
+                if db := DataBase.get_enabled_db():
+                    db.enqueue_tunnel_stats(
+                        cur_tunnel.id,
+                        get_precise_timestamp(),
+                        results["in_count"],
+                        results["out_count"],
                     )
-
-                    # Send notification
-                    self.send_notification(detection_event, message)
-
-                self.check_for_termination_requests()
+            logger.info(message)
+
+            detection_event = DetectionEvent(
+                camera_id=cur_media["camera_id"],
+                time_stamp=get_timestamp(),
+                original_media=video_path,
+                detection_media_path=output_video_path,
+                detected_animals=self.convert_objectcounter_to_megadetector(
+                    results,
+                    output_video_path,
+                ),
+                classification=False,
+                preview_image=results["snapshot_path"],
+            )
+
+            # Send notification
+            self.send_notification(detection_event, message)
+        return True
@@ -22,19 +22,39 @@ import logging
 import os
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 
 from wadas.domain.actuator import Actuator
 from wadas.domain.camera import Camera, media_queue
+from wadas.domain.motion_engine import (
+    ClipRecorder,
+    FrameGrabber,
+    MotionDetector,
+    encode_clip,
+)
 from wadas.domain.utils import get_timestamp
 
 logger = logging.getLogger(__name__)
 
+# Motion clips are encoded outside camera threads, not to stall frame sampling
+_clip_encoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wadas-clip-encoder")
+# Clips waiting for encoding hold all their frames in memory: their number is bounded
+CLIP_ENCODER_QUEUE_SIZE = 4
+_clip_encoder_slots = threading.BoundedSemaphore(CLIP_ENCODER_QUEUE_SIZE)
+
 
 class USBCamera(Camera):
     """USB Camera class, specialization of Camera class."""
 
+    # Motion clips parameters (seconds, frames per second and pixels)
+    CLIP_PRE_ROLL = 2
+    CLIP_POST_ROLL = 3
+    CLIP_FPS = 5
+    CLIP_MAX_DURATION = 30
+    CLIP_MAX_WIDTH = 640
+
     def __init__(
         self,
         id,
@@ -47,6 +67,8 @@ class USBCamera(Camera):
         vid="",
         path="",
         actuators=None,
+        exclusion_zones=None,
+        record_clips=False,
     ):
         if actuators is None:
             actuators = []
@@ -61,6 +83,10 @@ class USBCamera(Camera):
         self.vid = vid
         self.path = path
         self.actuators = actuators
+        # Areas ignored by motion detection, as [x1, y1, x2, y2] relative to frame size
+        self.exclusion_zones = exclusion_zones or []
+        # Emit a video clip per motion event instead of single images
+        self.record_clips = record_clips
 
     def detect_motion_from_video(self):
         """Method to run motion detection on camera video stream.
@@ -82,9 +108,6 @@ class USBCamera(Camera):
             logger.error("Error opening video stream.")
             return
 
-        # Create Background Subtractor MOG2 object
-        background_sub = cv2.createBackgroundSubtractorMOG2()
-
         # Camera info for debug mode
         length = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -100,71 +123,104 @@ class USBCamera(Camera):
 
         last_detection_time = 0
         ms_sample_rate = Camera.detection_params["ms_sample_rate"]
-        threshold = Camera.detection_params["threshold"]
-        min_contour_area = Camera.detection_params["min_contour_area"]
         detection_per_second = Camera.detection_params["detection_per_second"]
+        motion_detector = MotionDetector(
+            Camera.detection_params["threshold"],
+            Camera.detection_params["min_contour_area"],
+            self.exclusion_zones,
+        )
 
-        # Read until video is completed
-        while cap.isOpened() and not self.stop_thread:
-            # Capture frame-by-frame
-            ret, frame = cap.read()
-            cap.set(cv2.CAP_PROP_POS_MSEC, ms_sample_rate)
-
-            if ret:
-                # Apply background subtraction
-                foreground_mask = background_sub.apply(frame)
-
-                # apply global threshold to remove shadows
-                retval, mask_thresh = cv2.threshold(
-                    foreground_mask,
-                    threshold,
-                    255,
-                    cv2.THRESH_BINARY,
-                )
-
-                """TODO: check if following interpolation helps refine the motion detection
-                # set the kernal
-                kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-                # Apply erosion
-                # mask_eroded = cv2.morphologyEx(mask_thresh, cv2.MORPH_OPEN, kernel)"""
-
-                # Find contours
-                contours, hierarchy = cv2.findContours(
-                    mask_thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
-                )
-
-                # filtering contours using list comprehension
-                approved_contours = [
-                    cnt for cnt in contours if cv2.contourArea(cnt) > min_contour_area
-                ]
-                frame_out = frame.copy()
-                if len(approved_contours) > 0:
-                    # Limit the amount of frame processed per second
-                    current_detection_time = time.time()
-                    if (current_detection_time - last_detection_time) < detection_per_second:
-                        continue
-
-                    logger.debug("Motion detected from camera %s!", self.id)
-                    last_detection_time = current_detection_time
-
-                    # Adding detected image into the AI queue for animal detection
-                    img_path = os.path.join(
-                        "wadas_motion_detection",
-                        f"camera_{self.id}_{get_timestamp()}.jpg",
-                    )
-                    cv2.imwrite(img_path, frame_out)
+        # Frames feeding motion clips (if enabled) are sampled at clip frame rate
+        recorder = None
+        sample_interval = ms_sample_rate / 1000
+        if self.record_clips:
+            recorder = ClipRecorder(
+                USBCamera.CLIP_PRE_ROLL,
+                USBCamera.CLIP_POST_ROLL,
+                USBCamera.CLIP_FPS,
+                USBCamera.CLIP_MAX_DURATION,
+                USBCamera.CLIP_MAX_WIDTH,
+            )
+            sample_interval = min(sample_interval, 1 / USBCamera.CLIP_FPS)
+
+        # Capture runs in its own thread: analysis samples the latest frame every
+        # ms_sample_rate milliseconds, stale frames are dropped by the grabber.
+        grabber = FrameGrabber(cap, f"wadas-usb-camera-{self.id}").start()
+        next_sample_time = next_detection_time = time.monotonic()
+        while not self.stop_thread and not grabber.stopped:
+            if (delay := next_sample_time - time.monotonic()) > 0:
+                time.sleep(delay)
+            next_sample_time = time.monotonic() + sample_interval
+
+            frame = grabber.read(timeout=1)
+            if frame is None:
+                continue
+            now = time.monotonic()
+            if recorder and (clip := recorder.add(frame, now)):
+                self._enqueue_clip(clip)
+            if now < next_detection_time:
+                continue
+            next_detection_time = now + ms_sample_rate / 1000
+            if not motion_detector.detect(frame):
+                continue
+
+            if recorder:
+                if not recorder.recording:
+                    logger.debug("Motion detected from camera %s, recording clip.", self.id)
+                recorder.trigger(now)
+                continue
+
+            # Limit the amount of frame processed per second
+            current_detection_time = time.time()
+            if (current_detection_time - last_detection_time) < detection_per_second:
+                continue
+
+            logger.debug("Motion detected from camera %s!", self.id)
+            last_detection_time = current_detection_time
+
+            # Adding detected image into the AI queue for animal detection.
+            # Frames are never modified after capture, no copy is needed.
+            img_path = os.path.join(
+                "wadas_motion_detection",
+                f"camera_{self.id}_{get_timestamp()}.jpg",
+            )
+            cv2.imwrite(img_path, frame)
+            media_queue.put(
+                {
+                    "media_path": img_path,
+                    "media_id": f"camera_{self.id}_{get_timestamp()}.jpg",
+                    "camera_id": self.id,
+                }
+            )
+
+        if recorder and (clip := recorder.flush()):
+            self._enqueue_clip(clip)
+        logger.debug("Camera %s dropped %d stale frames.", self.id, grabber.dropped_frames)
+        grabber.stop()
+        # When everything done, release the video capture and writer object
+        cap.release()
+
+    def _enqueue_clip(self, frames):
+        """Method to encode a motion clip and add it into the AI queue."""
+
+        clip_id = f"camera_{self.id}_{get_timestamp()}.mp4"
+        clip_path = os.path.join("wadas_motion_detection", clip_id)
+
+        if not _clip_encoder_slots.acquire(blocking=False):
+            logger.warning("Too many motion clips waiting for encoding, dropping %s.", clip_id)
+            return
+
+        def encode_and_enqueue():
+            try:
+                if encode_clip(frames, clip_path, USBCamera.CLIP_FPS):
+                    logger.debug("Motion clip %s (%d frames) ready.", clip_path, len(frames))
                     media_queue.put(
-                        {
-                            "media_path": img_path,
-                            "media_id": f"camera_{self.id}_{get_timestamp()}.jpg",
-                            "camera_id": self.id,
-                        }
+                        {"media_path": clip_path, "media_id": clip_id, "camera_id": self.id}
                     )
-            else:
-                break
+            finally:
+                _clip_encoder_slots.release()
 
-        # When everything done, release the video capture and writer object
-        cap.release()
+        _clip_encoder.submit(encode_and_enqueue)
 
     def run(self):
         """Method to create new thread for Camera class."""
@@ -200,6 +256,8 @@ class USBCamera(Camera):
             "vid": self.vid,
             "path": self.path,
             "actuators": actuators,
+            "exclusion_zones": self.exclusion_zones,
+            "record_clips": self.record_clips,
         }
 
     @staticmethod
@@ -219,4 +277,6 @@ class USBCamera(Camera):
             data["vid"],
             data["path"],
             actuators,
+            data.get("exclusion_zones", []),
+            data.get("record_clips", False),
         )
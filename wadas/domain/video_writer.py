@@ -1,10 +1,39 @@
 import logging
+import os
+import struct
+import tempfile
 from pathlib import Path
 
 import cv2
 
 logger = logging.getLogger(__name__)
 
+# MP4 boxes containing the sample tables, down to chunk offsets
+MP4_CONTAINER_BOXES = (b"moov", b"trak", b"mdia", b"minf", b"stbl")
+
+
+class BrowserCompatibleVideoWriter:
+    """cv2.VideoWriter wrapper moving MP4 metadata at file start when released,
+    so that browsers can start playing videos before they are fully downloaded."""
+
+    def __init__(self, writer, output_path: str):
+        self.writer = writer
+        self.output_path = output_path
+
+    def isOpened(self):
+        return self.writer.isOpened()
+
+    def write(self, frame):
+        self.writer.write(frame)
+
+    def release(self):
+        self.writer.release()
+        if Path(self.output_path).suffix.lower() == ".mp4":
+            try:
+                apply_faststart(self.output_path)
+            except (OSError, ValueError):
+                logger.exception("Unable to apply faststart to %s", self.output_path)
+
 
 def create_browser_compatible_video_writer(
     output_path: str | Path, fps: float, frame_size: tuple[int, int]
@@ -21,7 +50,101 @@ def create_browser_compatible_video_writer(
         )
         if writer.isOpened():
             logger.info("Video writer initialized with codec %s for %s", codec, output_path)
-            return writer
+            return BrowserCompatibleVideoWriter(writer, output_path)
         writer.release()
 
     raise RuntimeError(f"Unable to initialize video writer for {output_path}")
+
+
+def _read_top_level_boxes(f, file_size):
+    """Method to list (type, offset, size) of the top level boxes of an MP4 file."""
+
+    boxes = []
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        if size == 1:
+            (size,) = struct.unpack(">Q", f.read(8))
+        elif size == 0:
+            size = file_size - offset  # Box extending to end of file
+        if size < 8 or offset + size > file_size:
+            raise ValueError(f"Malformed MP4 box {box_type!r} at {offset}")
+        boxes.append((box_type, offset, size))
+        offset += size
+    return boxes
+
+
+def _shift_chunk_offsets(moov: bytearray, start, end, shift):
+    """Method to add shift to the chunk offsets (stco/co64 boxes) found in moov[start:end]."""
+
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", moov, offset)
+        if size < 8 or offset + size > end:
+            raise ValueError(f"Malformed MP4 box {box_type!r} in moov")
+        if box_type in MP4_CONTAINER_BOXES:
+            _shift_chunk_offsets(moov, offset + 8, offset + size, shift)
+        elif box_type in (b"stco", b"co64"):
+            entry_format = ">I" if box_type == b"stco" else ">Q"
+            entry_size = struct.calcsize(entry_format)
+            # Full box header: version and flags, then entries count
+            (entries,) = struct.unpack_from(">I", moov, offset + 12)
+            for entry_offset in range(offset + 16, offset + 16 + entries * entry_size, entry_size):
+                (chunk_offset,) = struct.unpack_from(entry_format, moov, entry_offset)
+                if box_type == b"stco" and chunk_offset + shift > 0xFFFFFFFF:
+                    raise ValueError("Chunk offset overflow, stco to co64 conversion needed")
+                struct.pack_into(entry_format, moov, entry_offset, chunk_offset + shift)
+        offset += size
+
+
+def apply_faststart(path: str | Path):
+    """Method to move the moov box (video metadata) of an MP4 file before media data,
+    as done by ffmpeg -movflags faststart. Returns True if the file has been rewritten."""
+
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        boxes = _read_top_level_boxes(f, file_size)
+        box_types = [box[0] for box in boxes]
+        if b"moov" not in box_types or b"mdat" not in box_types:
+            return False
+        moov_index = box_types.index(b"moov")
+        mdat_index = box_types.index(b"mdat")
+        if moov_index < mdat_index:
+            return False  # Already playable while downloading
+
+        _, moov_offset, moov_size = boxes[moov_index]
+        f.seek(moov_offset)
+        moov = bytearray(f.read(moov_size))
+        if struct.unpack_from(">I", moov)[0] == 1:
+            raise ValueError("Large size moov box not supported")
+        # Media data following the moov insertion point is moved forward by moov size
+        _shift_chunk_offsets(moov, 8, moov_size, moov_size)
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".mp4", dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for index, (_, offset, size) in enumerate(boxes):
+                    if index == mdat_index:
+                        out.write(moov)
+                    if index != moov_index:
+                        f.seek(offset)
+                        _copy_bytes(f, out, size)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+    # Replaced once the original is closed, as required on Windows
+    os.replace(tmp_path, path)
+    logger.debug("Faststart applied to %s", path)
+    return True
+
+
+def _copy_bytes(src, dst, length, chunk_size=1024 * 1024):
+    """Method to copy length bytes from src to dst file objects."""
+
+    while length > 0:
+        chunk = src.read(min(chunk_size, length))
+        if not chunk:
+            raise ValueError("Unexpected end of MP4 file")
+        dst.write(chunk)
+        length -= len(chunk)
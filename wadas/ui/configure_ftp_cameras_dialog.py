@@ -155,6 +155,13 @@ class DialogFTPCameras(QDialog, Ui_DialogFTPCameras):
         if FTPsServer.ftps_server and FTPsServer.ftps_server.server:
             FTPsServer.ftps_server.server.close_all()
 
+        # Server type and throttling are not edited by the dialog, keep current settings
+        server_type = FTPsServer.ServerTypes.THREADED
+        max_upload_rate = 0
+        if FTPsServer.ftps_server:
+            server_type = FTPsServer.ftps_server.server_type
+            max_upload_rate = FTPsServer.ftps_server.max_upload_rate
+
         FTPsServer.ftps_server = FTPsServer(
             self.ui.lineEdit_ip.text(),
             int(self.ui.lineEdit_port.text()),
@@ -165,6 +172,8 @@ class DialogFTPCameras(QDialog, Ui_DialogFTPCameras):
             self.ui.label_certificate_file_path.text(),
             self.ui.label_key_file_path.text(),
             self.ui.label_FTPServer_path.text(),
+            server_type,
+            max_upload_rate,
         )
         if cameras:
             # Check for need of updating cameras credentials.
@@ -238,7 +238,12 @@ class MainWindow(QMainWindow):
             backupCount=3,
         )
         file_handler.setLevel(logging_level)
-        file_handler.setFormatter(formatter)
+        # Logger name allows the web server to filter log records by module
+        file_handler.setFormatter(
+            logging.Formatter(
+                "%(asctime)s %(levelname)s [%(name)s]: %(message)s", "%Y-%m-%d %H:%M:%S"
+            )
+        )
         logger.addHandler(file_handler)
 
         initialize_fpts_logger()
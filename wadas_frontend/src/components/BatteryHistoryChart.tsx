@@ -22,6 +22,8 @@ const RANGE_OPTIONS: { value: BatteryHistoryRange; label: string }[] = [
     { value: "7d", label: "1 week" },
     { value: "30d", label: "1 month" },
     { value: "90d", label: "3 months" },
+    { value: "180d", label: "6 months" },
+    { value: "365d", label: "1 year" },
 ];
 
 interface ChartPoint {
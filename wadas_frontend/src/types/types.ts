@@ -90,11 +90,13 @@ export interface ActuatorLogsResponse {
     data: string[];
 }
 
-export type BatteryHistoryRange = "1d" | "7d" | "30d" | "90d";
+export type BatteryHistoryRange = "1d" | "7d" | "30d" | "90d" | "180d" | "365d";
 
 export interface ActuatorBatteryReading {
     voltage: number | null;
     timestamp: string;
+    min_voltage?: number | null;
+    max_voltage?: number | null;
 }
 
 export interface ActuatorBatteryHistoryResponse {
@@ -104,11 +106,15 @@ export interface ActuatorBatteryHistoryResponse {
 export interface ActuatorTemperaturePoint {
     temperature: number | null;
     timestamp: string;
+    min_temperature?: number | null;
+    max_temperature?: number | null;
 }
 
 export interface BatteryTemperaturePoint {
     temperature: number | null;
     timestamp: string;
+    min_temperature?: number | null;
+    max_temperature?: number | null;
 }
 
 export interface ActuatorTemperatureHistoryResponse {
@@ -0,0 +1,60 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: GZip compression of web server textual responses.
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Media types worth compressing. Images and videos are already compressed, event
+# streams must be flushed as soon as each event is written.
+COMPRESSIBLE_MEDIA_TYPES = (
+    "application/json",
+    "application/javascript",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+)
+
+
+class TextGZipResponder(GZipResponder):
+    """GZipResponder leaving responses with a non compressible media type untouched"""
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            media_type = Headers(raw=message["headers"]).get("content-type", "")
+            if not media_type.split(";")[0].strip().startswith(COMPRESSIBLE_MEDIA_TYPES):
+                # Handled as already encoded responses, sent as they are
+                self.content_encoding_set = True
+                self.initial_message = message
+                return
+        await super().send_with_gzip(message)
+
+
+class TextGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware compressing textual responses only"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("accept-encoding", ""):
+            responder = TextGZipResponder(self.app, self.minimum_size, self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
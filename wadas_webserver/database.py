@@ -19,14 +19,19 @@
 import csv
 import io
 import logging
+import threading
+import time
 from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Tuple
 
-from sqlalchemy import and_, create_engine, desc
-from sqlalchemy.orm import Query, Session, joinedload, sessionmaker
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import and_, desc, or_
+from sqlalchemy.orm import Query, Session, selectinload, sessionmaker
 
 from wadas.domain.actuator import Actuator
+from wadas.domain.db_engine import create_db_engine
 from wadas.domain.db_model import ActuationEvent as DB_ActuationEvent
 from wadas.domain.db_model import Actuator as DB_Actuator
 from wadas.domain.db_model import ActuatorBatteryStatus as DB_ActuatorBatteryStatus
@@ -36,14 +41,26 @@ from wadas.domain.db_model import (
 from wadas.domain.db_model import Camera as DB_Camera
 from wadas.domain.db_model import ClassifiedAnimals as DB_ClassifiedAnimal
 from wadas.domain.db_model import DetectionEvent as DB_DetectionEvent
+from wadas.domain.db_model import DetectionStats as DB_DetectionStats
+from wadas.domain.db_model import SpeciesStats as DB_SpeciesStats
+from wadas.domain.db_model import TelemetryStats as DB_TelemetryStats
+from wadas.domain.db_model import TunnelStats as DB_TunnelStats
 from wadas.domain.db_model import User as DB_User
+from wadas.domain.db_stats import TELEMETRY_METRICS, period_start
 from wadas_webserver.mapper import Mapper
+from wadas_webserver.timeseries import lttb
 from wadas_webserver.view_model import (
     ActuationEvent,
     ActuationsRequest,
     Camera,
     DetectionEvent,
     DetectionsRequest,
+    DetectionStats,
+    SpeciesStats,
+    StatsRequest,
+    TelemetryPoint,
+    TunnelStats,
+    TunnelStatsRequest,
     User,
 )
 
@@ -54,27 +71,53 @@ class Database:
     """Base Class to handle interactions with WADAS Database"""
 
     instance = None
+    # Total counts of filtered events are cached, as they do not change among pages
+    COUNT_CACHE_TTL = 30  # seconds
+    COUNT_CACHE_MAX_SIZE = 256
+    # Users are cached to authenticate requests without querying the db each time.
+    # Changes made by WADAS in the same process invalidate them, other ones are
+    # seen once the entry expires.
+    USER_CACHE_TTL = 60  # seconds
+    USER_CACHE_MAX_SIZE = 128
+    # Reference data listed on every page load. Updates made by WADAS in the same process
+    # invalidate them, other ones are seen once the entry expires.
+    LOOKUP_CACHE_TTL = 300  # seconds
+    # Telemetry history is charted with at most this number of points per metric
+    HISTORY_MAX_POINTS = 1000
+    # Time windows up to this number of days are charted from raw readings
+    RAW_HISTORY_DAYS = 1
+    LOOKUPS = {
+        "cameras": "get_cameras",
+        "animals": "get_known_animals",
+        "actuator_types": "get_known_actuator_types",
+        "actuation_commands": "get_known_actuation_commands",
+    }
 
     def __init__(self, connection_string):
         self.connection_string = connection_string
-        is_sqlite = connection_string.startswith("sqlite")
-        self.engine = (
-            create_engine(self.get_connection_string())
-            if is_sqlite
-            else create_engine(
-                self.get_connection_string(),
-                pool_recycle=300,  # Recycle connections every 5 min (below MariaDB/MySQL wait_timeout)
-                pool_pre_ping=True,  # Validate connection before use
-                pool_size=5,  # Persistent connections kept in pool
-                max_overflow=10,  # Extra temporary connections allowed under load
-                pool_timeout=30,  # Max seconds to wait for a connection from the pool
-            )
-        )
+        self.engine = create_db_engine(self.get_connection_string())
+        self.count_cache = {}
+        self.count_cache_lock = threading.Lock()
+        self.user_cache = {}
+        self.user_cache_lock = threading.Lock()
+        self.lookup_cache = {}
+        self.lookup_versions = dict.fromkeys(self.LOOKUPS, 0)
+        self.lookup_cache_lock = threading.Lock()
+
+    @property
+    def engine(self):
+        return self._engine
+
+    @engine.setter
+    def engine(self, engine):
+        """Session factory is created once per engine, not for each session"""
+        self._engine = engine
+        self.session_factory = sessionmaker(bind=engine)
 
     @contextmanager
     def get_session(self):
         """Context manager to handle session"""
-        session = sessionmaker(bind=self.engine)()
+        session = self.session_factory()
         try:
             yield session
         except Exception:
@@ -94,6 +137,24 @@ class Database:
             user = Mapper.map_db_user_to_user(db_user) if db_user else None
             return user
 
+    def get_cached_user(self, username: str) -> Optional[User]:
+        """Method to get a user object from his username, cached for a few seconds"""
+        now = time.monotonic()
+        with self.user_cache_lock:
+            if (cached := self.user_cache.get(username)) and cached[0] > now:
+                return cached[1]
+        if user := self.get_user_by_username(username):
+            with self.user_cache_lock:
+                if len(self.user_cache) >= self.USER_CACHE_MAX_SIZE:
+                    self.user_cache.clear()
+                self.user_cache[username] = (now + self.USER_CACHE_TTL, user)
+        return user
+
+    def invalidate_cached_user(self, username: str):
+        """Method to drop a user from cache, after it has been updated or deleted"""
+        with self.user_cache_lock:
+            self.user_cache.pop(username, None)
+
     def get_all_detection_events(self) -> Tuple[int, List[DetectionEvent]]:
         """Method to get all detection events in the database and their count."""
         with self.get_session() as session:
@@ -122,33 +183,87 @@ class Database:
         if detection_filter.date_to:
             query = query.filter(DB_DetectionEvent.time_stamp <= detection_filter.date_to)
         if detection_filter.classified_animals:
-            query = (
-                query.join(DB_ClassifiedAnimal)
-                .filter(
+            # EXISTS subquery, not to duplicate events with more matching animals
+            query = query.filter(
+                DB_DetectionEvent.classified_animals.any(
                     DB_ClassifiedAnimal.classified_animal.in_(detection_filter.classified_animals)
                 )
-                .options(joinedload(DB_DetectionEvent.classified_animals))
             )
         return query
 
-    def get_detection_events_by_filter(
+    @staticmethod
+    def encode_cursor(time_stamp: datetime, key: int) -> str:
+        """Method to build the cursor pointing after the given (time_stamp, key) row"""
+        return f"{time_stamp.isoformat()}_{key}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """Method to parse a cursor. Raises ValueError if cursor is not valid."""
+        time_stamp, _, key = cursor.rpartition("_")
+        return datetime.fromisoformat(time_stamp), int(key)
+
+    @staticmethod
+    def _apply_keyset(query: Query, filter_request, time_column, key_column) -> Query:
+        """Method to order query by descending (time_column, key_column) and fetch the page
+        following filter cursor, if any, otherwise the one at filter offset."""
+        query = query.order_by(time_column.desc(), key_column.desc())
+        if filter_request.cursor:
+            time_stamp, key = Database.decode_cursor(filter_request.cursor)
+            query = query.filter(
+                or_(time_column < time_stamp, and_(time_column == time_stamp, key_column < key))
+            )
+        elif filter_request.offset:
+            query = query.offset(filter_request.offset)
+        return query.limit(filter_request.limit)
+
+    def _get_total(self, name: str, query: Query, filter_request) -> Optional[int]:
+        """Method to return the total count of a filtered query, cached for a few seconds
+        as it is the same for every page of the same filters."""
+        if not filter_request.include_total:
+            return None
+        key = (
+            name,
+            filter_request.model_dump_json(exclude={"cursor", "offset", "limit", "include_total"}),
+        )
+        now = time.monotonic()
+        with self.count_cache_lock:
+            if (cached := self.count_cache.get(key)) and cached[0] > now:
+                return cached[1]
+        count = query.order_by(None).count()
+        with self.count_cache_lock:
+            if len(self.count_cache) >= self.COUNT_CACHE_MAX_SIZE:
+                self.count_cache.clear()
+            self.count_cache[key] = (now + self.COUNT_CACHE_TTL, count)
+        return count
+
+    def get_detection_events_page(
         self, detection_filter: DetectionsRequest
-    ) -> Tuple[int, List[DetectionEvent]]:
-        """Method to get paginated detection events filtered
-        by different filters and their total count"""
+    ) -> Tuple[Optional[int], List[DetectionEvent], Optional[str]]:
+        """Method to get a page of detection events filtered by different filters,
+        their total count and the cursor of next page"""
         with self.get_session() as session:
             query = self._build_detection_events_query(session, detection_filter)
-            # get the total number
-            count = query.count()
-
-            # order_by, offset, limit
-            query = query.order_by(DB_DetectionEvent.time_stamp.desc())  # TODO: handle order_by
-            query = query.offset(detection_filter.offset)
-            query = query.limit(detection_filter.limit)
+            count = self._get_total("detection_events", query, detection_filter)
 
-            result = query.all()
+            query = self._apply_keyset(
+                query, detection_filter, DB_DetectionEvent.time_stamp, DB_DetectionEvent.db_id
+            )
+            result = query.options(selectinload(DB_DetectionEvent.classified_animals)).all()
             events = [Mapper.map_db_detectionevent_to_detectionevent(x) for x in result]
-            return count, events
+            next_cursor = (
+                self.encode_cursor(result[-1].time_stamp, result[-1].db_id)
+                if result and len(result) == detection_filter.limit
+                else None
+            )
+            return count, events, next_cursor
+
+    def get_detection_events_by_filter(
+        self, detection_filter: DetectionsRequest
+    ) -> Tuple[int, List[DetectionEvent]]:
+        """Method to get paginated detection events filtered
+        by different filters and their total count"""
+        count, events, _ = self.get_detection_events_page(detection_filter)
+        return count, events
 
     @staticmethod
     def _build_actuation_events_query(
@@ -175,32 +290,39 @@ class Database:
             except Exception:
                 logger.exception("Unable to find appropriate ActuatorTypes Value")
                 enum_values = []
-            query = (
-                query.join(DB_Actuator)
-                .filter(DB_Actuator.type.in_(enum_values))
-                .options(joinedload(DB_ActuationEvent.actuator))
-            )
+            query = query.join(DB_Actuator).filter(DB_Actuator.type.in_(enum_values))
         return query
 
+    def get_actuation_events_page(
+        self, actuation_filter: ActuationsRequest
+    ) -> Tuple[Optional[int], List[ActuationEvent], Optional[str]]:
+        """Method to get a page of actuation events filtered by different filters,
+        their total count and the cursor of next page"""
+        with self.get_session() as session:
+            query = self._build_actuation_events_query(session, actuation_filter)
+            count = self._get_total("actuation_events", query, actuation_filter)
+
+            # Actuation events are identified by (actuator_id, time_stamp)
+            query = self._apply_keyset(
+                query, actuation_filter, DB_ActuationEvent.time_stamp, DB_ActuationEvent.actuator_id
+            )
+            result = query.options(selectinload(DB_ActuationEvent.actuator)).all()
+            events = [Mapper.map_db_actuationevent_to_actuationevent(x) for x in result]
+            next_cursor = (
+                self.encode_cursor(result[-1].time_stamp, result[-1].actuator_id)
+                if result and len(result) == actuation_filter.limit
+                else None
+            )
+            return count, events, next_cursor
+
     def get_actuation_events_by_filter(
         self,
         actuation_filter: ActuationsRequest,
     ) -> Tuple[int, List[ActuationEvent]]:
         """Method to get paginated actuation events filtered
         by different filters and their total count"""
-        with self.get_session() as session:
-            query = self._build_actuation_events_query(session, actuation_filter)
-            # get the total number
-            count = query.count()
-
-            # order_by, offset, limit
-            query = query.order_by(DB_ActuationEvent.time_stamp.desc())  # TODO: handle order_by
-            query = query.offset(actuation_filter.offset)
-            query = query.limit(actuation_filter.limit)
-
-            result = query.all()
-            events = [Mapper.map_db_actuationevent_to_actuationevent(x) for x in result]
-            return count, events
+        count, events, _ = self.get_actuation_events_page(actuation_filter)
+        return count, events
 
     def get_cameras(self) -> List[Camera]:
         """Method to get all the enabled cameras"""
@@ -245,49 +367,197 @@ class Database:
             )
             return [x[0] for x in result]
 
+    def get_cached_lookup(self, lookup: str) -> list:
+        """Method to get the entries of a lookup (e.g. known animals), cached until
+        they change or expire. The same list object is returned while cached."""
+        now = time.monotonic()
+        with self.lookup_cache_lock:
+            if (cached := self.lookup_cache.get(lookup)) and cached[0] > now:
+                return cached[1]
+            version = self.lookup_versions[lookup]
+        entries = getattr(self, self.LOOKUPS[lookup])()
+        with self.lookup_cache_lock:
+            # Not cached if invalidated while loading, as it might miss the update
+            if self.lookup_versions[lookup] == version:
+                self.lookup_cache[lookup] = (now + self.LOOKUP_CACHE_TTL, entries)
+        return entries
+
+    def invalidate_lookup(self, lookup: str, entry=None):
+        """Method to drop a lookup from cache, unless the given new entry is already known"""
+        with self.lookup_cache_lock:
+            cached = self.lookup_cache.get(lookup)
+            if entry is None or not cached or entry not in cached[1]:
+                self.lookup_versions[lookup] += 1
+                self.lookup_cache.pop(lookup, None)
+
     @staticmethod
-    def _get_csv_string(
-        headers: List[str], obj_list: List[DB_DetectionEvent | DB_ActuationEvent], obj_class: type
-    ) -> str:
-        """Method to build the csv file to be returned as export data"""
+    def _build_stats_query(session: Session, orm_class: type, stats_filter) -> Query:
+        """Method to build a query over statistics rollups. Rollups only are read,
+        so that cost depends on the time range and not on the number of events."""
+        query = session.query(orm_class).filter(orm_class.period == stats_filter.period)
+        if stats_filter.date_from:
+            # Bucket including date_from is part of the range
+            query = query.filter(
+                orm_class.period_start >= period_start(stats_filter.date_from, stats_filter.period)
+            )
+        if stats_filter.date_to:
+            query = query.filter(orm_class.period_start <= stats_filter.date_to)
+        return query
+
+    def get_detection_stats(self, stats_filter: StatsRequest) -> List[DetectionStats]:
+        """Method to get detection events count per camera and period"""
+        with self.get_session() as session:
+            query = self._build_stats_query(session, DB_DetectionStats, stats_filter)
+            if stats_filter.camera_ids:
+                query = query.filter(DB_DetectionStats.camera_id.in_(stats_filter.camera_ids))
+            result = query.order_by(
+                DB_DetectionStats.period_start, DB_DetectionStats.camera_id
+            ).all()
+            return [Mapper.map_db_detectionstats_to_detectionstats(x) for x in result]
+
+    def get_species_stats(self, stats_filter: StatsRequest) -> List[SpeciesStats]:
+        """Method to get classified animals count per species, camera and period"""
+        with self.get_session() as session:
+            query = self._build_stats_query(session, DB_SpeciesStats, stats_filter)
+            if stats_filter.camera_ids:
+                query = query.filter(DB_SpeciesStats.camera_id.in_(stats_filter.camera_ids))
+            if stats_filter.classified_animals:
+                query = query.filter(DB_SpeciesStats.species.in_(stats_filter.classified_animals))
+            result = (
+                query.filter(DB_SpeciesStats.animals > 0)
+                .order_by(
+                    DB_SpeciesStats.period_start,
+                    DB_SpeciesStats.camera_id,
+                    DB_SpeciesStats.species,
+                )
+                .all()
+            )
+            return [Mapper.map_db_speciesstats_to_speciesstats(x) for x in result]
+
+    def get_tunnel_stats(self, stats_filter: TunnelStatsRequest) -> List[TunnelStats]:
+        """Method to get animals entering and leaving tunnels per period"""
+        with self.get_session() as session:
+            query = self._build_stats_query(session, DB_TunnelStats, stats_filter)
+            if stats_filter.tunnel_ids:
+                query = query.filter(DB_TunnelStats.tunnel_id.in_(stats_filter.tunnel_ids))
+            result = query.order_by(DB_TunnelStats.period_start, DB_TunnelStats.tunnel_id).all()
+            return [Mapper.map_db_tunnelstats_to_tunnelstats(x) for x in result]
+
+    DETECTION_EXPORT_HEADERS = [
+        "event_id",
+        "camera",
+        "date",
+        "# detected animals",
+        "# classified animals",
+        "classified animals",
+    ]
+    ACTUATION_EXPORT_HEADERS = [
+        "date",
+        "actuator",
+        "command",
+        "command response",
+        "command response message",
+    ]
+    # Rows fetched from db (and written to the export) at a time
+    EXPORT_BATCH_SIZE = 500
+
+    def _iter_export_batches(self, obj_class: type, export_filter):
+        """Method to iterate over batches of filtered events to export, fetched through a
+        server side cursor so that memory does not depend on the number of events."""
+        with self.get_session() as session:
+            if obj_class is DB_DetectionEvent:
+                query = self._build_detection_events_query(session, export_filter).options(
+                    selectinload(DB_DetectionEvent.camera),
+                    selectinload(DB_DetectionEvent.classified_animals),
+                )
+            elif obj_class is DB_ActuationEvent:
+                query = self._build_actuation_events_query(session, export_filter).options(
+                    selectinload(DB_ActuationEvent.actuator)
+                )
+            else:
+                raise Exception("Export not supported for the specified class.")
+
+            result = session.execute(
+                query.statement.execution_options(yield_per=self.EXPORT_BATCH_SIZE)
+            ).scalars()
+            # Identity map holds objects weakly: once exported, each batch is released
+            yield from result.partitions()
+
+    def _iter_csv(self, headers: List[str], obj_class: type, export_filter):
+        """Method to iterate over the chunks of the csv file to be returned as export data"""
         if obj_class is DB_DetectionEvent:
             map_func = Mapper.map_db_detectionevent_to_attr_list
         elif obj_class is DB_ActuationEvent:
             map_func = Mapper.map_db_actuationevent_to_attr_list
 
-        if map_func:
-            with io.StringIO() as file_output:
-                csv_writer = csv.writer(file_output, delimiter=",", quoting=csv.QUOTE_ALL)
-                csv_writer.writerow(headers)
-                for event in obj_list:
-                    csv_writer.writerow(map_func(event))
+        with io.StringIO() as file_output:
+            csv_writer = csv.writer(file_output, delimiter=",", quoting=csv.QUOTE_ALL)
+            csv_writer.writerow(headers)
+            for batch in self._iter_export_batches(obj_class, export_filter):
+                csv_writer.writerows(map_func(event) for event in batch)
+                yield file_output.getvalue()
                 file_output.seek(0)
-                return file_output.getvalue()
-        else:
-            raise Exception("Map function not found for the specified class.")
+                file_output.truncate()
+            if chunk := file_output.getvalue():
+                yield chunk
+
+    def iter_detection_events_csv(self, detection_filter: DetectionsRequest):
+        """Method to stream a csv file containing filtered detection events"""
+        return self._iter_csv(self.DETECTION_EXPORT_HEADERS, DB_DetectionEvent, detection_filter)
+
+    def iter_actuation_events_csv(self, actuation_filter: ActuationsRequest):
+        """Method to stream a csv file containing filtered actuation events"""
+        return self._iter_csv(self.ACTUATION_EXPORT_HEADERS, DB_ActuationEvent, actuation_filter)
 
     def export_detection_events_as_csv(self, detection_filter: DetectionsRequest) -> str:
         """Method to build a csv file containing filtered detection events"""
-        headers = [
-            "event_id",
-            "camera",
-            "date",
-            "# detected animals",
-            "# classified animals",
-            "classified animals",
-        ]
-        with self.get_session() as session:
-            query = self._build_detection_events_query(session, detection_filter)
-            result = query.all()
-            return self._get_csv_string(headers, result, DB_DetectionEvent)
+        return "".join(self.iter_detection_events_csv(detection_filter))
 
     def export_actuation_events_as_csv(self, actuation_filter: ActuationsRequest) -> str:
         """Method to build a csv file containing filtered detection events"""
-        headers = ["date", "actuator", "command"]
-        with self.get_session() as session:
-            query = self._build_actuation_events_query(session, actuation_filter)
-            result = query.all()
-            return self._get_csv_string(headers, result, DB_ActuationEvent)
+        return "".join(self.iter_actuation_events_csv(actuation_filter))
+
+    def _export_parquet(self, obj_class: type, export_filter, path) -> None:
+        """Method to write filtered events into a parquet file, one row group per batch."""
+
+        if obj_class is DB_DetectionEvent:
+            map_func = Mapper.map_db_detectionevent_to_record
+            schema = pa.schema(
+                [
+                    ("event_id", pa.int64()),
+                    ("camera", pa.string()),
+                    ("date", pa.timestamp("us")),
+                    ("detected_animals", pa.int64()),
+                    ("classified_animals", pa.list_(pa.string())),
+                    ("classification_probabilities", pa.list_(pa.float64())),
+                ]
+            )
+        elif obj_class is DB_ActuationEvent:
+            map_func = Mapper.map_db_actuationevent_to_record
+            schema = pa.schema(
+                [
+                    ("date", pa.timestamp("us")),
+                    ("actuator", pa.string()),
+                    ("detection_event_id", pa.int64()),
+                    ("command", pa.string()),
+                    ("command_response", pa.bool_()),
+                    ("command_response_message", pa.string()),
+                ]
+            )
+
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in self._iter_export_batches(obj_class, export_filter):
+                writer.write_table(
+                    pa.Table.from_pylist([map_func(event) for event in batch], schema=schema)
+                )
+
+    def export_detection_events_as_parquet(self, detection_filter: DetectionsRequest, path):
+        """Method to write a parquet file containing filtered detection events"""
+        self._export_parquet(DB_DetectionEvent, detection_filter, path)
+
+    def export_actuation_events_as_parquet(self, actuation_filter: ActuationsRequest, path):
+        """Method to write a parquet file containing filtered actuation events"""
+        self._export_parquet(DB_ActuationEvent, actuation_filter, path)
 
     def get_last_temperature_status(self, actuator_id: str) -> Optional[Tuple[float, float]]:
         """Return the latest temperature and humidity for a given actuator (by name)."""
@@ -339,63 +609,70 @@ class Database:
 
             return result.voltage, result.temperature, result.humidity
 
-    def get_battery_history(
-        self, actuator_id: str, since_days: int
-    ) -> List[DB_ActuatorBatteryStatus]:
-        """Return battery readings (voltage/temperature/humidity) for a given actuator
-        (by name), from `since_days` ago up to now, ordered chronologically."""
+    def get_telemetry_history(
+        self, actuator_id: str, metrics: List[str], since_days: int
+    ) -> dict[str, List[TelemetryPoint]]:
+        """Return actuator (by name) telemetry readings of the given metrics, from
+        `since_days` ago up to now, ordered chronologically. Short time windows come from
+        raw readings downsampled with LTTB, longer ones from hourly or daily rollups
+        (mean, min and max of each bucket), so that points are bounded whatever the window."""
+        history = {metric: [] for metric in metrics}
         with self.get_session() as session:
-            # Step 1: find actuator db_id by its id
             db_actuator = (
                 session.query(DB_Actuator).filter(DB_Actuator.actuator_id == actuator_id).first()
             )
             if db_actuator is None:
-                return []  # actuator not found in the 'actuators' table
+                return history
 
-            # Step 2: query battery readings within the requested time window
             since = datetime.now(timezone.utc) - timedelta(days=since_days)
+            if since_days <= self.RAW_HISTORY_DAYS:
+                for metric in metrics:
+                    orm_class, column_name = TELEMETRY_METRICS[metric]
+                    column = getattr(orm_class, column_name)
+                    readings = (
+                        session.query(orm_class.time_stamp, column)
+                        .filter(
+                            and_(
+                                orm_class.actuator_id == db_actuator.db_id,
+                                orm_class.time_stamp >= since,
+                                column.is_not(None),
+                            )
+                        )
+                        .order_by(orm_class.time_stamp.asc())
+                        .all()
+                    )
+                    history[metric] = [
+                        TelemetryPoint(timestamp=time_stamp, value=value)
+                        for time_stamp, value in lttb(
+                            [tuple(reading) for reading in readings], self.HISTORY_MAX_POINTS
+                        )
+                    ]
+                return history
+
+            period = "hour" if since_days * 24 <= self.HISTORY_MAX_POINTS else "day"
             results = (
-                session.query(DB_ActuatorBatteryStatus)
+                session.query(DB_TelemetryStats)
                 .filter(
                     and_(
-                        DB_ActuatorBatteryStatus.actuator_id == db_actuator.db_id,
-                        DB_ActuatorBatteryStatus.time_stamp >= since,
+                        DB_TelemetryStats.actuator_id == db_actuator.db_id,
+                        DB_TelemetryStats.period == period,
+                        DB_TelemetryStats.metric.in_(metrics),
+                        DB_TelemetryStats.period_start >= period_start(since, period),
                     )
                 )
-                .order_by(DB_ActuatorBatteryStatus.time_stamp.asc())
+                .order_by(DB_TelemetryStats.period_start.asc())
                 .all()
             )
-
-            return results
-
-    def get_temperature_history(
-        self, actuator_id: str, since_days: int
-    ) -> List[DB_ActuatorTemperatureStatus]:
-        """Return actuator (on-board sensor) temperature/humidity readings for a given
-        actuator (by name), from `since_days` ago up to now, ordered chronologically."""
-        with self.get_session() as session:
-            # Step 1: find actuator db_id by its id
-            db_actuator = (
-                session.query(DB_Actuator).filter(DB_Actuator.actuator_id == actuator_id).first()
-            )
-            if db_actuator is None:
-                return []  # actuator not found in the 'actuators' table
-
-            # Step 2: query temperature readings within the requested time window
-            since = datetime.now(timezone.utc) - timedelta(days=since_days)
-            results = (
-                session.query(DB_ActuatorTemperatureStatus)
-                .filter(
-                    and_(
-                        DB_ActuatorTemperatureStatus.actuator_id == db_actuator.db_id,
-                        DB_ActuatorTemperatureStatus.time_stamp >= since,
+            for result in results:
+                history[result.metric].append(
+                    TelemetryPoint(
+                        timestamp=result.period_start,
+                        value=result.total / result.samples,
+                        min_value=result.min_value,
+                        max_value=result.max_value,
                     )
                 )
-                .order_by(DB_ActuatorTemperatureStatus.time_stamp.asc())
-                .all()
-            )
-
-            return results
+            return history
 
     def get_actuators(self) -> List[Actuator]:
         """Method to get all the enabled actuators"""
@@ -0,0 +1,177 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Module to read WADAS log file tail and follow it while it grows.
+
+import logging
+import os
+import re
+from pathlib import Path
+
+# Log record first line, as formatted by WADAS file handler. Following lines not matching
+# it (e.g. exception tracebacks) belong to the same record. Logger name is optional, as
+# it was not written by previous WADAS versions.
+LOG_RECORD_PATTERN = re.compile(
+    r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} (?P<level>[A-Z]+)(?: \[(?P<logger>[^\]]+)\])?: "
+)
+# Bytes read at a time, memory usage does not depend on log file size
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class LogFilter:
+    """Class to filter log records by minimum level and logger name (children included)"""
+
+    def __init__(self, level: str | None = None, logger_name: str | None = None):
+        self.min_level = logging.getLevelName(level) if level else None
+        self.logger_name = logger_name
+
+    @property
+    def enabled(self):
+        return self.min_level is not None or bool(self.logger_name)
+
+    def match(self, record_match: re.Match | None) -> bool:
+        """Method to check whether a record, given its first line match, passes the filter"""
+        if not self.enabled:
+            return True
+        if record_match is None:
+            return False
+        if self.min_level is not None:
+            level = logging.getLevelName(record_match["level"])
+            if not isinstance(level, int) or level < self.min_level:
+                return False
+        if self.logger_name:
+            logger_name = record_match["logger"] or ""
+            if logger_name != self.logger_name and not logger_name.startswith(
+                f"{self.logger_name}."
+            ):
+                return False
+        return True
+
+
+def _iter_lines_reverse(f, end: int):
+    """Method to iterate over (offset, line) of a binary file, from end offset backwards"""
+    position = end
+    buffer = b""
+    while position > 0:
+        read_size = min(READ_CHUNK_SIZE, position)
+        position -= read_size
+        f.seek(position)
+        buffer = f.read(read_size) + buffer
+        lines = buffer.split(b"\n")
+        # First line might be incomplete, it is completed by next chunk
+        buffer = lines[0]
+        line_offset = position + len(buffer) + 1
+        complete_lines = []
+        for line in lines[1:]:
+            complete_lines.append((line_offset, line))
+            line_offset += len(line) + 1
+        for offset, line in reversed(complete_lines):
+            # Skip the empty line after last newline
+            if offset < end:
+                yield offset, line
+    if buffer:
+        yield 0, buffer
+
+
+def tail_log(path: str | Path, count: int, before: int | None = None, log_filter=None):
+    """Method to read the last count records of a log file, reading it backwards.
+    Records preceding the before offset are returned, to page towards older ones.
+    Returns records, offset of the oldest one (None if file start is reached) and
+    file size, to be used to follow the log from there."""
+    log_filter = log_filter or LogFilter()
+    records = []
+    record_lines = []
+    oldest_offset = None
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end if before is None else min(before, end)
+        for line_offset, line in _iter_lines_reverse(f, position):
+            text = line.decode("utf-8", errors="replace").rstrip("\r")
+            record_lines.append(text)
+            record_match = LOG_RECORD_PATTERN.match(text)
+            if record_match or line_offset == 0:
+                if log_filter.match(record_match):
+                    records.append("\n".join(reversed(record_lines)))
+                record_lines = []
+                if len(records) == count:
+                    oldest_offset = line_offset or None
+                    break
+    records.reverse()
+    return records, oldest_offset, end
+
+
+class LogFollower:
+    """Class to follow a log file while it grows, across rotations performed by
+    RotatingFileHandler. File is opened only while reading, not to prevent rotation
+    on Windows."""
+
+    # Max bytes read at each call, further ones are read by the following calls
+    MAX_READ_SIZE = 1024 * 1024
+
+    def __init__(self, path: str | Path, offset: int | None = None, log_filter=None):
+        self.path = Path(path)
+        self.log_filter = log_filter or LogFilter()
+        stat_result = self.path.stat()
+        self.file_id = stat_result.st_ino
+        self.position = stat_result.st_size if offset is None else min(offset, stat_result.st_size)
+        self.partial_line = b""
+        # Whether the record being followed passes the filter
+        self.include_record = not self.log_filter.enabled
+
+    def read(self):
+        """Method to get (offset, line) of the lines appended since last call,
+        offset being the one following the line, to resume from it."""
+        try:
+            stat_result = self.path.stat()
+        except FileNotFoundError:
+            return []  # Being rotated
+        lines = []
+        if stat_result.st_ino != self.file_id or stat_result.st_size < self.position:
+            # Rotated: lines appended before rotation are in the first backup
+            backup_path = self.path.with_name(f"{self.path.name}.1")
+            try:
+                if backup_path.stat().st_ino == self.file_id:
+                    lines = self._read_lines(backup_path)
+            except FileNotFoundError:
+                pass
+            self.file_id = stat_result.st_ino
+            self.position = 0
+            self.partial_line = b""
+        return lines + self._read_lines(self.path)
+
+    def _read_lines(self, path: Path):
+        with open(path, "rb") as f:
+            f.seek(self.position)
+            data = f.read(self.MAX_READ_SIZE)
+        self.position += len(data)
+        *complete_lines, self.partial_line = (self.partial_line + data).split(b"\n")
+
+        lines = []
+        offset = self.position - len(self.partial_line)
+        for line in reversed(complete_lines):
+            text = line.decode("utf-8", errors="replace").rstrip("\r")
+            lines.append((offset, text))
+            offset -= len(line) + 1
+        lines.reverse()
+
+        followed_lines = []
+        for offset, text in lines:
+            if record_match := LOG_RECORD_PATTERN.match(text):
+                self.include_record = self.log_filter.match(record_match)
+            if self.include_record:
+                followed_lines.append((offset, text))
+        return followed_lines
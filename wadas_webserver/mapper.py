@@ -26,6 +26,9 @@ from wadas.domain.db_model import (
 from wadas.domain.db_model import Camera as DB_Camera
 from wadas.domain.db_model import ClassifiedAnimals as DB_ClassifiedAnimals
 from wadas.domain.db_model import DetectionEvent as DB_DetectionEvent
+from wadas.domain.db_model import DetectionStats as DB_DetectionStats
+from wadas.domain.db_model import SpeciesStats as DB_SpeciesStats
+from wadas.domain.db_model import TunnelStats as DB_TunnelStats
 from wadas.domain.db_model import User as DB_User
 from wadas_webserver.view_model import (
     ActuationEvent,
@@ -35,6 +38,9 @@ from wadas_webserver.view_model import (
     Camera,
     ClassifiedAnimal,
     DetectionEvent,
+    DetectionStats,
+    SpeciesStats,
+    TunnelStats,
     User,
 )
 
@@ -119,6 +125,28 @@ class Mapper:
             db_actevent.command_response_message,
         ]
 
+    @staticmethod
+    def map_db_detectionevent_to_record(db_detevent: DB_DetectionEvent) -> dict:
+        return {
+            "event_id": db_detevent.db_id,
+            "camera": db_detevent.camera.camera_id,
+            "date": db_detevent.time_stamp,
+            "detected_animals": db_detevent.detected_animals,
+            "classified_animals": [x.classified_animal for x in db_detevent.classified_animals],
+            "classification_probabilities": [x.probability for x in db_detevent.classified_animals],
+        }
+
+    @staticmethod
+    def map_db_actuationevent_to_record(db_actevent: DB_ActuationEvent) -> dict:
+        return {
+            "date": db_actevent.time_stamp,
+            "actuator": db_actevent.actuator.actuator_id,
+            "detection_event_id": db_actevent.detection_event_id,
+            "command": db_actevent.command,
+            "command_response": db_actevent.command_response,
+            "command_response_message": db_actevent.command_response_message,
+        }
+
     @staticmethod
     def map_actuator_battery_status(db_battery_status: DB_ActuatorBatteryStatus):
         return ActuatorBatteryStatus(
@@ -133,3 +161,29 @@ class Mapper:
             humidity=db_temperature_status.humidity,
             timestamp=db_temperature_status.time_stamp,
         )
+
+    @staticmethod
+    def map_db_detectionstats_to_detectionstats(db_stats: DB_DetectionStats) -> DetectionStats:
+        return DetectionStats(
+            period_start=db_stats.period_start,
+            camera_id=db_stats.camera_id,
+            detections=db_stats.detections,
+        )
+
+    @staticmethod
+    def map_db_speciesstats_to_speciesstats(db_stats: DB_SpeciesStats) -> SpeciesStats:
+        return SpeciesStats(
+            period_start=db_stats.period_start,
+            camera_id=db_stats.camera_id,
+            species=db_stats.species,
+            animals=db_stats.animals,
+        )
+
+    @staticmethod
+    def map_db_tunnelstats_to_tunnelstats(db_stats: DB_TunnelStats) -> TunnelStats:
+        return TunnelStats(
+            period_start=db_stats.period_start,
+            tunnel_id=db_stats.tunnel_id,
+            in_count=db_stats.in_count,
+            out_count=db_stats.out_count,
+        )
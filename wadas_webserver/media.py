@@ -0,0 +1,240 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Module to generate and cache reduced renditions of event media.
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+import cv2
+from PIL import Image
+from starlette.responses import FileResponse
+
+from wadas.domain.utils import is_video
+from wadas.domain.video_writer import create_browser_compatible_video_writer
+from wadas_webserver.server_config import ServerConfig
+
+logger = logging.getLogger(__name__)
+
+# Max size (pixels) of the longest side for each rendition.
+# Poster and thumbnail of videos are still images of their first frame,
+# medium rendition of videos is a video with lower resolution and bitrate.
+RENDITION_SIZES = {"thumbnail": 320, "poster": 1280, "medium": 1280}
+VIDEO_RENDITION_SIZE = 640
+# Rendition format: (PIL format, media type, extension)
+RENDITION_FORMATS = {
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+    "mp4": (None, "video/mp4", ".mp4"),
+}
+RENDITION_QUALITY = 80
+# Media of an event never change once written, renditions are private as they need login
+CACHE_CONTROL = "private, max-age=86400"
+# Once over quota, least recently used renditions are removed down to this fraction of it
+RENDITIONS_EVICTION_RATIO = 0.9
+
+# Size of cached renditions by folder, computed at first rendition generated
+_renditions_size = {}
+_renditions_lock = threading.Lock()
+
+
+class MediaFileResponse(FileResponse):
+    """FileResponse validating If-Range against the ETag and Last-Modified headers
+    set by WADAS, instead of the ones Starlette would compute."""
+
+    def _should_use_range(self, http_if_range, stat_result):
+        return http_if_range in (self.headers.get("etag"), self.headers.get("last-modified"))
+
+
+def negotiate_format(source: Path, size: str, accept_header: str | None) -> str:
+    """Method to choose the rendition format, among the ones supported by the client"""
+    if size == "medium" and is_video(source):
+        return "mp4"
+    return "webp" if accept_header and "image/webp" in accept_header else "jpeg"
+
+
+def get_etag(path: Path, stat_result: os.stat_result, variant: str) -> str:
+    """Method to build a strong ETag of a media variant (original or rendition).
+    It depends on file identity and content metadata, so it changes if the file does."""
+    key = f"{path}:{stat_result.st_mtime_ns}:{stat_result.st_size}:{variant}"
+    return hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def get_cache_headers(etag: str, stat_result: os.stat_result) -> dict:
+    """Method to build HTTP caching headers of a media"""
+    return {
+        "ETag": f'"{etag}"',
+        "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Method to check whether an If-None-Match header matches an ETag"""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or f'"{etag}"' in tags
+
+
+def is_not_modified(request_headers, etag: str, stat_result: os.stat_result) -> bool:
+    """Method to check conditional request headers against the current media version.
+    If-None-Match takes precedence over If-Modified-Since as by RFC 9110."""
+    if if_none_match := request_headers.get("if-none-match"):
+        return etag_matches(if_none_match, etag)
+    if if_modified_since := request_headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one second resolution
+        return int(stat_result.st_mtime) <= since
+    return False
+
+
+def _load_image(source: Path, max_size: int) -> Image.Image:
+    """Method to load an image, or the first frame of a video, to be resized"""
+    if Image.registered_extensions().get(source.suffix.lower()):
+        image = Image.open(source)
+        # JPEG images are decoded at reduced scale, much faster on big originals
+        image.draft("RGB", (max_size, max_size))
+        return image.convert("RGB")
+
+    capture = cv2.VideoCapture(str(source))
+    try:
+        success, frame = capture.read()
+    finally:
+        capture.release()
+    if not success:
+        raise ValueError(f"Unable to read a frame from {source}")
+    return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+
+
+def _encode_video(source: Path, path: str):
+    """Method to encode a video with reduced resolution, hence bitrate"""
+    capture = cv2.VideoCapture(str(source))
+    writer = None
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 25
+        while True:
+            success, frame = capture.read()
+            if not success:
+                break
+            if writer is None:
+                height, width = frame.shape[:2]
+                scale = min(1.0, VIDEO_RENDITION_SIZE / max(width, height))
+                # Even sizes, as required by H.264 encoders
+                size = (int(width * scale) // 2 * 2, int(height * scale) // 2 * 2)
+                writer = create_browser_compatible_video_writer(path, fps, size)
+            writer.write(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+    finally:
+        capture.release()
+        if writer:
+            writer.release()  # Faststart applied on release
+    if writer is None:
+        raise ValueError(f"Unable to read a frame from {source}")
+
+
+def get_renditions_folder(media_path) -> Path:
+    """Method to get the folder of cached renditions of a media, named after its path"""
+    key = str(Path(media_path).resolve())
+    name = hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()
+    return ServerConfig.RENDITIONS_FOLDER / name[:16]
+
+
+def delete_renditions(media_path):
+    """Method to remove cached renditions of a media, when the media is deleted"""
+    shutil.rmtree(get_renditions_folder(media_path), ignore_errors=True)
+
+
+def _evict_renditions(rendition_path: Path):
+    """Method to keep cached renditions under size quota, removing least recently used
+    ones (by access time) but the one just generated."""
+    folder = ServerConfig.RENDITIONS_FOLDER
+    max_size = ServerConfig.RENDITIONS_MAX_SIZE_MB * 1024 * 1024
+    with _renditions_lock:
+        if folder in _renditions_size:
+            _renditions_size[folder] += rendition_path.stat().st_size
+            if _renditions_size[folder] <= max_size:
+                return
+        renditions = []
+        for path in folder.glob("*/*"):
+            try:
+                stat_result = path.stat()
+            except OSError:
+                continue
+            renditions.append((stat_result.st_atime, stat_result.st_size, path))
+        total_size = sum(rendition_size for _, rendition_size, _ in renditions)
+        if total_size > max_size:
+            renditions.sort()
+            for _, rendition_size, path in renditions:
+                if total_size <= max_size * RENDITIONS_EVICTION_RATIO:
+                    break
+                if path == rendition_path:
+                    continue
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass  # Deleted with its media
+                except OSError:
+                    continue
+                total_size -= rendition_size
+                try:
+                    path.parent.rmdir()  # Only if no other rendition of the same media
+                except OSError:
+                    pass
+            logger.debug("Renditions cache exceeding quota, reduced to %d bytes", total_size)
+        _renditions_size[folder] = total_size
+
+
+def get_rendition(source: Path, size: str, rendition_format: str, etag: str) -> Path:
+    """Method to get the path of a media rendition, generating it if not cached yet.
+    Cached renditions are named after their ETag, so outdated ones are never served."""
+    pil_format, _, extension = RENDITION_FORMATS[rendition_format]
+    rendition_path = get_renditions_folder(source) / f"{etag}{extension}"
+    try:
+        # Access time tracks last use, to evict least recently used renditions first
+        os.utime(rendition_path, ns=(time.time_ns(), rendition_path.stat().st_mtime_ns))
+        return rendition_path
+    except FileNotFoundError:
+        pass  # Not generated yet, or evicted
+
+    rendition_path.parent.mkdir(parents=True, exist_ok=True)
+    # Written aside and renamed, so that concurrent requests never read partial files
+    fd, tmp_path = tempfile.mkstemp(suffix=extension, dir=ServerConfig.RENDITIONS_FOLDER)
+    try:
+        if rendition_format == "mp4":
+            os.close(fd)
+            _encode_video(source, tmp_path)
+        else:
+            max_size = RENDITION_SIZES[size]
+            image = _load_image(source, max_size)
+            image.thumbnail((max_size, max_size))
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, pil_format, quality=RENDITION_QUALITY)
+        os.replace(tmp_path, rendition_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    logger.debug("Generated %s rendition of %s", size, source)
+    _evict_renditions(rendition_path)
+    return rendition_path
@@ -36,6 +36,8 @@ class ServerConfig:
     CERT_FOLDER = CURRENT_DIRECTORY / "web_cert"
     CERT_FILEPATH = CERT_FOLDER / "cert.pem"
     KEY_FILEPATH = CERT_FOLDER / "key.pem"
+    RENDITIONS_FOLDER = CURRENT_DIRECTORY / "renditions"
+    RENDITIONS_MAX_SIZE_MB = 1024
 
     WADAS_ROOT_DIR = CURRENT_DIRECTORY.parent
 
@@ -3,6 +3,7 @@ import io
 import os
 from datetime import datetime, timedelta, timezone
 
+import pyarrow.parquet as pq
 import pytest
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
@@ -12,6 +13,11 @@ from wadas.domain.db_model import (
     ActuatorTemperatureStatus as DB_ActuatorTemperatureStatus,
 )
 from wadas.domain.db_model import Base
+from wadas.domain.db_model import DetectionStats as DB_DetectionStats
+from wadas.domain.db_model import SpeciesStats as DB_SpeciesStats
+from wadas.domain.db_model import TunnelStats as DB_TunnelStats
+from wadas.domain.db_model import User as DB_User
+from wadas.domain.db_stats import add_telemetry_stats, get_telemetry_values
 from wadas_webserver.database import Database
 from wadas_webserver.view_model import (
     ActuationEvent,
@@ -19,6 +25,8 @@ from wadas_webserver.view_model import (
     Camera,
     DetectionEvent,
     DetectionsRequest,
+    StatsRequest,
+    TunnelStatsRequest,
 )
 
 
@@ -232,7 +240,28 @@ def test_export_filtered_actuation_events(database):
 
     request = ActuationsRequest(commands=[command], date_from=datefrom, date_to=dateto)
     csv_string = database.export_actuation_events_as_csv(request)
-    validate_csv_string(csv_string, 3)
+    validate_csv_string(csv_string, 5)
+
+
+def test_export_detection_events_streamed_in_batches(database, monkeypatch):
+    monkeypatch.setattr(Database, "EXPORT_BATCH_SIZE", 10)
+    request = DetectionsRequest()
+    chunks = list(database.iter_detection_events_csv(request))
+    assert len(chunks) > 2
+    lines = list(csv.reader(io.StringIO("".join(chunks))))
+    total, _ = database.get_detection_events_by_filter(request)
+    assert len(lines) == total + 1
+    assert lines[0] == Database.DETECTION_EXPORT_HEADERS
+
+
+def test_export_detection_events_as_parquet(database, tmp_path):
+    path = tmp_path / "data.parquet"
+    request = DetectionsRequest(classified_animals=["cat"])
+    database.export_detection_events_as_parquet(request, path)
+    table = pq.read_table(path)
+    total, _ = database.get_detection_events_by_filter(request)
+    assert table.num_rows == total
+    assert all("cat" in animals for animals in table.column("classified_animals").to_pylist())
 
 
 # ---------------------------------------------------------------------------
@@ -261,15 +290,15 @@ def database_with_telemetry(database):
         (45, 11.90, 20.0, 60.0),
     ]
     for age_days, voltage, temperature, humidity in battery_readings:
-        session.add(
-            DB_ActuatorBatteryStatus(
-                actuator_id=1,
-                time_stamp=now - timedelta(days=age_days),
-                voltage=voltage,
-                temperature=temperature,
-                humidity=humidity,
-            )
+        reading = DB_ActuatorBatteryStatus(
+            actuator_id=1,
+            time_stamp=now - timedelta(days=age_days),
+            voltage=voltage,
+            temperature=temperature,
+            humidity=humidity,
         )
+        session.add(reading)
+        add_telemetry_stats(session, 1, reading.time_stamp, get_telemetry_values(reading))
 
     temperature_readings = [
         # (age_in_days, temperature, humidity)
@@ -279,14 +308,14 @@ def database_with_telemetry(database):
         (45, 18.0, 55.0),
     ]
     for age_days, temperature, humidity in temperature_readings:
-        session.add(
-            DB_ActuatorTemperatureStatus(
-                actuator_id=1,
-                time_stamp=now - timedelta(days=age_days),
-                temperature=temperature,
-                humidity=humidity,
-            )
+        reading = DB_ActuatorTemperatureStatus(
+            actuator_id=1,
+            time_stamp=now - timedelta(days=age_days),
+            temperature=temperature,
+            humidity=humidity,
         )
+        session.add(reading)
+        add_telemetry_stats(session, 1, reading.time_stamp, get_telemetry_values(reading))
 
     session.commit()
     session.close()
@@ -313,75 +342,271 @@ def test_get_last_battery_status_unknown_actuator(database_with_telemetry):
     assert database_with_telemetry.get_last_battery_status(UNKNOWN_ACTUATOR_NAME) is None
 
 
-def test_get_battery_history_returns_readings_within_range(database_with_telemetry):
-    readings = database_with_telemetry.get_battery_history(BATTERY_ACTUATOR_NAME, since_days=7)
+def test_get_battery_voltage_history_returns_readings_within_range(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["battery_voltage"], 7
+    )["battery_voltage"]
 
     # only the readings with age_days 0.1 and 2 fall within the last 7 days
     assert len(readings) == 2
-    assert all(r.voltage in (12.41, 12.55) for r in readings)
+    assert all(r.value in (12.41, 12.55) for r in readings)
 
 
-def test_get_battery_history_24h_range_only_includes_last_day(database_with_telemetry):
-    readings = database_with_telemetry.get_battery_history(BATTERY_ACTUATOR_NAME, since_days=1)
+def test_get_battery_voltage_history_24h_range_only_includes_last_day(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["battery_voltage"], 1
+    )["battery_voltage"]
 
     # only the reading with age_days=0.1 falls within the last 24 hours
     assert len(readings) == 1
-    assert readings[0].voltage == pytest.approx(12.41)
+    assert readings[0].value == pytest.approx(12.41)
 
 
-def test_get_battery_history_wider_range_includes_older_readings(database_with_telemetry):
-    readings = database_with_telemetry.get_battery_history(BATTERY_ACTUATOR_NAME, since_days=90)
+def test_get_battery_voltage_history_wider_range_includes_older_readings(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["battery_voltage"], 90
+    )["battery_voltage"]
 
     assert len(readings) == 4
 
 
-def test_get_battery_history_is_chronologically_ordered(database_with_telemetry):
-    readings = database_with_telemetry.get_battery_history(BATTERY_ACTUATOR_NAME, since_days=90)
+def test_get_battery_voltage_history_is_chronologically_ordered(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["battery_voltage"], 90
+    )["battery_voltage"]
 
-    timestamps = [r.time_stamp for r in readings]
+    timestamps = [r.timestamp for r in readings]
     assert timestamps == sorted(timestamps)
 
 
-def test_get_battery_history_unknown_actuator_returns_empty(database_with_telemetry):
-    readings = database_with_telemetry.get_battery_history(UNKNOWN_ACTUATOR_NAME, since_days=90)
+def test_get_battery_voltage_history_unknown_actuator_returns_empty(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        UNKNOWN_ACTUATOR_NAME, ["battery_voltage"], 90
+    )["battery_voltage"]
     assert readings == []
 
 
-def test_get_battery_history_no_data_returns_empty(database):
+def test_get_battery_voltage_history_no_data_returns_empty(database):
     # actuator '4444' (db_id=2) has no battery readings in test_data.txt
-    readings = database.get_battery_history("4444", since_days=90)
-    assert readings == []
+    history = database.get_telemetry_history("4444", ["battery_voltage"], 90)
+    assert history == {"battery_voltage": []}
 
 
-def test_get_temperature_history_returns_readings_within_range(database_with_telemetry):
-    readings = database_with_telemetry.get_temperature_history(BATTERY_ACTUATOR_NAME, since_days=7)
+def test_get_actuator_temperature_history_returns_readings_within_range(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["temperature"], 7
+    )["temperature"]
 
     # only the readings with age_days 0.1 and 2 fall within the last 7 days
     assert len(readings) == 2
-    assert all(r.temperature in (31.2, 29.0) for r in readings)
+    assert all(r.value in (31.2, 29.0) for r in readings)
 
 
-def test_get_temperature_history_24h_range_only_includes_last_day(database_with_telemetry):
-    readings = database_with_telemetry.get_temperature_history(BATTERY_ACTUATOR_NAME, since_days=1)
+def test_get_actuator_temperature_history_24h_range_only_includes_last_day(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["temperature"], 1
+    )["temperature"]
 
     # only the reading with age_days=0.1 falls within the last 24 hours
     assert len(readings) == 1
-    assert readings[0].temperature == pytest.approx(31.2)
+    assert readings[0].value == pytest.approx(31.2)
 
 
-def test_get_temperature_history_wider_range_includes_older_readings(database_with_telemetry):
-    readings = database_with_telemetry.get_temperature_history(BATTERY_ACTUATOR_NAME, since_days=90)
+def test_get_actuator_temperature_history_wider_range_includes_older_readings(
+    database_with_telemetry,
+):
+    readings = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["temperature"], 90
+    )["temperature"]
 
     assert len(readings) == 4
 
 
-def test_get_temperature_history_is_chronologically_ordered(database_with_telemetry):
-    readings = database_with_telemetry.get_temperature_history(BATTERY_ACTUATOR_NAME, since_days=90)
+def test_get_actuator_temperature_history_is_chronologically_ordered(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["temperature"], 90
+    )["temperature"]
 
-    timestamps = [r.time_stamp for r in readings]
+    timestamps = [r.timestamp for r in readings]
     assert timestamps == sorted(timestamps)
 
 
-def test_get_temperature_history_unknown_actuator_returns_empty(database_with_telemetry):
-    readings = database_with_telemetry.get_temperature_history(UNKNOWN_ACTUATOR_NAME, since_days=90)
+def test_get_actuator_temperature_history_unknown_actuator_returns_empty(database_with_telemetry):
+    readings = database_with_telemetry.get_telemetry_history(
+        UNKNOWN_ACTUATOR_NAME, ["temperature"], 90
+    )["temperature"]
     assert readings == []
+
+
+def test_detection_events_keyset_pagination(database):
+    total, all_events = database.get_detection_events_by_filter(DetectionsRequest(limit=1000))
+    assert total == len(all_events)
+
+    events, cursor = [], None
+    while True:
+        count, page, cursor = database.get_detection_events_page(
+            DetectionsRequest(limit=7, cursor=cursor)
+        )
+        assert count == total
+        events.extend(page)
+        if not cursor:
+            break
+    assert [event.id for event in events] == [event.id for event in all_events]
+    assert all(a.timestamp >= b.timestamp for a, b in zip(events, events[1:]))
+
+
+def test_actuation_events_keyset_pagination(database):
+    total, all_events = database.get_actuation_events_by_filter(ActuationsRequest(limit=1000))
+
+    events, cursor = [], None
+    while True:
+        _, page, cursor = database.get_actuation_events_page(
+            ActuationsRequest(limit=5, cursor=cursor, include_total=False)
+        )
+        events.extend(page)
+        if not cursor:
+            break
+    assert len(events) == total
+    assert [(e.actuator.id, e.timestamp) for e in events] == [
+        (e.actuator.id, e.timestamp) for e in all_events
+    ]
+
+
+def test_detection_events_total_cached(database):
+    request = DetectionsRequest(camera_ids=[7])
+    total, _ = database.get_detection_events_by_filter(request)
+    database.count_cache = {
+        key: (expiry, 12345) for key, (expiry, _) in database.count_cache.items()
+    }
+    # Cached total is shared by every page of the same filters
+    count, _, _ = database.get_detection_events_page(DetectionsRequest(camera_ids=[7], offset=20))
+    assert count == 12345
+    count, _, _ = database.get_detection_events_page(DetectionsRequest(camera_ids=[8]))
+    assert count != 12345
+
+
+def test_detection_events_without_total(database):
+    count, events, _ = database.get_detection_events_page(DetectionsRequest(include_total=False))
+    assert count is None
+    assert events
+
+
+def test_invalid_cursor(database):
+    with pytest.raises(ValueError):
+        database.get_detection_events_page(DetectionsRequest(cursor="not-a-cursor"))
+
+
+@pytest.fixture
+def database_with_stats(database):
+    Session = sessionmaker(bind=database.engine)
+    session = Session()
+    day = datetime(2026, 10, 19)
+    for camera_id, hour, detections in [(1, 10, 2), (1, 11, 1), (2, 10, 4)]:
+        session.add(
+            DB_DetectionStats(
+                period="hour",
+                period_start=day.replace(hour=hour),
+                camera_id=camera_id,
+                detections=detections,
+            )
+        )
+    session.add(DB_DetectionStats(period="day", period_start=day, camera_id=1, detections=3))
+    session.add(DB_DetectionStats(period="day", period_start=day, camera_id=2, detections=4))
+    session.add(
+        DB_SpeciesStats(period="day", period_start=day, camera_id=1, species="fox", animals=2)
+    )
+    session.add(
+        DB_SpeciesStats(period="day", period_start=day, camera_id=1, species="boar", animals=0)
+    )
+    session.add(
+        DB_TunnelStats(period="day", period_start=day, tunnel_id="Tunnel1", in_count=3, out_count=1)
+    )
+    session.commit()
+    session.close()
+    return database
+
+
+def test_get_detection_stats(database_with_stats):
+    stats = database_with_stats.get_detection_stats(StatsRequest())
+    assert [(x.camera_id, x.detections) for x in stats] == [(1, 3), (2, 4)]
+
+    stats = database_with_stats.get_detection_stats(
+        StatsRequest(period="hour", camera_ids=[1], date_from=datetime(2026, 10, 19, 11, 30))
+    )
+    assert [(x.period_start.hour, x.detections) for x in stats] == [(11, 1)]
+
+
+def test_get_species_stats(database_with_stats):
+    # Species no longer classified in a period are not returned
+    stats = database_with_stats.get_species_stats(StatsRequest())
+    assert [(x.species, x.animals) for x in stats] == [("fox", 2)]
+    assert database_with_stats.get_species_stats(StatsRequest(classified_animals=["boar"])) == []
+
+
+def test_get_tunnel_stats(database_with_stats):
+    stats = database_with_stats.get_tunnel_stats(TunnelStatsRequest(tunnel_ids=["Tunnel1"]))
+    assert [(x.tunnel_id, x.in_count, x.out_count) for x in stats] == [("Tunnel1", 3, 1)]
+    assert database_with_stats.get_tunnel_stats(TunnelStatsRequest(period="hour")) == []
+
+
+def test_cached_user(database, monkeypatch):
+    with database.get_session() as session:
+        session.add(
+            DB_User(
+                username="admin",
+                password="hash",
+                email="admin@example.com",
+                role="Admin",
+                created_at=datetime.now(),
+            )
+        )
+        session.commit()
+    queries = []
+    get_user_by_username = database.get_user_by_username
+    monkeypatch.setattr(
+        database,
+        "get_user_by_username",
+        lambda username: queries.append(username) or get_user_by_username(username),
+    )
+
+    assert database.get_cached_user("admin").role == "Admin"
+    assert database.get_cached_user("admin").role == "Admin"
+    assert queries == ["admin"]
+    # Unknown users are not cached
+    assert database.get_cached_user("unknown") is None
+    assert database.get_cached_user("unknown") is None
+    assert queries == ["admin", "unknown", "unknown"]
+
+    database.invalidate_cached_user("admin")
+    database.get_cached_user("admin")
+    assert queries[-1] == "admin"
+    monkeypatch.setattr(Database, "USER_CACHE_TTL", 0)
+    database.invalidate_cached_user("admin")
+    database.get_cached_user("admin")
+    database.get_cached_user("admin")
+    assert queries.count("admin") == 4
+
+
+@pytest.mark.parametrize(
+    "since_days, expected_voltages",
+    [(1, [12.41]), (7, [12.55, 12.41]), (90, [11.90, 12.80, 12.55, 12.41])],
+)
+def test_get_telemetry_history(database_with_telemetry, since_days, expected_voltages):
+    history = database_with_telemetry.get_telemetry_history(
+        BATTERY_ACTUATOR_NAME, ["battery_voltage", "temperature"], since_days
+    )
+    voltages = history["battery_voltage"]
+    assert [point.value for point in voltages] == pytest.approx(expected_voltages)
+    assert len(history["temperature"]) == len(expected_voltages)
+    # Raw readings for the last day, rollups for longer time windows
+    if since_days == 1:
+        assert voltages[0].min_value is None
+    else:
+        assert all(point.min_value == point.max_value == point.value for point in voltages)
+
+
+def test_get_telemetry_history_unknown_actuator(database_with_telemetry):
+    history = database_with_telemetry.get_telemetry_history(
+        UNKNOWN_ACTUATOR_NAME, ["battery_voltage"], 7
+    )
+    assert history == {"battery_voltage": []}
@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from logging.handlers import RotatingFileHandler
+
+import pytest
+from fastapi.testclient import TestClient
+
+from wadas_webserver import log_reader, web_server_app
+from wadas_webserver.log_reader import LogFilter, LogFollower, tail_log
+from wadas_webserver.server_config import ServerConfig
+from wadas_webserver.view_model import User
+from wadas_webserver.web_server_app import app
+
+client = TestClient(app)
+
+
+def record(index, level="INFO", logger_name="wadas.domain.camera"):
+    return f"2026-10-19 10:00:{index % 60:02d} {level} [{logger_name}]: message {index}"
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    # Small chunks to exercise lines crossing chunk boundaries
+    monkeypatch.setattr(log_reader, "READ_CHUNK_SIZE", 64)
+    path = tmp_path / "log" / "WADAS.log"
+    path.parent.mkdir()
+    lines = [
+        "orphan line of a rotated record",
+        record(0),
+        record(1, "ERROR", "wadas.domain.database"),
+        "Traceback (most recent call last):",
+        '  File "database.py", line 1',
+        record(2, "WARNING", "wadas.ai.model"),
+        "2026-10-19 10:00:03 INFO: message 3",
+    ]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_tail_log(log_file):
+    records, offset, end = tail_log(log_file, 2)
+    assert records == [
+        record(2, "WARNING", "wadas.ai.model"),
+        "2026-10-19 10:00:03 INFO: message 3",
+    ]
+    assert end == log_file.stat().st_size
+
+    # Older records paged backwards, multi-line records kept together
+    records, offset, _ = tail_log(log_file, 2, before=offset)
+    assert records == [
+        record(0),
+        "\n".join(
+            [
+                record(1, "ERROR", "wadas.domain.database"),
+                "Traceback (most recent call last):",
+                '  File "database.py", line 1',
+            ]
+        ),
+    ]
+    records, offset, _ = tail_log(log_file, 2, before=offset)
+    assert records == ["orphan line of a rotated record"]
+    assert offset is None
+
+
+def test_tail_log_filters(log_file):
+    records, _, _ = tail_log(log_file, 10, log_filter=LogFilter(level="WARNING"))
+    assert [r.splitlines()[0] for r in records] == [
+        record(1, "ERROR", "wadas.domain.database"),
+        record(2, "WARNING", "wadas.ai.model"),
+    ]
+    records, _, _ = tail_log(log_file, 10, log_filter=LogFilter(logger_name="wadas.domain"))
+    assert [r.splitlines()[0] for r in records] == [
+        record(0),
+        record(1, "ERROR", "wadas.domain.database"),
+    ]
+    records, _, _ = tail_log(log_file, 10, log_filter=LogFilter(logger_name="wadas.dom"))
+    assert records == []
+
+
+def test_tail_empty_log(tmp_path):
+    path = tmp_path / "WADAS.log"
+    path.touch()
+    assert tail_log(path, 10) == ([], None, 0)
+
+
+def test_follow_log_across_rotation(tmp_path):
+    path = tmp_path / "WADAS.log"
+    logger = logging.getLogger("wadas.test_follow_log")
+    logger.propagate = False
+    handler = RotatingFileHandler(path, maxBytes=300, backupCount=2)
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s [%(name)s]: %(message)s", "%Y-%m-%d %H:%M:%S")
+    )
+    logger.addHandler(handler)
+    try:
+        logger.warning("before following")
+        follower = LogFollower(path, log_filter=LogFilter(level="INFO"))
+        assert follower.read() == []
+
+        followed = []
+        for index in range(10):
+            logger.warning("message %d", index)
+            if index == 5:
+                logger.debug("filtered out")
+            followed += follower.read()
+        assert path.with_name("WADAS.log.1").exists()
+        assert [line.rsplit(": ", 1)[1] for _, line in followed] == [
+            f"message {index}" for index in range(10)
+        ]
+        # Offsets allow to resume following after last line
+        assert followed[-1][0] == path.stat().st_size
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_follow_log_partial_lines(tmp_path):
+    path = tmp_path / "WADAS.log"
+    path.write_text(record(0) + "\n")
+    follower = LogFollower(path, offset=0)
+    with open(path, "a") as f:
+        f.write("2026-10-19 10:00:01 INFO [wadas]: mess")
+    assert follower.read() == [(len(record(0)) + 1, record(0))]
+    with open(path, "a") as f:
+        f.write("age 1\n")
+    assert follower.read() == [(path.stat().st_size, "2026-10-19 10:00:01 INFO [wadas]: message 1")]
+
+
+@pytest.fixture
+def admin(monkeypatch, log_file):
+    monkeypatch.setattr(ServerConfig, "WADAS_ROOT_DIR", log_file.parent.parent)
+    monkeypatch.setattr(
+        web_server_app,
+        "verify_token",
+        lambda token: User(username="admin", password="", email="a@b.c", role="Admin"),
+    )
+
+
+def test_logs_endpoint(admin):
+    response = client.get("/api/v1/logs", params={"lines": 1, "level": "WARNING"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["data"] == [record(2, "WARNING", "wadas.ai.model")]
+
+    response = client.get("/api/v1/logs", params={"lines": 1, "before": data["offset"]})
+    assert response.json()["data"][0].startswith(record(1, "ERROR", "wadas.domain.database"))
+    assert client.get("/api/v1/logs", params={"level": "TRACE"}).status_code == 422
+
+
+def test_follow_log_events(admin, log_file):
+    class MockRequest:
+        def __init__(self):
+            self.polls = 0
+
+        async def is_disconnected(self):
+            self.polls += 1
+            return self.polls > 1
+
+    async def collect():
+        follower = LogFollower(log_file, offset=0, log_filter=LogFilter(level="ERROR"))
+        return [event async for event in web_server_app._follow_log(MockRequest(), follower)]
+
+    events = asyncio.run(collect())
+    first_event = events[0].splitlines()
+    assert first_event[0].startswith("id: ")
+    assert first_event[1] == f"data: {record(1, 'ERROR', 'wadas.domain.database')}"
+    assert len(events) == 3  # Record first line and its traceback lines
@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from wadas_webserver import web_server_app
+from wadas_webserver.database import Database
+from wadas_webserver.server_config import ServerConfig
+from wadas_webserver.view_model import Camera
+from wadas_webserver.web_server_app import app
+
+client = TestClient(app)
+
+
+class MockDatabase(Database):
+    def __init__(self):
+        super().__init__("sqlite:///:memory:")
+        self.queries = 0
+        self.animals = ["boar", "fox"]
+
+    def get_cameras(self):
+        self.queries += 1
+        return [
+            Camera(id=index, name=f"Camera{index}", type="FTP", enabled=True)
+            for index in range(100)
+        ]
+
+    def get_known_animals(self):
+        self.queries += 1
+        return list(self.animals)
+
+
+@pytest.fixture
+def mock_database(monkeypatch):
+    database = MockDatabase()
+    monkeypatch.setattr(web_server_app.Database, "instance", database)
+    monkeypatch.setattr(web_server_app, "verify_token", lambda token: None)
+    monkeypatch.setattr(web_server_app, "_lookup_responses", {})
+    return database
+
+
+def test_lookup_cached_and_not_modified(mock_database):
+    response = client.get("/api/v1/animals")
+    assert response.status_code == 200
+    assert response.json() == {"data": ["boar", "fox"]}
+    etag = response.headers["etag"]
+
+    response = client.get("/api/v1/animals", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert mock_database.queries == 1
+
+    # Known animals do not invalidate the lookup, new ones do
+    mock_database.invalidate_lookup("animals", "fox")
+    assert client.get("/api/v1/animals", headers={"If-None-Match": etag}).status_code == 304
+    mock_database.animals.append("wolf")
+    mock_database.invalidate_lookup("animals", "wolf")
+    response = client.get("/api/v1/animals", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == {"data": ["boar", "fox", "wolf"]}
+    assert response.headers["etag"] != etag
+    assert mock_database.queries == 2
+
+
+def test_lookup_expires(mock_database, monkeypatch):
+    monkeypatch.setattr(Database, "LOOKUP_CACHE_TTL", 0)
+    client.get("/api/v1/cameras")
+    client.get("/api/v1/cameras")
+    assert mock_database.queries == 2
+
+
+def test_lookup_gzip_compressed(mock_database):
+    response = client.get("/api/v1/cameras", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["data"]) == 100
+    # Small responses are not compressed
+    response = client.get("/api/v1/animals", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_media_not_gzip_compressed(mock_database, tmp_path, monkeypatch):
+    monkeypatch.setattr(ServerConfig, "WADAS_ROOT_DIR", tmp_path)
+    (tmp_path / "video_test").mkdir()
+    (tmp_path / "video_test" / "video.mp4").write_bytes(bytes(4096))
+    response = client.get("/api/v1/detections/test_video", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert len(response.content) == 4096
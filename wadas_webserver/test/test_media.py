@@ -0,0 +1,177 @@
+import io
+from datetime import datetime
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from wadas.domain.video_writer import _read_top_level_boxes
+from wadas_webserver import web_server_app
+from wadas_webserver.media import delete_renditions, get_renditions_folder
+from wadas_webserver.server_config import ServerConfig
+from wadas_webserver.view_model import DetectionEvent
+from wadas_webserver.web_server_app import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    Image.new("RGB", (2000, 1500), (200, 100, 50)).save(tmp_path / "detection.jpg")
+    writer = cv2.VideoWriter(
+        str(tmp_path / "detection.avi"), cv2.VideoWriter_fourcc(*"MJPG"), 10, (640, 480)
+    )
+    for _ in range(5):
+        writer.write(np.zeros((480, 640, 3), dtype=np.uint8))
+    writer.release()
+
+    class MockDatabase:
+        def get_detection_event_by_id(self, event_id):
+            return DetectionEvent(
+                id=event_id,
+                camera_id=1,
+                detection_img_path="detection.avi" if event_id == 2 else "detection.jpg",
+                classification_img_path=None,
+                detected_animals=1,
+                classification=False,
+                classified_animals=[],
+                timestamp=datetime.now(),
+            )
+
+    monkeypatch.setattr(web_server_app.Database, "instance", MockDatabase())
+    monkeypatch.setattr(web_server_app, "verify_token", lambda token: None)
+    monkeypatch.setattr(ServerConfig, "WADAS_ROOT_DIR", tmp_path)
+    monkeypatch.setattr(ServerConfig, "RENDITIONS_FOLDER", tmp_path / "renditions")
+    return tmp_path
+
+
+def test_original_image_not_modified(media_root):
+    response = client.get("/api/v1/detections/1/image")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "max-age" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+
+    response = client.get("/api/v1/detections/1/image", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert not response.content
+    last_modified = response.headers["last-modified"]
+    response = client.get(
+        "/api/v1/detections/1/image", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize(
+    "accept, media_type, image_format",
+    [("image/webp,image/*", "image/webp", "WEBP"), ("image/*", "image/jpeg", "JPEG")],
+)
+def test_image_rendition(media_root, accept, media_type, image_format):
+    response = client.get(
+        "/api/v1/detections/1/image", params={"size": "thumbnail"}, headers={"Accept": accept}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == media_type
+    assert response.headers["vary"] == "Accept"
+    with Image.open(io.BytesIO(response.content)) as image:
+        assert image.format == image_format
+        assert image.size == (320, 240)
+
+
+def test_rendition_cached(media_root):
+    response = client.get("/api/v1/detections/1/image", params={"size": "medium"})
+    assert response.status_code == 200
+    renditions = list((media_root / "renditions").glob("*/*"))
+    assert len(renditions) == 1
+    with Image.open(renditions[0]) as image:
+        assert image.format == "JPEG"
+        assert max(image.size) == 1280
+    mtime = renditions[0].stat().st_mtime_ns
+
+    response = client.get("/api/v1/detections/1/image", params={"size": "medium"})
+    assert response.status_code == 200
+    assert renditions[0].stat().st_mtime_ns == mtime
+    response = client.get(
+        "/api/v1/detections/1/image",
+        params={"size": "medium"},
+        headers={"If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == 304
+
+
+def test_video_thumbnail(media_root):
+    response = client.get("/api/v1/detections/2/media", params={"size": "thumbnail"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    renditions = list(get_renditions_folder(media_root / "detection.avi").iterdir())
+    with Image.open(renditions[0]) as image:
+        assert image.size == (320, 240)
+
+
+def test_range_request(media_root):
+    content = (media_root / "detection.avi").read_bytes()
+    response = client.get("/api/v1/detections/2/media")
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+
+    response = client.get("/api/v1/detections/2/media", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+    assert response.content == content[100:200]
+
+    # Range honoured only if the media did not change
+    response = client.get(
+        "/api/v1/detections/2/media", headers={"Range": "bytes=100-199", "If-Range": etag}
+    )
+    assert response.status_code == 206
+    response = client.get(
+        "/api/v1/detections/2/media", headers={"Range": "bytes=100-199", "If-Range": '"old"'}
+    )
+    assert response.status_code == 200
+    assert response.content == content
+
+
+def test_video_renditions(media_root):
+    response = client.get("/api/v1/detections/2/media", params={"size": "poster"})
+    assert response.status_code == 200
+    with Image.open(io.BytesIO(response.content)) as image:
+        assert image.size == (640, 480)
+
+    response = client.get("/api/v1/detections/2/media", params={"size": "medium"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "video/mp4"
+    rendition_path = (
+        get_renditions_folder(media_root / "detection.avi")
+        / f"{response.headers['etag'][1:-1]}.mp4"
+    )
+    with open(rendition_path, "rb") as f:
+        boxes = [box[0] for box in _read_top_level_boxes(f, len(response.content))]
+    assert boxes.index(b"moov") < boxes.index(b"mdat")
+    capture = cv2.VideoCapture(str(rendition_path))
+    assert capture.get(cv2.CAP_PROP_FRAME_WIDTH) == 640
+    capture.release()
+
+
+def test_invalid_rendition_size(media_root):
+    response = client.get("/api/v1/detections/1/image", params={"size": "huge"})
+    assert response.status_code == 422
+
+
+def test_renditions_evicted_over_quota(media_root, monkeypatch):
+    monkeypatch.setattr(ServerConfig, "RENDITIONS_MAX_SIZE_MB", 0)
+    client.get("/api/v1/detections/1/image", params={"size": "thumbnail"})
+    response = client.get("/api/v1/detections/1/image", params={"size": "poster"})
+    assert response.status_code == 200
+    # Least recently used renditions are removed, never the one just generated
+    renditions = list((media_root / "renditions").glob("*/*"))
+    assert [path.stem for path in renditions] == [response.headers["etag"][1:-1]]
+
+
+def test_renditions_deleted_with_media(media_root):
+    client.get("/api/v1/detections/1/image", params={"size": "thumbnail"})
+    client.get("/api/v1/detections/2/media", params={"size": "thumbnail"})
+    delete_renditions(media_root / "detection.jpg")
+    assert not get_renditions_folder(media_root / "detection.jpg").exists()
+    assert get_renditions_folder(media_root / "detection.avi").exists()
@@ -0,0 +1,27 @@
+import math
+from datetime import datetime, timedelta
+
+from wadas_webserver.timeseries import lttb
+
+
+def make_points(count):
+    start = datetime(2026, 10, 19)
+    return [(start + timedelta(minutes=index), math.sin(index / 50)) for index in range(count)]
+
+
+def test_lttb_downsampling():
+    points = make_points(10000)
+    sampled = lttb(points, 500)
+    assert len(sampled) == 500
+    assert sampled[0] == points[0]
+    assert sampled[-1] == points[-1]
+    assert [point[0] for point in sampled] == sorted(point[0] for point in sampled)
+    # Peaks of the series are kept
+    assert max(point[1] for point in sampled) > 0.999
+    assert min(point[1] for point in sampled) < -0.999
+
+
+def test_lttb_short_series_unchanged():
+    points = make_points(10)
+    assert lttb(points, 500) == points
+    assert lttb(points, 2) == points
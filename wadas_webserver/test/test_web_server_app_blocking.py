@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+
+from wadas_webserver import web_server_app
+from wadas_webserver.view_model import User
+from wadas_webserver.web_server_app import app, run_blocking
+
+client = TestClient(app)
+
+
+def test_run_blocking_does_not_stall_event_loop():
+    async def main():
+        slow_call = asyncio.ensure_future(run_blocking(time.sleep, 0.5))
+        start = time.monotonic()
+        await asyncio.sleep(0.05)
+        # Event loop keeps serving while the blocking call runs in the thread pool
+        assert time.monotonic() - start < 0.4
+        assert not slow_call.done()
+        await slow_call
+
+    asyncio.run(main())
+
+
+def test_run_blocking_runs_out_of_event_loop_thread():
+    async def main():
+        return await run_blocking(threading.current_thread)
+
+    assert asyncio.run(main()).name.startswith("wadas-web-blocking")
+
+
+@pytest.fixture
+def mock_database(monkeypatch):
+    hashed_password = bcrypt.hashpw(b"secret", bcrypt.gensalt()).decode("utf-8")
+
+    class MockDatabase:
+        def get_user_by_username(self, username):
+            if username == "tester":
+                return User(
+                    username="tester",
+                    password=hashed_password,
+                    email="tester@example.com",
+                    role="Admin",
+                )
+            return None
+
+    monkeypatch.setattr(web_server_app.Database, "instance", MockDatabase())
+
+
+def test_login(monkeypatch, mock_database):
+    monkeypatch.setattr(web_server_app, "create_access_token", lambda data: "access")
+    monkeypatch.setattr(web_server_app, "create_refresh_token", lambda data: "refresh")
+    response = client.post("/api/v1/login", json={"username": "tester", "password": "secret"})
+    assert response.status_code == 200
+    assert response.json()["access_token"] == "access"
+
+
+@pytest.mark.parametrize("username, password", [("tester", "wrong"), ("unknown", "secret")])
+def test_login_rejected(mock_database, username, password):
+    response = client.post("/api/v1/login", json={"username": username, "password": password})
+    assert response.status_code == 401
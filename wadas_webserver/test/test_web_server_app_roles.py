@@ -25,12 +25,14 @@ Covers:
   gain access to it).
 """
 
+import asyncio
 from datetime import datetime, timezone
 
 import pytest
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
+from wadas.domain.event_hub import EventHub, EventTopics, event_hub
 from wadas_webserver import web_server_app
 from wadas_webserver.view_model import User
 from wadas_webserver.web_server_app import (
@@ -190,3 +192,48 @@ def test_logs_endpoint_rejects_non_admin(monkeypatch, role):
     monkeypatch.setattr(web_server_app, "verify_token", override_verify_token(role))
     response = client.get("/api/v1/logs", headers={"x-access-token": "fake"})
     assert response.status_code == 403
+
+
+def test_events_stream_rejects_viewer_actuator_topics(monkeypatch):
+    monkeypatch.setattr(web_server_app, "verify_token", override_verify_token("Viewer"))
+    response = client.get(
+        "/api/v1/events/stream",
+        params={"topics": ["detection", "actuator_status"]},
+        headers={"x-access-token": "fake"},
+    )
+    assert response.status_code == 403
+
+
+class MockRequest:
+    async def is_disconnected(self):
+        return True
+
+
+@pytest.mark.parametrize(
+    "role, expected_topics",
+    [
+        ("Viewer", {EventTopics.DETECTION, EventTopics.CLASSIFICATION}),
+        ("Operator", set(EventTopics)),
+    ],
+)
+def test_events_stream_topics_by_role(monkeypatch, role, expected_topics):
+    monkeypatch.setattr(web_server_app, "verify_token", override_verify_token(role))
+
+    subscriptions = []
+
+    def subscribe(topics, last_event_id=None):
+        subscriptions.append(EventHub.subscribe(event_hub, topics, last_event_id))
+        return subscriptions[-1]
+
+    monkeypatch.setattr(event_hub, "subscribe", subscribe)
+
+    async def stream():
+        response = await web_server_app.stream_events(MockRequest(), "fake")
+        # Subscribed only once streaming starts
+        assert not subscriptions
+        async for _ in response.body_iterator:
+            pass
+
+    asyncio.run(stream())
+    assert [subscription.topics for subscription in subscriptions] == [expected_topics]
+    assert event_hub.subscribers == 0
@@ -0,0 +1,58 @@
+# This file is part of WADAS project.
+#
+# WADAS is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# WADAS is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with WADAS. If not, see <https://www.gnu.org/licenses/>.
+#
+# Author(s): Stefano Dell'Osa, Alessandro Palla, Cesare Di Mauro, Antonio Farina
+# Date: 2026-10-19
+# Description: Module to downsample time series charted by the web interface.
+
+from datetime import datetime
+
+
+def lttb(points: list[tuple[datetime, float]], threshold: int) -> list[tuple[datetime, float]]:
+    """Method to downsample chronologically ordered (timestamp, value) points with the
+    Largest-Triangle-Three-Buckets algorithm, keeping the visual shape of the series.
+    First and last points are always kept."""
+    if threshold >= len(points) or threshold < 3:
+        return points
+
+    xs = [point[0].timestamp() for point in points]
+    sampled = [points[0]]
+    # Points between first and last are split into threshold - 2 buckets
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    selected = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        # Third vertex is the average of the next bucket (last point for the last one)
+        next_end = min(int((bucket + 2) * bucket_size) + 1, len(points))
+        if end >= next_end:
+            next_end = len(points)
+        next_x = sum(xs[end:next_end]) / (next_end - end)
+        next_y = sum(point[1] for point in points[end:next_end]) / (next_end - end)
+
+        selected_x, selected_y = xs[selected], points[selected][1]
+        max_area = -1.0
+        for index in range(start, end):
+            area = abs(
+                (selected_x - next_x) * (points[index][1] - selected_y)
+                - (selected_x - xs[index]) * (next_y - selected_y)
+            )
+            if area > max_area:
+                max_area = area
+                candidate = index
+        selected = candidate
+        sampled.append(points[selected])
+    sampled.append(points[-1])
+    return sampled
@@ -17,7 +17,7 @@
 # Date: 2025-02-21
 # Description: Module containing Class definitions for view-model objects.
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -27,6 +27,10 @@ class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
 
+# Media renditions, original is the full resolution file
+RenditionSize = Literal["original", "thumbnail", "poster", "medium"]
+
+
 class LoginRequest(BaseModel):
     username: str
     password: str
@@ -40,6 +44,9 @@ class DetectionsRequest(BaseModel):
     order_by: Optional[str] = "timestamp_desc"
     offset: Optional[int] = 0
     limit: Optional[int] = 20
+    # Keyset pagination: next_cursor of previous page, takes precedence over offset
+    cursor: Optional[str] = None
+    include_total: Optional[bool] = True
 
 
 class ActuationsRequest(BaseModel):
@@ -50,6 +57,32 @@ class ActuationsRequest(BaseModel):
     commands: Optional[List[str]] = None
     offset: Optional[int] = 0
     limit: Optional[int] = 20
+    # Keyset pagination: next_cursor of previous page, takes precedence over offset
+    cursor: Optional[str] = None
+    include_total: Optional[bool] = True
+
+
+class DetectionsExportRequest(DetectionsRequest):
+    format: Literal["csv", "parquet"] = "csv"
+
+
+class ActuationsExportRequest(ActuationsRequest):
+    format: Literal["csv", "parquet"] = "csv"
+
+
+class StatsRequest(BaseModel):
+    period: Literal["hour", "day"] = "day"
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    camera_ids: Optional[List[int]] = None
+    classified_animals: Optional[List[str]] = None
+
+
+class TunnelStatsRequest(BaseModel):
+    period: Literal["hour", "day"] = "day"
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    tunnel_ids: Optional[List[str]] = None
 
 
 # View Models
@@ -99,6 +132,26 @@ class ActuationEvent(BaseModel):
     command_response_message: Optional[str] = None
 
 
+class DetectionStats(BaseModel):
+    period_start: datetime
+    camera_id: int
+    detections: int
+
+
+class SpeciesStats(BaseModel):
+    period_start: datetime
+    camera_id: int
+    species: str
+    animals: int
+
+
+class TunnelStats(BaseModel):
+    period_start: datetime
+    tunnel_id: str
+    in_count: int
+    out_count: int
+
+
 class RefreshResponse(BaseModel):
     access_token: str
     token_type: str = "JWT"
@@ -109,9 +162,10 @@ class DataResponse(BaseModel):
 
 
 class PaginatedResponse(BaseModel):
-    total: int
+    total: Optional[int]
     count: int
     data: object
+    next_cursor: Optional[str] = None
 
 
 class ActuatorDetailed(BaseModel):
@@ -141,6 +195,9 @@ class ActuatorTemperatureStatus(BaseModel):
 class ActuatorBatteryStatus(BaseModel):
     voltage: Optional[float] = None
     timestamp: datetime
+    # Set when readings are aggregated in time buckets, voltage being their mean
+    min_voltage: Optional[float] = None
+    max_voltage: Optional[float] = None
 
 
 class ActuatorBatteryHistoryResponse(BaseModel):
@@ -150,11 +207,24 @@ class ActuatorBatteryHistoryResponse(BaseModel):
 class ActuatorTemperaturePoint(BaseModel):
     temperature: Optional[float] = None
     timestamp: datetime
+    min_temperature: Optional[float] = None
+    max_temperature: Optional[float] = None
 
 
 class BatteryTemperaturePoint(BaseModel):
     temperature: Optional[float] = None
     timestamp: datetime
+    min_temperature: Optional[float] = None
+    max_temperature: Optional[float] = None
+
+
+class TelemetryPoint(BaseModel):
+    """Telemetry reading, or aggregate of readings in a time bucket starting at timestamp"""
+
+    timestamp: datetime
+    value: float
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
 
 
 class ActuatorTemperatureHistoryResponse(BaseModel):
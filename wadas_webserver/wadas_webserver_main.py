@@ -25,6 +25,7 @@ import socket
 import threading
 import time
 
+from wadas.domain.database import DataBase
 from wadas_webserver.database import Database
 from wadas_webserver.server_config import ServerConfig
 from wadas_webserver.utils import cert_gen, setup_logger
@@ -113,6 +114,12 @@ def run_webserver_threaded(enc_conn_str, project_uuid, stop_event: threading.Eve
     if config := ServerConfig(project_uuid):
         ServerConfig.instance = config
         Database.instance = Database(conn_string)
+        # Users and lookups are updated by WADAS in this same process: cached ones are kept
+        # up to date
+        users_listener = Database.instance.invalidate_cached_user
+        DataBase.users_listeners.append(users_listener)
+        lookups_listener = Database.instance.invalidate_lookup
+        DataBase.lookups_listeners.append(lookups_listener)
 
         # Start Uvicorn server in a thread
         def server_target():
@@ -134,6 +141,8 @@ def run_webserver_threaded(enc_conn_str, project_uuid, stop_event: threading.Eve
         if ws_thread.is_alive():
             logger.warning("Webserver thread did not exit within timeout.")
 
+        DataBase.users_listeners.remove(users_listener)
+        DataBase.lookups_listeners.remove(lookups_listener)
         flag_run = False
         logger.info("WADAS webserver stopped cleanly.")
     else:
@@ -17,25 +17,47 @@
 # Date: 2025-02-21
 # Description: Module containing FastAPI exposed endpoints.
 
+import asyncio
+import functools
+import hashlib
 import json
 import logging
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Annotated, Literal
 
 import bcrypt
 from fastapi import FastAPI, Header, HTTPException, Query, Request, status
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse
 from jose import JWTError, jwt
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import FileResponse, Response, StreamingResponse
 
 from wadas.domain.actuator import Actuator, Command
+from wadas.domain.event_hub import EventTopics, event_hub
 from wadas.domain.roles import ACTUATOR_ROLES, ADMIN_ONLY_ROLES, WadasRoles
+from wadas_webserver.compression import TextGZipMiddleware
 from wadas_webserver.database import Database
+from wadas_webserver.log_reader import LogFilter, LogFollower, tail_log
+from wadas_webserver.media import (
+    RENDITION_FORMATS,
+    MediaFileResponse,
+    etag_matches,
+    get_cache_headers,
+    get_etag,
+    get_rendition,
+    is_not_modified,
+    negotiate_format,
+)
 from wadas_webserver.server_config import ServerConfig
 from wadas_webserver.utils import create_access_token, create_refresh_token
 from wadas_webserver.view_model import (
+    ActuationsExportRequest,
     ActuationsRequest,
     ActuatorBatteryHistoryResponse,
     ActuatorBatteryStatus,
@@ -45,17 +67,29 @@ from wadas_webserver.view_model import (
     ActuatorTemperaturePoint,
     BatteryTemperaturePoint,
     DataResponse,
+    DetectionsExportRequest,
     DetectionsRequest,
     LoginRequest,
     PaginatedResponse,
     RefreshResponse,
     RefreshTokenRequest,
+    RenditionSize,
+    StatsRequest,
+    TunnelStatsRequest,
     User,
 )
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+# Threads running blocking calls, bounded under the db connection pool size
+BLOCKING_WORKERS = 8
+_blocking_executor = ThreadPoolExecutor(
+    max_workers=BLOCKING_WORKERS, thread_name_prefix="wadas-web-blocking"
+)
+
+app = FastAPI(
+    docs_url=None, redoc_url=None, openapi_url=None, default_response_class=ORJSONResponse
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -64,6 +98,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TextGZipMiddleware, minimum_size=1024, compresslevel=6)
 
 
 @app.exception_handler(404)
@@ -92,7 +127,7 @@ def verify_token(token, token_type="access") -> User:
         if (username := payload.get("sub")) is None:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-        if user := Database.instance.get_user_by_username(username):
+        if user := Database.instance.get_cached_user(username):
             return user
         else:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
@@ -102,6 +137,31 @@ def verify_token(token, token_type="access") -> User:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 
+def authenticate(username, password) -> User | None:
+    """Return the user if password matches, None otherwise."""
+    if user := Database.instance.get_user_by_username(username):
+        if bcrypt.checkpw(password.encode("utf-8"), user.password.encode("utf-8")):
+            return user
+    return None
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call (db queries, password hashing) in the bounded thread pool,
+    not to stall the event loop serving all the other requests."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _blocking_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+def validate_cursor(cursor: str | None) -> None:
+    """Raise a 400 if the given pagination cursor is not valid."""
+    if cursor:
+        try:
+            Database.decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
 def require_role(user: User, allowed_roles: set[WadasRoles]) -> None:
     """Raise a 403 if the given user's role is not among the allowed roles."""
     try:
@@ -116,19 +176,18 @@ def require_role(user: User, allowed_roles: set[WadasRoles]) -> None:
 @app.post("/api/v1/login")
 async def login(data: LoginRequest):
     """Method to submit the login request"""
-    if user := Database.instance.get_user_by_username(data.username):
-        if bcrypt.checkpw(data.password.encode("utf-8"), user.password.encode("utf-8")):
-            acc_token = create_access_token(data={"sub": data.username})
-            ref_token = create_refresh_token(data={"sub": data.username})
+    if user := await run_blocking(authenticate, data.username, data.password):
+        acc_token = create_access_token(data={"sub": data.username})
+        ref_token = create_refresh_token(data={"sub": data.username})
 
-            logger.info("User %s logged in.", user.username)
+        logger.info("User %s logged in.", user.username)
 
-            return {
-                "access_token": acc_token,
-                "refresh_token": ref_token,
-                "token_type": "JWT",
-                "role": user.role,
-            }
+        return {
+            "access_token": acc_token,
+            "refresh_token": ref_token,
+            "token_type": "JWT",
+            "role": user.role,
+        }
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -139,41 +198,71 @@ async def login(data: LoginRequest):
 @app.post("/api/v1/token/refresh")
 async def refresh_token(request: RefreshTokenRequest):
     """Method to refresh access token using the refresh token"""
-    user = verify_token(request.refresh_token, token_type="refresh")
+    user = await run_blocking(verify_token, request.refresh_token, token_type="refresh")
     new_access_token = create_access_token(data={"sub": user.username})
     return RefreshResponse(access_token=new_access_token)
 
 
+def _json_response(model: BaseModel) -> Response:
+    """Method to encode a response model straight to JSON, skipping the slower
+    conversion to Python objects performed by FastAPI. Used by list endpoints."""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+# Lookups are revalidated by clients at each use, as they change along with events
+LOOKUP_CACHE_CONTROL = "private, no-cache"
+# Encoded lookups: lookup -> (entries, JSON body, ETag), refreshed when entries change
+_lookup_responses = {}
+
+
+async def _lookup_response(request: Request, lookup: str) -> Response:
+    """Method to build the response of a lookup, encoded once per cached entries.
+    Conditional requests are answered with 304 while the lookup is unchanged."""
+    entries = await run_blocking(Database.instance.get_cached_lookup, lookup)
+    cached = _lookup_responses.get(lookup)
+    if not cached or cached[0] is not entries:
+        body = DataResponse(data=entries).model_dump_json().encode()
+        cached = (entries, body, hashlib.sha1(body, usedforsecurity=False).hexdigest())
+        _lookup_responses[lookup] = cached
+
+    _, body, etag = cached
+    headers = {"ETag": f'"{etag}"', "Cache-Control": LOOKUP_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @app.get("/api/v1/cameras")
-async def get_cameras(x_access_token: Annotated[str | None, Header()] = None):
+async def get_cameras(request: Request, x_access_token: Annotated[str | None, Header()] = None):
     """Method to get all enabled cameras"""
-    verify_token(x_access_token)
-    cameras = Database.instance.get_cameras()
-    return DataResponse(data=cameras)
+    await run_blocking(verify_token, x_access_token)
+    return await _lookup_response(request, "cameras")
 
 
 @app.get("/api/v1/animals")
-async def get_animals(x_access_token: Annotated[str | None, Header()] = None):
+async def get_animals(request: Request, x_access_token: Annotated[str | None, Header()] = None):
     """Method to get all known animals in the database"""
-    verify_token(x_access_token)
-    animals_names = Database.instance.get_known_animals()
-    return DataResponse(data=animals_names)
+    await run_blocking(verify_token, x_access_token)
+    return await _lookup_response(request, "animals")
 
 
 @app.get("/api/v1/actuator_types")
-async def get_actuator_types(x_access_token: Annotated[str | None, Header()] = None):
+async def get_actuator_types(
+    request: Request, x_access_token: Annotated[str | None, Header()] = None
+):
     """Method to get all known types for actuator"""
-    verify_token(x_access_token)
-    actuator_types = Database.instance.get_known_actuator_types()
-    return DataResponse(data=actuator_types)
+    await run_blocking(verify_token, x_access_token)
+    return await _lookup_response(request, "actuator_types")
 
 
 @app.get("/api/v1/actuation_commands")
-async def get_actuation_commands(x_access_token: Annotated[str | None, Header()] = None):
+async def get_actuation_commands(
+    request: Request, x_access_token: Annotated[str | None, Header()] = None
+):
     """Method to get all known commands for actuation events"""
-    verify_token(x_access_token)
-    actuation_commands = Database.instance.get_known_actuation_commands()
-    return DataResponse(data=actuation_commands)
+    await run_blocking(verify_token, x_access_token)
+    return await _lookup_response(request, "actuation_commands")
 
 
 @app.get("/api/v1/detections")
@@ -184,9 +273,14 @@ async def get_filtered_detections(
     """Method to get paginated detection events filtered
     by different filters and their total count
     """
-    verify_token(x_access_token)
-    total, events = Database.instance.get_detection_events_by_filter(detection_filter)
-    return PaginatedResponse(total=total, count=len(events), data=events)
+    await run_blocking(verify_token, x_access_token)
+    validate_cursor(detection_filter.cursor)
+    total, events, next_cursor = await run_blocking(
+        Database.instance.get_detection_events_page, detection_filter
+    )
+    return _json_response(
+        PaginatedResponse(total=total, count=len(events), data=events, next_cursor=next_cursor)
+    )
 
 
 @app.get("/api/v1/actuations")
@@ -197,32 +291,110 @@ async def get_filtered_actuations(
     """Method to get paginated actuation events filtered
     by different filters and their total count
     """
-    verify_token(x_access_token)
-    total, events = Database.instance.get_actuation_events_by_filter(actuation_filter)
-    return PaginatedResponse(total=total, count=len(events), data=events)
+    await run_blocking(verify_token, x_access_token)
+    validate_cursor(actuation_filter.cursor)
+    total, events, next_cursor = await run_blocking(
+        Database.instance.get_actuation_events_page, actuation_filter
+    )
+    return _json_response(
+        PaginatedResponse(total=total, count=len(events), data=events, next_cursor=next_cursor)
+    )
+
+
+@app.get("/api/v1/stats/detections")
+async def get_detection_stats(
+    stats_filter: Annotated[StatsRequest, Query()],
+    x_access_token: Annotated[str | None, Header()] = None,
+):
+    """Method to get detection events count per camera and hour or day"""
+    await run_blocking(verify_token, x_access_token)
+    stats = await run_blocking(Database.instance.get_detection_stats, stats_filter)
+    return _json_response(DataResponse(data=stats))
+
+
+@app.get("/api/v1/stats/species")
+async def get_species_stats(
+    stats_filter: Annotated[StatsRequest, Query()],
+    x_access_token: Annotated[str | None, Header()] = None,
+):
+    """Method to get classified animals count per species, camera and hour or day"""
+    await run_blocking(verify_token, x_access_token)
+    stats = await run_blocking(Database.instance.get_species_stats, stats_filter)
+    return _json_response(DataResponse(data=stats))
+
+
+@app.get("/api/v1/stats/tunnels")
+async def get_tunnel_stats(
+    stats_filter: Annotated[TunnelStatsRequest, Query()],
+    x_access_token: Annotated[str | None, Header()] = None,
+):
+    """Method to get animals entering and leaving tunnels per hour or day"""
+    await run_blocking(verify_token, x_access_token)
+    stats = await run_blocking(Database.instance.get_tunnel_stats, stats_filter)
+    return _json_response(DataResponse(data=stats))
+
+
+async def _media_response(request: Request, media_path: Path, media_type, filename, size):
+    """Method to build the response of an event media or of its reduced rendition,
+    with caching headers, answering conditional requests with 304 and range requests
+    with 206, so that videos can be played while downloading."""
+    stat_result = media_path.stat()
+    if size == "original":
+        etag = get_etag(media_path, stat_result, size)
+        headers = get_cache_headers(etag, stat_result)
+        if is_not_modified(request.headers, etag, stat_result):
+            return Response(status_code=304, headers=headers)
+        return MediaFileResponse(
+            media_path,
+            media_type=media_type,
+            filename=f"{filename}{media_path.suffix}",
+            headers=headers,
+        )
+
+    rendition_format = negotiate_format(media_path, size, request.headers.get("accept"))
+    etag = get_etag(media_path, stat_result, f"{size}.{rendition_format}")
+    headers = get_cache_headers(etag, stat_result) | {"Vary": "Accept"}
+    if is_not_modified(request.headers, etag, stat_result):
+        return Response(status_code=304, headers=headers)
+    try:
+        rendition_path = await run_blocking(get_rendition, media_path, size, rendition_format, etag)
+    except (OSError, RuntimeError, ValueError):
+        logger.exception("Unable to generate %s rendition of %s", size, media_path)
+        raise HTTPException(status_code=500, detail="Generic Error") from None
+    _, media_type, extension = RENDITION_FORMATS[rendition_format]
+    return MediaFileResponse(
+        rendition_path,
+        media_type=media_type,
+        filename=f"{filename}_{size}{extension}",
+        headers=headers,
+    )
 
 
 @app.get("/api/v1/detections/{event_id}/image")
 async def download_image(
     event_id: int,
+    request: Request,
+    size: RenditionSize = "original",
     x_access_token: Annotated[str | None, Header()] = None,
 ):
     """Method used to download the image (detection or classification)
-    associated to the detection event
+    associated to the detection event, full size or as a reduced rendition
     """
-    verify_token(x_access_token)
-    event = Database.instance.get_detection_event_by_id(event_id)
+    await run_blocking(verify_token, x_access_token)
+    event = await run_blocking(Database.instance.get_detection_event_by_id, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    image_path = Path(ServerConfig.WADAS_ROOT_DIR) / (
-        event.classification_img_path or event.detection_img_path
-    )
+    if not (relative_path := event.classification_img_path or event.detection_img_path):
+        raise HTTPException(status_code=404, detail="Image not found")  # Removed by retention
+    image_path = Path(ServerConfig.WADAS_ROOT_DIR) / relative_path
 
     if (ext := image_path.suffix) == ".png":
         media_type = "image/png"
     elif ext in [".jpg", ".jpeg"]:
         media_type = "image/jpeg"
+    elif ext == ".webp":
+        media_type = "image/webp"
     else:
         logger.error("Image extension unknown for %s", image_path)
         raise HTTPException(status_code=500, detail="Generic Error")
@@ -230,24 +402,27 @@ async def download_image(
     if not image_path.is_file():
         raise HTTPException(status_code=404, detail="Image not found")
 
-    return FileResponse(image_path, media_type=media_type, filename=f"{event_id}{ext}")
+    return await _media_response(request, image_path, media_type, event_id, size)
 
 
 @app.get("/api/v1/detections/{event_id}/media")
 async def download_media(
     event_id: int,
+    request: Request,
+    size: RenditionSize = "original",
     x_access_token: Annotated[str | None, Header()] = None,
     access_token: str | None = None,
 ):
-    """Method used to download the media associated to the detection event."""
-    verify_token(x_access_token or access_token)
-    event = Database.instance.get_detection_event_by_id(event_id)
+    """Method used to download the media associated to the detection event.
+    Reduced renditions of videos are images of their first frame."""
+    await run_blocking(verify_token, x_access_token or access_token)
+    event = await run_blocking(Database.instance.get_detection_event_by_id, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    media_path = Path(ServerConfig.WADAS_ROOT_DIR) / (
-        event.classification_img_path or event.detection_img_path
-    )
+    if not (relative_path := event.classification_img_path or event.detection_img_path):
+        raise HTTPException(status_code=404, detail="Media not found")  # Removed by retention
+    media_path = Path(ServerConfig.WADAS_ROOT_DIR) / relative_path
 
     media_type = _get_media_type(media_path.suffix)
     if not media_type:
@@ -257,9 +432,7 @@ async def download_media(
     if not media_path.is_file():
         raise HTTPException(status_code=404, detail="Media not found")
 
-    return FileResponse(
-        media_path, media_type=media_type, filename=f"{event_id}{media_path.suffix}"
-    )
+    return await _media_response(request, media_path, media_type, event_id, size)
 
 
 @app.get("/api/v1/detections/test_video")
@@ -270,42 +443,13 @@ async def test_stream_video(
     """Method used to download the image (detection or classification)
     associated to the detection event
     """
-    verify_token(x_access_token)
+    await run_blocking(verify_token, x_access_token)
     video_path = Path(ServerConfig.WADAS_ROOT_DIR) / "video_test" / "video.mp4"
 
     if not video_path.exists():
         raise HTTPException(status_code=404, detail="Video not found")
 
-    file_size = video_path.stat().st_size
-    range_header = request.headers.get("range")
-
-    def iterfile(start=0):
-        with open(video_path, "rb") as f:
-            f.seek(start)
-            while chunk := f.read(1024 * 1024):  # 1MB chunk
-                yield chunk
-
-    if range_header:
-        range_val = range_header.replace("bytes=", "")
-        start, end = range_val.split("-")
-        start = int(start)
-        end = int(end or file_size - 1)
-        content_length = end - start + 1
-
-        return StreamingResponse(
-            iterfile(start),
-            status_code=206,
-            media_type="video/mp4",
-            headers={
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(content_length),
-            },
-        )
-    else:
-        return StreamingResponse(
-            iterfile(), media_type="video/mp4", headers={"Content-Length": str(file_size)}
-        )
+    return await _media_response(request, video_path, "video/mp4", "video", "original")
 
 
 def _get_media_type(extension: str) -> str | None:
@@ -314,6 +458,7 @@ def _get_media_type(extension: str) -> str | None:
         ".png": "image/png",
         ".jpg": "image/jpeg",
         ".jpeg": "image/jpeg",
+        ".webp": "image/webp",
         ".mp4": "video/mp4",
         ".avi": "video/x-msvideo",
         ".mov": "video/quicktime",
@@ -323,52 +468,203 @@ def _get_media_type(extension: str) -> str | None:
     return media_types.get(extension)
 
 
+async def _export_events(events_csv_iterator, export_parquet, export_filter, export_format):
+    """Method to build the response of an events export, streaming csv rows as they are
+    fetched from db or sending a parquet file written in the blocking thread pool."""
+    if export_format == "csv":
+        return StreamingResponse(
+            events_csv_iterator(export_filter),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=data.csv"},
+        )
+
+    fd, parquet_path = tempfile.mkstemp(suffix=".parquet")
+    os.close(fd)
+    try:
+        await run_blocking(export_parquet, export_filter, parquet_path)
+    except Exception:
+        os.remove(parquet_path)
+        raise
+    return FileResponse(
+        parquet_path,
+        media_type="application/vnd.apache.parquet",
+        filename="data.parquet",
+        background=BackgroundTask(os.remove, parquet_path),
+    )
+
+
 @app.get("/api/v1/detections/export")
 async def export_filtered_detections(
-    detection_filter: Annotated[DetectionsRequest, Query()],
+    detection_filter: Annotated[DetectionsExportRequest, Query()],
     x_access_token: Annotated[str | None, Header()] = None,
 ):
-    """Method to download a csv file containing the detection events filtered
+    """Method to download a csv (or parquet) file containing the detection events filtered
     by specified filters
     """
-    verify_token(x_access_token)
-    content = Database.instance.export_detection_events_as_csv(detection_filter)
-    return Response(
-        content=content,
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=data.csv"},
+    await run_blocking(verify_token, x_access_token)
+    return await _export_events(
+        Database.instance.iter_detection_events_csv,
+        Database.instance.export_detection_events_as_parquet,
+        detection_filter,
+        detection_filter.format,
     )
 
 
 @app.get("/api/v1/actuations/export")
 async def export_filtered_actuations(
-    actuation_filter: Annotated[ActuationsRequest, Query()],
+    actuation_filter: Annotated[ActuationsExportRequest, Query()],
     x_access_token: Annotated[str | None, Header()] = None,
 ):
-    """Method to download a csv file containing the actuation events filtered
+    """Method to download a csv (or parquet) file containing the actuation events filtered
     by specified filters
     """
-    verify_token(x_access_token)
-    content = Database.instance.export_actuation_events_as_csv(actuation_filter)
-    return Response(
-        content=content,
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=data.csv"},
+    await run_blocking(verify_token, x_access_token)
+    return await _export_events(
+        Database.instance.iter_actuation_events_csv,
+        Database.instance.export_actuation_events_as_parquet,
+        actuation_filter,
+        actuation_filter.format,
     )
 
 
-@app.get("/api/v1/logs")
-async def get_logs(x_access_token: Annotated[str | None, Header()] = None):
-    user = verify_token(x_access_token)
-    require_role(user, ADMIN_ONLY_ROLES)
+LOG_FOLLOW_POLL_INTERVAL = 1  # seconds
+LOG_FOLLOW_HEARTBEAT_INTERVAL = 15  # seconds, keeps proxies from closing idle streams
+LogLevel = Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
 
+def _get_log_file_path() -> Path:
     log_file_path = Path(ServerConfig.WADAS_ROOT_DIR) / "log" / "WADAS.log"
     if not log_file_path.exists():
         raise HTTPException(status_code=404, detail="Log file not found")
+    return log_file_path
 
-    with open(log_file_path, "r") as f:
-        lines = f.readlines()[-200:]  # last 200 log rows
-    return JSONResponse(content={"data": [line.strip() for line in lines]})
+
+@app.get("/api/v1/logs")
+async def get_logs(
+    x_access_token: Annotated[str | None, Header()] = None,
+    lines: Annotated[int, Query(ge=1, le=5000)] = 200,
+    before: Annotated[int | None, Query(ge=0)] = None,
+    level: LogLevel | None = None,
+    logger_name: Annotated[str | None, Query(alias="logger")] = None,
+):
+    """Method to get the last log records, reading the log file backwards.
+    Older records are paged passing the returned offset as before parameter,
+    live ones are followed from the returned end offset through /logs/stream."""
+    user = await run_blocking(verify_token, x_access_token)
+    require_role(user, ADMIN_ONLY_ROLES)
+
+    log_file_path = _get_log_file_path()
+    records, offset, end = await run_blocking(
+        tail_log, log_file_path, lines, before, LogFilter(level, logger_name)
+    )
+    return JSONResponse(content={"data": records, "offset": offset, "end": end})
+
+
+async def _follow_log(request: Request, follower: LogFollower):
+    """Method to stream as Server-Sent Events the lines appended to the log file.
+    Event ids are file offsets, so that clients reconnect where they left off."""
+    last_sent = time.monotonic()
+    while not await request.is_disconnected():
+        if lines := await run_blocking(follower.read):
+            for offset, line in lines:
+                yield f"id: {offset}\ndata: {line}\n\n"
+            last_sent = time.monotonic()
+            continue
+        if time.monotonic() - last_sent > LOG_FOLLOW_HEARTBEAT_INTERVAL:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await asyncio.sleep(LOG_FOLLOW_POLL_INTERVAL)
+
+
+@app.get("/api/v1/logs/stream")
+async def stream_logs(
+    request: Request,
+    x_access_token: Annotated[str | None, Header()] = None,
+    access_token: str | None = None,
+    offset: Annotated[int | None, Query(ge=0)] = None,
+    level: LogLevel | None = None,
+    logger_name: Annotated[str | None, Query(alias="logger")] = None,
+    last_event_id: Annotated[int | None, Header()] = None,
+):
+    """Method to follow the log file as Server-Sent Events, from the given offset
+    or from the end of file. Token can be passed as query parameter, as browsers
+    EventSource does not allow to set headers."""
+    user = await run_blocking(verify_token, x_access_token or access_token)
+    require_role(user, ADMIN_ONLY_ROLES)
+
+    log_file_path = _get_log_file_path()
+    follower = LogFollower(
+        log_file_path,
+        last_event_id if last_event_id is not None else offset,
+        LogFilter(level, logger_name),
+    )
+    return StreamingResponse(
+        _follow_log(request, follower),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Live events require actuators visibility for actuators related topics
+EVENT_TOPICS_ROLES = {
+    EventTopics.DETECTION: set(WadasRoles),
+    EventTopics.CLASSIFICATION: set(WadasRoles),
+    EventTopics.ACTUATION: ACTUATOR_ROLES,
+    EventTopics.ACTUATOR_STATUS: ACTUATOR_ROLES,
+}
+
+
+async def _stream_events(request: Request, topics, last_event_id):
+    """Method to stream as Server-Sent Events the events published by WADAS.
+    A resync event is sent when some events were dropped, as the client was too slow
+    to consume them, so that it reloads the data it shows. Subscription is created once
+    streaming starts, so that it is never leaked if the client goes away before."""
+    subscription = event_hub.subscribe(topics, last_event_id)
+    try:
+        while not await request.is_disconnected():
+            event = await subscription.get(LOG_FOLLOW_HEARTBEAT_INTERVAL)
+            if subscription.overflow:
+                subscription.overflow = False
+                yield "event: resync\ndata: {}\n\n"
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield (
+                    f"id: {event['id']}\nevent: {event['topic']}\n"
+                    f"data: {json.dumps(event['data'])}\n\n"
+                )
+    finally:
+        event_hub.unsubscribe(subscription)
+
+
+@app.get("/api/v1/events/stream")
+async def stream_events(
+    request: Request,
+    x_access_token: Annotated[str | None, Header()] = None,
+    access_token: str | None = None,
+    topics: Annotated[list[EventTopics] | None, Query()] = None,
+    last_event_id: Annotated[int | None, Header()] = None,
+):
+    """Method to push live detection, classification, actuation and actuator status
+    events as Server-Sent Events, instead of polling APIs. Token can be passed as query
+    parameter, as browsers EventSource does not allow to set headers."""
+    user = await run_blocking(verify_token, x_access_token or access_token)
+    require_role(user, set(WadasRoles))
+    allowed_topics = {
+        topic for topic, roles in EVENT_TOPICS_ROLES.items() if WadasRoles(user.role) in roles
+    }
+    if topics:
+        requested_topics = set(topics)
+        if not requested_topics <= allowed_topics:
+            raise HTTPException(status_code=403, detail="Forbidden: insufficient privileges")
+    else:
+        requested_topics = allowed_topics
+
+    return StreamingResponse(
+        _stream_events(request, requested_topics, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # Static pages mounted under the site root
@@ -384,12 +680,12 @@ async def get_actuators(
     x_access_token: Annotated[str | None, Header()] = None,
 ):
     """Return the list of existing actuators (Admin and Operator roles)"""
-    user = verify_token(x_access_token)
+    user = await run_blocking(verify_token, x_access_token)
     require_role(user, ACTUATOR_ROLES)
 
     try:
         # Get actuators from domain class
-        db_actuators = Database.instance.get_actuators()
+        db_actuators = await run_blocking(Database.instance.get_actuators)
 
         # Fetch only Actuator's required fields
         result = [
@@ -413,7 +709,7 @@ async def get_actuator_detail(
     actuator_id: str,
     x_access_token: Annotated[str | None, Header()] = None,
 ):
-    user = verify_token(x_access_token)
+    user = await run_blocking(verify_token, x_access_token)
     require_role(user, ACTUATOR_ROLES)
 
     actuator = Actuator.actuators.get(actuator_id)
@@ -425,8 +721,8 @@ async def get_actuator_detail(
 
     try:
 
-        battery_status = Database.instance.get_last_battery_status(actuator_id)
-        temp_data = Database.instance.get_last_temperature_status(actuator_id)
+        battery_status = await run_blocking(Database.instance.get_last_battery_status, actuator_id)
+        temp_data = await run_blocking(Database.instance.get_last_temperature_status, actuator_id)
         temperature, humidity = temp_data or (None, None)
         voltage, battery_temperature, battery_humidity = battery_status or (None, None, None)
 
@@ -449,17 +745,21 @@ async def get_actuator_detail(
         )
 
 
+HistoryRange = Literal["1d", "7d", "30d", "90d", "180d", "365d"]
+DAYS_BY_HISTORY_RANGE = {"1d": 1, "7d": 7, "30d": 30, "90d": 90, "180d": 180, "365d": 365}
+
+
 @app.get("/api/v1/actuators/{actuator_id}/battery-history")
 async def get_actuator_battery_history(
     actuator_id: str,
     range: Annotated[
-        Literal["1d", "7d", "30d", "90d"],
+        HistoryRange,
         Query(description="Time window for the battery history"),
     ] = "7d",
     x_access_token: Annotated[str | None, Header()] = None,
 ) -> ActuatorBatteryHistoryResponse:
     """Return battery voltage history for an actuator, filtered by time range."""
-    user = verify_token(x_access_token)
+    user = await run_blocking(verify_token, x_access_token)
     require_role(user, ACTUATOR_ROLES)
 
     actuator = Actuator.actuators.get(actuator_id)
@@ -469,13 +769,22 @@ async def get_actuator_battery_history(
             detail=f"Actuator '{actuator_id}' not found",
         )
 
-    days_by_range = {"1d": 1, "7d": 7, "30d": 30, "90d": 90}
-
     try:
-        readings = Database.instance.get_battery_history(actuator_id, days_by_range[range])
+        history = await run_blocking(
+            Database.instance.get_telemetry_history,
+            actuator_id,
+            ["battery_voltage"],
+            DAYS_BY_HISTORY_RANGE[range],
+        )
         return ActuatorBatteryHistoryResponse(
             data=[
-                ActuatorBatteryStatus(voltage=r.voltage, timestamp=r.time_stamp) for r in readings
+                ActuatorBatteryStatus(
+                    voltage=point.value,
+                    timestamp=point.timestamp,
+                    min_voltage=point.min_value,
+                    max_voltage=point.max_value,
+                )
+                for point in history["battery_voltage"]
             ]
         )
     except Exception as e:
@@ -489,14 +798,14 @@ async def get_actuator_battery_history(
 async def get_actuator_temperature_history(
     actuator_id: str,
     range: Annotated[
-        Literal["1d", "7d", "30d", "90d"],
+        HistoryRange,
         Query(description="Time window for the temperature history"),
     ] = "7d",
     x_access_token: Annotated[str | None, Header()] = None,
 ) -> ActuatorTemperatureHistoryResponse:
     """Return temperature history for both the actuator (on-board sensor) and its
     battery pack, filtered by time range."""
-    user = verify_token(x_access_token)
+    user = await run_blocking(verify_token, x_access_token)
     require_role(user, ACTUATOR_ROLES)
 
     actuator = Actuator.actuators.get(actuator_id)
@@ -506,22 +815,32 @@ async def get_actuator_temperature_history(
             detail=f"Actuator '{actuator_id}' not found",
         )
 
-    days_by_range = {"1d": 1, "7d": 7, "30d": 30, "90d": 90}
-
     try:
-        actuator_readings = Database.instance.get_temperature_history(
-            actuator_id, days_by_range[range]
+        history = await run_blocking(
+            Database.instance.get_telemetry_history,
+            actuator_id,
+            ["temperature", "battery_temperature"],
+            DAYS_BY_HISTORY_RANGE[range],
         )
-        battery_readings = Database.instance.get_battery_history(actuator_id, days_by_range[range])
 
         return ActuatorTemperatureHistoryResponse(
             actuator=[
-                ActuatorTemperaturePoint(temperature=r.temperature, timestamp=r.time_stamp)
-                for r in actuator_readings
+                ActuatorTemperaturePoint(
+                    temperature=point.value,
+                    timestamp=point.timestamp,
+                    min_temperature=point.min_value,
+                    max_temperature=point.max_value,
+                )
+                for point in history["temperature"]
             ],
             battery=[
-                BatteryTemperaturePoint(temperature=r.temperature, timestamp=r.time_stamp)
-                for r in battery_readings
+                BatteryTemperaturePoint(
+                    temperature=point.value,
+                    timestamp=point.timestamp,
+                    min_temperature=point.min_value,
+                    max_temperature=point.max_value,
+                )
+                for point in history["battery_temperature"]
             ],
         )
     except Exception as e:
@@ -537,7 +856,7 @@ async def request_actuator_log(
     x_access_token: Annotated[str | None, Header()] = None,
 ):
     """Ask an actuator to send back its log (Admin and Operator roles)."""
-    user = verify_token(x_access_token)
+    user = await run_blocking(verify_token, x_access_token)
     require_role(user, ACTUATOR_ROLES)
 
     actuator = Actuator.actuators.get(actuator_id)
@@ -553,8 +872,6 @@ async def request_actuator_log(
         raise HTTPException(status_code=500, detail=f"Unable to queue log request: {e}")
 
     # Polling for response
-    import asyncio
-
     timeout_s = 10
     interval_s = 0.2
     waited = 0.0
@@ -581,7 +898,7 @@ async def request_actuator_test(
     x_access_token: Annotated[str | None, Header()] = None,
 ):
     """Ask an actuator to perform a short test actuation (Admin and Operator roles)."""
-    user = verify_token(x_access_token)
+    user = await run_blocking(verify_token, x_access_token)
     require_role(user, ACTUATOR_ROLES)
 
     actuator = Actuator.actuators.get(actuator_id)
@@ -597,8 +914,6 @@ async def request_actuator_test(
         raise HTTPException(status_code=500, detail=f"Unable to queue test request: {e}")
 
     # Polling for response
-    import asyncio
-
     timeout_s = 10
     interval_s = 0.2
     waited = 0.0
@@ -629,7 +944,7 @@ async def get_actuator_last_update(
     x_access_token: Annotated[str | None, Header()] = None,
 ):
     """Get current actuator status (last update, temperature, humidity)."""
-    user = verify_token(x_access_token)
+    user = await run_blocking(verify_token, x_access_token)
     require_role(user, ACTUATOR_ROLES)
 
     actuator = Actuator.actuators.get(actuator_id)